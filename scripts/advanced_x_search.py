@@ -16,6 +16,8 @@ import itertools
 # import requests  # 必要に応じてインストール
 from urllib.parse import quote
 
+from parties import normalize_party
+
 class AdvancedXSearcher:
     def __init__(self):
         self.searched_queries = set()
@@ -121,14 +123,8 @@ class AdvancedXSearcher:
         
         results = []
         
-        # 政党名の正規化
-        for key in party_accounts.keys():
-            if key in party or party in key:
-                target_accounts = party_accounts[key]
-                break
-        else:
-            # マッチしない場合は会派名で部分一致を試みる
-            target_accounts = []
+        # 会派名を政党名に正規化（会派名ごとにキャッシュされる）
+        target_accounts = party_accounts.get(normalize_party(party), [])
         
         if target_accounts:
             print(f"  政党フォロワー検索: {party} → {target_accounts}")
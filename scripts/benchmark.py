@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+合成コーパスを使った性能計測スクリプト
+
+generate_synthetic_corpus.py で作った全国規模のデータに対して各処理を
+別プロセスで実行し、処理時間と最大メモリ使用量（ru_maxrss）を計測する。
+結果は .cache/benchmark/results.jsonl に追記し、同じスケール・対象の
+前回の結果と比較して遅くなったものを表示する。
+
+計測対象:
+- corpus: コーパスの読み込み（キャッシュを使わず全ファイルをパース）
+- validate: validate_data.py のスキーマ検証
+- statistics: generate_statistics.py の統計レポート
+- quality: check_data_quality.py の品質レポート
+- viewer: update_viewer_data.py のビューア用データ（全自治体を生成）
+- discovery: comprehensive_x_discovery.py の発見計画
+- update-all: pipeline.py の全ステージ
+
+corpus以外はスナップショットが作成済みの状態で計測する。
+
+使用方法:
+    python scripts/benchmark.py                        # スケール1で全対象
+    python scripts/benchmark.py --scale 1 10 --targets validate statistics
+    python scripts/benchmark.py --repeat 3 --check     # 20%以上遅くなったら終了コード1
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from corpus import ROOT_DIR, load_corpus
+
+RESULTS_PATH = ROOT_DIR / '.cache' / 'benchmark' / 'results.jsonl'
+TARGETS = ('corpus', 'validate', 'statistics', 'quality', 'viewer', 'discovery', 'update-all')
+DEFAULT_THRESHOLD = 0.2
+
+
+def run_target(target: str, data_dir: Path, work_dir: Path):
+    """計測対象の処理を1回実行する（標準出力は捨てる）"""
+    from check_data_quality import QualityStage
+    from generate_statistics import StatisticsStage
+    from generate_unregistered_list import UnregisteredStage
+    from pipeline import run_pipeline
+    from update_viewer_data import ViewerStage
+    from validate_data import SchemaStage
+
+    viewer_js_dir = work_dir / 'viewer' / 'js'
+    (viewer_js_dir / 'municipalities').mkdir(parents=True, exist_ok=True)
+
+    if target == 'corpus':
+        load_corpus(data_dir, rebuild=True)
+    elif target == 'validate':
+        run_pipeline([SchemaStage()], data_dir)
+    elif target == 'statistics':
+        run_pipeline([StatisticsStage()], data_dir)
+    elif target == 'quality':
+        run_pipeline([QualityStage()], data_dir)
+    elif target == 'viewer':
+        run_pipeline([ViewerStage(viewer_js_dir, full_rebuild=True)], data_dir)
+    elif target == 'discovery':
+        from comprehensive_x_discovery import discover_all_prefectures
+        discover_all_prefectures(data_dir)
+    elif target == 'update-all':
+        run_pipeline([
+            SchemaStage(),
+            ViewerStage(viewer_js_dir, full_rebuild=True),
+            StatisticsStage(),
+            UnregisteredStage(work_dir / 'x未登録議員一覧.txt'),
+            QualityStage(),
+        ], data_dir)
+    else:
+        raise ValueError(f'不明な計測対象: {target}')
+
+
+def measure_in_child(target: str, data_dir: Path, work_dir: Path) -> Dict:
+    """別プロセスで1回計測し、{seconds, peak_rss_kb, base_rss_kb} を返す"""
+    command = [sys.executable, str(Path(__file__).resolve()), '--child', target,
+               '--data-dir', str(data_dir), '--work-dir', str(work_dir)]
+    completed = subprocess.run(command, cwd=ROOT_DIR, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f'{target} の計測に失敗しました:\n{completed.stderr}')
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def child_main(target: str, data_dir: Path, work_dir: Path) -> int:
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        run_target(target, data_dir, work_dir)
+        seconds = time.perf_counter() - started
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'seconds': seconds, 'peak_rss_kb': peak_rss, 'base_rss_kb': base_rss}))
+    return 0
+
+
+def git_revision() -> Optional[str]:
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                   capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def load_results(path: Path) -> List[Dict]:
+    if not path.exists():
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_results(path: Path, records: List[Dict]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def previous_result(history: List[Dict], scale: float, target: str) -> Optional[Dict]:
+    """同じスケール・対象の直近の結果"""
+    for record in reversed(history):
+        if record['scale'] == scale and record['target'] == target:
+            return record
+    return None
+
+
+def format_delta(current: float, previous: Optional[float]) -> str:
+    if not previous:
+        return '-'
+    return f"{(current - previous) / previous * 100:+.1f}%"
+
+
+def run_benchmarks(scales: List[float], targets: List[str], repeat: int = 1,
+                   results_path: Path = RESULTS_PATH, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """計測して結果を保存し、前回より遅くなった結果の一覧を返す"""
+    from generate_synthetic_corpus import ensure_synthetic_corpus, synthetic_dir_for
+
+    history = load_results(results_path)
+    run_id = datetime.now().strftime('%Y%m%d%H%M%S')
+    revision = git_revision()
+    records = []
+    regressions = []
+
+    for scale in scales:
+        data_dir, info = ensure_synthetic_corpus(scale)
+        work_dir = synthetic_dir_for(scale) / 'work'
+        load_corpus(data_dir)  # corpus以外はスナップショット作成済みの状態で計測する
+        print(f"\n## スケール {scale:g}（{info['municipalities']}自治体, {info['councillors']}議員）")
+        print("| 対象 | 時間 | 前回比 | 最大メモリ | 前回比 |")
+        print("|------|------|--------|------------|--------|")
+
+        for target in targets:
+            runs = [measure_in_child(target, data_dir, work_dir) for _ in range(repeat)]
+            record = {
+                'run_id': run_id,
+                'revision': revision,
+                'python': platform.python_version(),
+                'scale': scale,
+                'target': target,
+                'municipalities': info['municipalities'],
+                'councillors': info['councillors'],
+                'seconds': min(r['seconds'] for r in runs),
+                'peak_rss_kb': max(r['peak_rss_kb'] for r in runs),
+                'base_rss_kb': min(r['base_rss_kb'] for r in runs),
+                'repeat': repeat,
+            }
+            records.append(record)
+            previous = previous_result(history, scale, target)
+            prev_seconds = previous['seconds'] if previous else None
+            prev_rss = previous['peak_rss_kb'] if previous else None
+            print(f"| {target} | {record['seconds'] * 1000:.1f}ms | {format_delta(record['seconds'], prev_seconds)}"
+                  f" | {record['peak_rss_kb'] / 1024:.1f}MB | {format_delta(record['peak_rss_kb'], prev_rss)} |")
+            if prev_seconds and record['seconds'] > prev_seconds * (1 + threshold):
+                regressions.append(record)
+
+    append_results(results_path, records)
+    print(f"\n結果を保存しました: {results_path}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='合成コーパスで各処理の時間とメモリを計測')
+    parser.add_argument('--scale', type=float, nargs='+', default=[1.0], help='合成コーパスの倍率')
+    parser.add_argument('--targets', nargs='+', choices=TARGETS, default=list(TARGETS))
+    parser.add_argument('--repeat', type=int, default=1, help='各対象の実行回数（最短時間を記録）')
+    parser.add_argument('--results', type=Path, default=RESULTS_PATH, help='結果の保存先（JSON Lines）')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='前回からの悪化をリグレッションとみなす割合（既定: 0.2）')
+    parser.add_argument('--check', action='store_true', help='リグレッションがあれば終了コード1')
+    parser.add_argument('--child', choices=TARGETS, help=argparse.SUPPRESS)
+    parser.add_argument('--data-dir', type=Path, help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return child_main(args.child, args.data_dir, args.work_dir)
+
+    regressions = run_benchmarks(args.scale, args.targets, args.repeat, args.results, args.threshold)
+    if regressions:
+        print(f"\n⚠️  前回より{args.threshold * 100:.0f}%以上遅くなった処理:")
+        for record in regressions:
+            print(f"  - スケール {record['scale']:g} {record['target']}")
+        return 1 if args.check else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,90 +1,136 @@
 #!/usr/bin/env python3
 """
 データ品質をチェックし、改善点を報告するスクリプト
+
+rawデータ（data/raw/<都道府県>/<自治体>/<YYYYMMDD>/）はインデックス（raw_index.py）にして
+処理済みファイルと突き合わせ、処理済みデータのないrawと、自治体ごとの最新のrawからの経過日数を報告する。
+表記ゆれを考慮した重複議員の候補（duplicates.py）もクラスタと類似度で報告する。
+X URLの生存確認（verify_x_urls.py）の結果は、ネットワークにはアクセスせずキャッシュから読んで、
+存在しない・名前が変わったアカウントを報告する。
+これらの結果は自治体ごとのスコアカード（scorecard.py）にまとめてJSONに保存し、
+推奨アクションはスコアの不足分が大きい順に優先度付きキューから取り出す。
 """
 
-import json
 import os
-import glob
+import sys
 from collections import defaultdict
-from datetime import datetime
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
 
-def check_x_accounts():
-    """Xアカウントの登録状況を分析"""
-    stats = defaultdict(lambda: {"total": 0, "with_x": 0})
-    
-    # 都道府県別ディレクトリに対応
-    json_files = glob.glob("data/processed/*.json")
-    json_files.extend(glob.glob("data/processed/*/*.json"))
-    for filepath in json_files:
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            
-        filename = os.path.basename(filepath)
-        municipality = filename.split("_")[2].replace(".json", "")
-        
-        for member in data:
-            stats[municipality]["total"] += 1
-            if member.get("X（旧Twitter）"):
-                stats[municipality]["with_x"] += 1
-    
-    return stats
+from corpus import DATA_DIR, load_corpus, parse_workers_option, print_cache_stats
+from duplicates import DuplicateIndex
+from integrity import IntegrityIndex, format_collisions
+from pipeline import Stage, run_pipeline
+from raw_index import STALE_DAYS, RawSnapshots, load_raw_index, reconcile
+from scorecard import ACTION_LIMIT, ScorecardBuilder
+from verify_x_urls import ResultCache, cache_path, cached_problems, corpus_x_urls, format_problem
 
-def check_missing_data():
-    """欠損データをチェック"""
-    issues = []
-    
-    # 空のJSONファイルをチェック
-    json_files = glob.glob("data/processed/*.json")
-    json_files.extend(glob.glob("data/processed/*/*.json"))
-    for filepath in json_files:
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if not data:
-            issues.append(f"空のデータ: {os.path.basename(filepath)}")
-    
-    # rawディレクトリで対応するprocessedがないものをチェック
-    # 都道府県別ディレクトリに対応
-    raw_dirs = []
-    for item in os.listdir("data/raw"):
-        item_path = os.path.join("data/raw", item)
-        if os.path.isdir(item_path):
-            if item.startswith(("11_", "13_")):  # 都道府県ディレクトリ
-                for subitem in os.listdir(item_path):
-                    if os.path.isdir(os.path.join(item_path, subitem)):
-                        raw_dirs.append(subitem)
-            else:
-                raw_dirs.append(item)
+class QualityStage(Stage):
+    """パイプラインのステージ: Xアカウントの登録状況・欠損データ・データの鮮度を集計し、スコアカードとレポートを出力する"""
     
-    processed_files = []
-    for f in glob.glob("data/processed/*.json"):
-        processed_files.append(os.path.basename(f).split("_")[2].replace(".json", ""))
-    for f in glob.glob("data/processed/*/*.json"):
-        processed_files.append(os.path.basename(f).split("_")[2].replace(".json", ""))
+    name = 'quality'
     
-    for raw_dir in raw_dirs:
-        if raw_dir not in processed_files:
-            issues.append(f"処理済みデータなし: {raw_dir}")
+    def __init__(self, scorecard_path=None):
+        self.x_stats = new_x_stats()
+        self.empty_files = []
+        self.processed_files = []
+        self.integrity = IntegrityIndex()
+        self.duplicates = DuplicateIndex()
+        # 生存確認の対象 (位置, 氏名, X URL)
+        self.x_urls = []
+        self.scorecard = ScorecardBuilder(scorecard_path)
+        self.data_dir = DATA_DIR
     
-    return issues
+    def start(self, context):
+        self.data_dir = context.data_dir
+        self.scorecard.start(context.data_dir)
+    
+    def process(self, item, results):
+        self.processed_files.append((item.relpath, item.code, item.name, item.prefecture))
+        
+        # 空のJSONファイルをチェック
+        if not item.document:
+            self.empty_files.append(os.path.basename(item.relpath))
+        
+        add_x_stats(self.x_stats, item)
+        
+        self.x_urls.extend(corpus_x_urls([item]))
+        
+        self.integrity.add(item)
+        self.duplicates.add(item)
+        self.scorecard.add(item)
+    
+    def finish(self):
+        raw_index = load_raw_index(self.data_dir)
+        matched, unmatched = reconcile(raw_index, self.processed_files)
+        self.freshness = check_data_freshness(self.processed_files, matched)
+        self.liveness = check_x_liveness(self.x_urls, ResultCache(cache_path(self.data_dir)))
+        clusters = self.duplicates.clusters()
+        scorecard = self.scorecard.build(self.freshness, clusters, self.liveness, unmatched)
+        self.scorecard.save(scorecard)
+        print_report(self.x_stats, check_missing_data(self.empty_files, unmatched),
+                     self.integrity.collisions(), self.freshness, clusters, self.liveness, scorecard['actions'])
+
+def new_x_stats():
+    return defaultdict(lambda: {"total": 0, "with_x": 0})
 
-def check_data_freshness():
-    """データの鮮度をチェック"""
-    freshness = {}
+def add_x_stats(x_stats, muni):
+    """1自治体分のXアカウントの登録状況を x_stats に足し込む"""
+    for councillor in muni.councillors:
+        x_stats[muni.name]["total"] += 1
+        if councillor.has_x:
+            x_stats[muni.name]["with_x"] += 1
+
+def check_x_accounts(workers=None, data_dir=DATA_DIR):
+    """Xアカウントの登録状況を分析（スコアカードなどは書き出さない）"""
+    # 都道府県別ディレクトリに対応（共通スナップショットから読み込む）
+    x_stats = new_x_stats()
+    for muni in load_corpus(data_dir, workers=workers):
+        add_x_stats(x_stats, muni)
+    return x_stats
+
+def check_missing_data(empty_files, unmatched_raw: Iterable[RawSnapshots]):
+    """欠損データをチェック（unmatched_rawは処理済みファイルと対応しないrawスナップショット）"""
+    issues = [f"空のデータ: {name}" for name in empty_files]
     
-    # README.mdから最終更新日を抽出（簡易版）
-    # 実際にはREADMEをパースして日付を取得
+    for snapshots in unmatched_raw:
+        issues.append(f"処理済みデータなし: {snapshots.key}")
     
+    return issues
+
+def check_data_freshness(processed_files: Iterable[Tuple[str, str, str, str]],
+                         matched: Dict[str, RawSnapshots], today: Optional[date] = None) -> List[Dict]:
+    """自治体ごとの最新のrawスナップショットと経過日数（古い順、rawのない自治体は末尾）"""
+    today = today or date.today()
+    freshness = []
+    for relpath, code, name, prefecture in processed_files:
+        snapshots = matched.get(relpath)
+        freshness.append({
+            'relpath': relpath, 'code': code, 'name': name, 'prefecture': prefecture,
+            'latest': snapshots.latest_date if snapshots else None,
+            'snapshots': snapshots.count if snapshots else 0,
+            'age': snapshots.age(today) if snapshots else None,
+        })
+    freshness.sort(key=lambda row: (row['age'] is None, -(row['age'] or 0)))
     return freshness
 
-def generate_report():
+def check_x_liveness(x_urls, cache: ResultCache) -> Optional[List[Tuple]]:
+    """キャッシュ済みの生存確認で存在しない・名前が変わったアカウント（未確認ならNone）"""
+    if not cache.entries:
+        return None
+    return cached_problems(x_urls, cache)
+
+def generate_report(workers=None):
     """品質レポートを生成"""
+    run_pipeline([QualityStage()], workers=workers)
+
+def print_report(x_stats, issues, collisions=(), freshness=(), duplicates=(), liveness=None, actions=()):
+    """品質レポートを出力"""
     print("=== データ品質レポート ===")
     print(f"生成日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
     # Xアカウント統計
     print("## Xアカウント登録状況")
-    x_stats = check_x_accounts()
     total_members = sum(s["total"] for s in x_stats.values())
     total_with_x = sum(s["with_x"] for s in x_stats.values())
     
@@ -103,18 +149,59 @@ def generate_report():
         print(f"- {municipality}: {members['with_x']}/{members['total']} ({rate:.1f}%)")
     
     print("\n## データの問題点")
-    issues = check_missing_data()
     if issues:
         for issue in issues:
             print(f"- {issue}")
     else:
         print("- 問題なし")
     
+    print("\n## ファイル間の整合性")
+    if collisions:
+        for line in format_collisions(collisions):
+            print(f"- {line}" if not line.startswith(" ") else line)
+    else:
+        print("- 問題なし")
+    
+    print("\n## 重複の可能性がある議員（表記ゆれを考慮）")
+    if duplicates:
+        for cluster in duplicates:
+            print(f"- {cluster}")
+    else:
+        print("- 問題なし")
+    
+    print("\n## Xアカウントの生存確認")
+    if liveness is None:
+        print("- 未確認（python scripts/verify_x_urls.py で確認）")
+    elif liveness:
+        for problem in liveness:
+            print(f"- {format_problem(*problem)}")
+    else:
+        print("- 問題なし")
+    
+    print("\n## データの鮮度")
+    if freshness:
+        with_raw = [row for row in freshness if row['age'] is not None]
+        stale = [row for row in with_raw if row['age'] >= STALE_DAYS]
+        print(f"rawデータのある自治体: {len(with_raw)}/{len(freshness)}")
+        print(f"{STALE_DAYS}日以上更新されていない自治体: {len(stale)}\n")
+        print("| 自治体 | 都道府県 | 最新のraw | 経過日数 | スナップショット数 |")
+        print("|--------|----------|-----------|----------|--------------------|")
+        for row in freshness:
+            if row['age'] is None:
+                print(f"| {row['name']} | {row['prefecture']} | - | rawデータなし | 0 |")
+            else:
+                mark = " ⚠" if row['age'] >= STALE_DAYS else ""
+                print(f"| {row['name']} | {row['prefecture']} | {row['latest']:%Y-%m-%d} | {row['age']}日{mark} | {row['snapshots']} |")
+    else:
+        print("- 処理済みデータなし")
+    
     print("\n## 推奨アクション")
-    print("1. 青ヶ島村の議員データを収集")
-    print("2. X登録率0%の自治体のアカウントを再調査")
-    print("3. 八王子市、武蔵村山市のrawデータを追加")
-    print("4. 古いデータ（30日以上）の更新を検討")
+    if actions:
+        for i, action in enumerate(actions[:ACTION_LIMIT], 1):
+            print(f"{i}. {action['action']}")
+    else:
+        print("- なし")
 
 if __name__ == "__main__":
-    generate_report()
\ No newline at end of file
+    generate_report(workers=parse_workers_option(sys.argv[1:]))
+    print_cache_stats(sys.argv[1:])
\ No newline at end of file
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+よみ・氏名の表記チェック
+
+コーパス全体を1回の走査で検査し、自治体ごとの不備の件数を報告する。
+よみの文字の種類は事前に作った変換表（str.translate）で一括して判定する:
+ひらがなと空白を消し、カタカナを目印の1文字に置き換えて、残った文字だけを見る。
+
+チェック内容（※は --fix で自動修正できるもの）:
+- よみがひらがな以外の文字（漢字・英字など）を含む
+- よみにカタカナが含まれる ※（ひらがなに変換）
+- 氏名・登録名・よみに半角スペースや連続・前後の空白が含まれる ※（姓と名の間を全角スペース1つに揃える）
+- よみに姓と名の区切りがちょうど1つない
+- 氏名とよみで姓・名の区切りの数が一致しない
+
+--fix は修正後の内容をファイルごとに一時ファイルへ書き出してから置き換える（読み込み後に
+変更されたファイルは書き換えない）。元のインデントと末尾の改行は保つ。
+
+使用方法:
+    python scripts/check_readings.py            # 自治体ごとの不備の件数と、手作業で直す必要がある議員
+    python scripts/check_readings.py --fix      # 自動修正できる不備を一括で修正
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from corpus import DATA_DIR, print_cache_stats
+from integrity import KATAKANA_TO_HIRAGANA
+from migrate_schema import detect_format, dump_document
+from pipeline import Stage, run_pipeline
+
+FULL_SPACE = '　'
+
+# 不備の種類 → (自動修正できるか, 説明)。レポートはこの順に並べる
+DEFECTS = {
+    'yomi_chars': (False, 'よみにひらがな以外の文字'),
+    'yomi_katakana': (True, 'よみにカタカナ'),
+    'spaces': (True, '半角・連続・前後の空白'),
+    'yomi_separator': (False, 'よみの姓・名の区切りが1つでない'),
+    'split_mismatch': (False, '氏名とよみの区切りの数が不一致'),
+}
+
+_HIRAGANA = [chr(c) for c in range(0x3041, 0x3097)] + ['ゝ', 'ゞ', 'ー']
+_KATAKANA = [chr(c) for c in range(0x30A1, 0x30F7)]
+_SPACES = [' ', '\t', '\n', '\u00a0', FULL_SPACE]
+# 文字の種類を判定するための目印（私用領域の文字なので、よみに現れることはない）
+KATAKANA_MARK = '\ue000'
+# ひらがな・空白は消し、カタカナは目印にする。表にない文字はそのまま残る
+YOMI_CLASSES = str.maketrans({**{c: None for c in _HIRAGANA + _SPACES},
+                              **{c: KATAKANA_MARK for c in _KATAKANA}})
+
+
+def normalize_spaces(value: str) -> str:
+    """前後の空白を除き、途中の空白（種類・個数を問わない）を全角スペース1つにする"""
+    return FULL_SPACE.join(value.split())
+
+
+def check_member(member: Dict) -> List[str]:
+    """1人分の不備の種類（DEFECTSの順、氏名・よみが文字列でなければ空）"""
+    name = member.get('氏名')
+    yomi = member.get('よみ')
+    if not isinstance(name, str) or not isinstance(yomi, str):
+        return []
+    defects = []
+    rest = yomi.translate(YOMI_CLASSES)
+    if rest:
+        if rest.replace(KATAKANA_MARK, ''):
+            defects.append('yomi_chars')
+        if KATAKANA_MARK in rest:
+            defects.append('yomi_katakana')
+    registered = member.get('登録名')
+    if any(isinstance(v, str) and normalize_spaces(v) != v for v in (name, registered, yomi)):
+        defects.append('spaces')
+    yomi_parts = len(yomi.split())
+    if yomi_parts != 2:
+        defects.append('yomi_separator')
+    if yomi_parts != len(name.split()):
+        defects.append('split_mismatch')
+    return defects
+
+
+def fix_member(member: Dict) -> bool:
+    """自動修正できる不備を直し、変更したかを返す"""
+    changed = False
+    for field in ('氏名', '登録名'):
+        value = member.get(field)
+        if isinstance(value, str) and normalize_spaces(value) != value:
+            member[field] = normalize_spaces(value)
+            changed = True
+    yomi = member.get('よみ')
+    if isinstance(yomi, str):
+        fixed = normalize_spaces(yomi).translate(KATAKANA_TO_HIRAGANA)
+        if fixed != yomi:
+            member['よみ'] = fixed
+            changed = True
+    return changed
+
+
+def fix_file(path: Path, digest: str) -> Tuple[int, Optional[str]]:
+    """ファイルの不備を修正して一時ファイル経由で置き換え、(修正した議員数, 書き換えなかった理由) を返す"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if hashlib.sha1(raw).hexdigest() != digest:
+        return 0, 'チェックの後にファイルが変更されたため書き換えませんでした'
+    text = raw.decode('utf-8')
+    document = json.loads(text)
+    fixed = sum(1 for member in document if isinstance(member, dict) and fix_member(member))
+    if fixed:
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(dump_document(document, *detect_format(text)))
+        os.replace(tmp_path, path)
+    return fixed, None
+
+
+class ReadingStage(Stage):
+    """パイプラインのステージ: よみ・氏名の表記を検査し、自治体ごとの不備の件数を数える"""
+
+    name = 'readings'
+
+    def __init__(self, fix: bool = False):
+        self.fix = fix
+        self.data_dir = DATA_DIR
+        # 相対パス → (自治体名, 都道府県, 議員数, 不備の種類ごとの件数)
+        self.counts: Dict[str, Tuple[str, str, int, Counter]] = {}
+        # 手作業で直す必要がある議員 (位置, 氏名, よみ, 不備の種類)
+        self.manual: List[Tuple[str, str, str, List[str]]] = []
+        self.fixable: List[Tuple[str, str]] = []
+        self.fixed_members = 0
+        self.fix_errors: List[str] = []
+
+    def start(self, context):
+        self.data_dir = context.data_dir
+
+    def process(self, item, results):
+        counts = Counter()
+        members = 0
+        for i, member in enumerate(item.members):
+            if not isinstance(member, dict):
+                continue
+            members += 1
+            defects = check_member(member)
+            counts.update(defects)
+            manual = [d for d in defects if not DEFECTS[d][0]]
+            if manual:
+                self.manual.append((f'{item.relpath}#/{i}', member['氏名'], member['よみ'], manual))
+        self.counts[item.relpath] = (item.name, item.prefecture, members, counts)
+        if any(DEFECTS[d][0] for d in counts):
+            self.fixable.append((item.relpath, item.digest))
+
+    def finish(self):
+        if self.fix:
+            for relpath, digest in self.fixable:
+                fixed, error = fix_file(self.data_dir / relpath, digest)
+                self.fixed_members += fixed
+                if error:
+                    self.fix_errors.append(f'{relpath}: {error}')
+        for line in format_report(self):
+            print(line)
+
+    def total(self) -> Counter:
+        total = Counter()
+        for _, _, _, counts in self.counts.values():
+            total.update(counts)
+        return total
+
+
+def format_report(stage: ReadingStage) -> List[str]:
+    lines = ["=== よみ・氏名の表記チェック ==="]
+    total = stage.total()
+    members = sum(entry[2] for entry in stage.counts.values())
+    lines.append(f"議員数: {members}")
+    for kind, (fixable, title) in DEFECTS.items():
+        mark = '（自動修正可）' if fixable else ''
+        lines.append(f"- {title}{mark}: {total[kind]}")
+
+    rows = [(relpath, entry) for relpath, entry in stage.counts.items() if entry[3]]
+    if rows:
+        lines.append("\n## 自治体ごとの不備の件数")
+        lines.append("| 自治体 | 都道府県 | 議員数 | " + " | ".join(title for _, title in DEFECTS.values()) + " |")
+        lines.append("|" + "------|" * (len(DEFECTS) + 3))
+        for relpath, (name, prefecture, count, counts) in rows:
+            cells = " | ".join(str(counts[kind]) for kind in DEFECTS)
+            lines.append(f"| {name} | {prefecture} | {count} | {cells} |")
+
+    if stage.manual:
+        lines.append(f"\n## 手作業での確認が必要な議員（{len(stage.manual)}名）")
+        for location, name, yomi, kinds in stage.manual:
+            lines.append(f"- {location} {name}（{yomi}）: {', '.join(DEFECTS[k][1] for k in kinds)}")
+
+    if stage.fix:
+        lines.append(f"\n✅ {stage.fixed_members}名分の不備を修正しました")
+        lines.extend(f"⚠️  {error}" for error in stage.fix_errors)
+    elif stage.fixable:
+        lines.append(f"\n{len(stage.fixable)}ファイルに自動修正できる不備があります（--fix で修正）")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='よみ・氏名の表記チェック')
+    parser.add_argument('--fix', action='store_true', help='自動修正できる不備を修正する')
+    parser.add_argument('--cache-stats', action='store_true', help='コーパスキャッシュの利用状況を表示')
+    args = parser.parse_args(argv)
+
+    stage = ReadingStage(fix=args.fix)
+    run_pipeline([stage], DATA_DIR)
+    print_cache_stats(['--cache-stats'] if args.cache_stats else [])
+    return 1 if stage.fix_errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -20,6 +20,11 @@ from datetime import datetime
 from collections import defaultdict
 import urllib.parse
 
+from councillor import Councillor
+from corpus import load_corpus
+from councillor_index import open_index
+from parties import INDEPENDENT, is_national_party, normalize_party
+
 class ComprehensiveXDiscovery:
     """包括的Xアカウント発見クラス"""
     
@@ -27,25 +32,17 @@ class ComprehensiveXDiscovery:
         self.base_path = base_path
         self.known_accounts = self.load_all_known_accounts()
         self.municipality_graph = self.build_municipality_graph()
+        self.index = open_index(base_path)
+        self.related_accounts_cache: Dict[Tuple[str, Tuple], List[Tuple[str, int]]] = {}
         
-    def load_all_known_accounts(self) -> Dict[str, Dict]:
-        """全自治体の既知Xアカウントを読み込み"""
+    def load_all_known_accounts(self) -> Dict[str, Councillor]:
+        """全自治体の既知Xアカウントを読み込み（X URL → 議員）"""
         known = {}
         
-        for json_file in self.base_path.glob("**/議員リスト_*.json"):
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            muni_name = json_file.stem.split('_')[-1]
-            
-            for member in data:
-                if member.get('X（旧Twitter）'):
-                    known[member['X（旧Twitter）']] = {
-                        'name': member['氏名'],
-                        'municipality': muni_name,
-                        'party': member.get('所属', ''),
-                        'reading': member.get('よみ', '')
-                    }
+        # 共通スナップショットから読み込む
+        for councillor in load_corpus(self.base_path).iter_councillors():
+            if councillor.has_x:
+                known[councillor.x_url] = councillor
         
         return known
     
@@ -151,22 +148,41 @@ class ComprehensiveXDiscovery:
     
     def find_related_accounts(self, member: Dict, municipality_info: Dict) -> List[str]:
         """関連する既知アカウントを検索"""
-        related = []
         muni_name = municipality_info['name']
         party = member.get('所属', '')
         
-        for account_url, info in self.known_accounts.items():
-            # 同じ自治体
-            if info['municipality'] == muni_name:
-                related.append(account_url)
-            # 同じ政党（異なる自治体）
-            elif party and party != '無所属' and info['party'] == party:
-                related.append(account_url)
-            # 近隣自治体
-            elif muni_name in self.municipality_graph and info['municipality'] in self.municipality_graph[muni_name]:
-                related.append(account_url)
-        
-        return related[:10]  # 最大10件
+        # 同じ自治体・近隣自治体と、同じ政党（会派名を正規化した政党、異なる自治体）をそれぞれインデックスで検索する
+        # どちらも先頭10件に入らないアカウントは合わせても10件に入らないため、
+        # それぞれの先頭10件をマージすればORで1回に検索した結果と一致する
+        names = tuple(sorted({muni_name} | self.municipality_graph.get(muni_name, set())))
+        candidates = dict(self._first_accounts(
+            f"municipality_name IN ({', '.join('?' * len(names))})", names
+        ))
+        national_party = normalize_party(party)
+        if is_national_party(national_party):
+            related = self._first_accounts("政党 = ?", (national_party,))
+        elif party and national_party != INDEPENDENT:
+            # 政党に属さない地域会派は会派名が同じ議員
+            related = self._first_accounts("所属 = ?", (party,))
+        else:
+            related = []
+        for url, first_id in related:
+            candidates[url] = min(first_id, candidates.get(url, first_id))
+        
+        ranked = sorted(candidates.items(), key=lambda x: x[1])[:10]  # 最大10件
+        return [url for url, _ in ranked]
+    
+    def _first_accounts(self, condition: str, params: Tuple) -> List[Tuple[str, int]]:
+        """条件に合うXアカウントを登場順に最大10件（同じ条件の結果はキャッシュする）"""
+        key = (condition, params)
+        if key not in self.related_accounts_cache:
+            rows = self.index.execute(
+                f"SELECT x_url, MIN(id) FROM councillors WHERE {condition} AND has_x = 1"
+                " GROUP BY x_url ORDER BY MIN(id) LIMIT 10",
+                params
+            ).fetchall()
+            self.related_accounts_cache[key] = [(row[0], row[1]) for row in rows]
+        return self.related_accounts_cache[key]
     
     def generate_discovery_plan(self, json_path: Path) -> Dict:
         """自治体の発見計画を生成"""
@@ -259,8 +275,8 @@ class ComprehensiveXDiscovery:
         
         # 政党別統計
         party_counts = defaultdict(int)
-        for info in self.known_accounts.values():
-            party_counts[info['party']] += 1
+        for councillor in self.known_accounts.values():
+            party_counts[councillor.party] += 1
         
         report.append("\n### 政党別既知アカウント数")
         for party, count in sorted(party_counts.items(), key=lambda x: x[1], reverse=True)[:10]:
@@ -0,0 +1,656 @@
+#!/usr/bin/env python3
+"""
+議員データコーパスの共通読み込みモジュール
+
+data/processed 以下の全ての 議員リスト_*.json を1つのバイナリスナップショット
+（.cache/corpus/ 以下）にまとめ、各スクリプトはJSONを個別にパースする代わりに
+このスナップショットを読み込む。
+
+スナップショットは列指向で保持する:
+- 所属・自治体は辞書エンコード（文字列表 + インデックス配列）
+- 氏名・登録名・よみ・Xは列ごとのリスト
+- スキーマから外れた議員データやJSONエラーはそのまま別表に保存
+
+ソースファイルのサイズ・更新時刻が変わった場合はハッシュを比較し、
+内容が変わっていたときだけ再構築する。
+再構築時もファイルごとのパースキャッシュ（.cache/corpus/snapshot.files/）を使うため、
+パースし直すのは変更されたファイルだけになる。キャッシュにはスナップショット形式と
+スキーマファイルのハッシュを含むタグを付け、どちらかが変わると自動的に無効になる。
+
+使用方法:
+    python scripts/corpus.py            # スナップショットを更新して概要を表示
+    python scripts/corpus.py --rebuild  # 強制的に再構築
+    python scripts/corpus.py --rebuild --workers 8
+    python scripts/corpus.py --cache-stats  # キャッシュなし/ありの読み込み時間を比較
+
+再構築時のJSON読み込みはプロセスプール（小さいコーパスではスレッド）で並列化し、
+結果は常にパス順に並べる。ワーカー数は --workers または環境変数 CORPUS_WORKERS で指定する。
+"""
+
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import shutil
+import subprocess
+import sys
+import time
+from array import array
+from fnmatch import fnmatch
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from councillor import V12_FIELDS, X_FIELD, Councillor
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT_DIR / 'data' / 'processed'
+CACHE_DIR = ROOT_DIR / '.cache' / 'corpus'
+SCHEMA_PATH = ROOT_DIR / 'schema' / 'municipal_councillor_v1.2.json'
+
+SNAPSHOT_VERSION = 2
+
+# 合計サイズがこれ未満ならプロセスを起動するよりスレッドの方が速い
+PROCESS_POOL_MIN_BYTES = 4 * 1024 * 1024
+WORKERS_ENV = 'CORPUS_WORKERS'
+FILE_PATTERN = '議員リスト_*.json'
+FIELDS = V12_FIELDS
+
+
+def iter_source_files(data_dir: Path = DATA_DIR) -> List[Path]:
+    """議員リストJSONを列挙（直下と都道府県ディレクトリの両方、パス順）"""
+    files = list(data_dir.glob(FILE_PATTERN))
+    files.extend(data_dir.glob(f'*/{FILE_PATTERN}'))
+    return sorted(files, key=lambda p: p.relative_to(data_dir).as_posix())
+
+
+def parse_filename(path: Path) -> Tuple[str, str]:
+    """ファイル名から (自治体コード, 自治体名) を取得"""
+    parts = path.stem.split('_')
+    if len(parts) >= 3:
+        return parts[1], parts[2]
+    return '', path.stem
+
+
+@lru_cache(maxsize=None)
+def cache_tag() -> str:
+    """キャッシュの互換性タグ（スナップショット形式 + スキーマファイルのハッシュ）"""
+    try:
+        schema_hash = file_digest(SCHEMA_PATH)
+    except OSError:
+        schema_hash = 'none'
+    return f'{SNAPSHOT_VERSION}:{schema_hash}'
+
+
+# 直近の load_corpus() のキャッシュ利用状況（--cache-stats で表示）
+CACHE_STATS: Dict = {}
+
+
+def file_digest(path: Path) -> str:
+    """ファイル内容のSHA-1ハッシュ"""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def cache_path_for(data_dir: Path, stem: str, suffix: str) -> Path:
+    """データディレクトリごとのキャッシュファイルパス"""
+    data_dir = Path(data_dir).resolve()
+    if data_dir == DATA_DIR.resolve():
+        return CACHE_DIR / f'{stem}{suffix}'
+    key = hashlib.sha1(str(data_dir).encode('utf-8')).hexdigest()[:12]
+    return CACHE_DIR / f'{stem}_{key}{suffix}'
+
+
+def snapshot_path_for(data_dir: Path) -> Path:
+    """データディレクトリごとのスナップショットパス"""
+    return cache_path_for(data_dir, 'snapshot', '.bin')
+
+
+def has_x_account(member: Dict) -> bool:
+    """X（旧Twitter）が登録されているか（空文字や文字列の'null'は未登録扱い）"""
+    x_account = member.get(X_FIELD)
+    return bool(x_account) and x_account != 'null'
+
+
+def is_regular_member(member) -> bool:
+    """列に格納できる（v1.2スキーマ通りの）議員データか"""
+    if not isinstance(member, dict) or tuple(member) != FIELDS:
+        return False
+    for field in FIELDS:
+        value = member[field]
+        if not isinstance(value, str) and not (field == X_FIELD and value is None):
+            return False
+    return True
+
+
+class Municipality:
+    """スナップショット内の1自治体（1ファイル）"""
+
+    __slots__ = ('corpus', 'index', 'relpath', 'code', 'name', 'prefecture',
+                 'digest', 'error', 'start', 'end', '_raw')
+
+    def __init__(self, corpus, index, relpath, code, name, prefecture, digest,
+                 error, start, end, raw):
+        self.corpus = corpus
+        self.index = index
+        self.relpath = relpath
+        self.code = code
+        self.name = name
+        self.prefecture = prefecture
+        self.digest = digest
+        self.error = error
+        self.start = start
+        self.end = end
+        self._raw = raw
+
+    @property
+    def path(self) -> Path:
+        return self.corpus.data_dir / self.relpath
+
+    @property
+    def document(self):
+        """ファイルの内容（JSONエラー時はNone、リスト以外の場合はその値）"""
+        if self.error is not None:
+            return None
+        if self._raw is not None:
+            return self._raw[0]
+        return self.members
+
+    @property
+    def members(self) -> List[Dict]:
+        """議員データのリスト（元のJSONと同じdict形式）"""
+        if self.error is not None or self._raw is not None:
+            return []
+        return [self.corpus.member(i) for i in range(self.start, self.end)]
+
+    @property
+    def councillors(self) -> List[Councillor]:
+        """議員データのリスト（Councillor形式、dict以外の要素は除く）"""
+        if self.error is not None or self._raw is not None:
+            return []
+        result = []
+        for row in range(self.start, self.end):
+            councillor = self.corpus.councillor(row)
+            if councillor is not None:
+                result.append(councillor)
+        return result
+
+    def columns(self) -> Optional[Tuple[array, List[Optional[str]]]]:
+        """議員の (所属ID（corpus.parties の添字）の列, Xの列)
+
+        議員データを復元せずに集計するためのもの。スキーマから外れた議員を含む場合はNone。
+        """
+        corpus = self.corpus
+        if self.error is not None or self._raw is not None or self.index in corpus.irregular_municipalities:
+            return None
+        return corpus._party[self.start:self.end], corpus._x[self.start:self.end]
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f'Municipality({self.code!r}, {self.name!r})'
+
+
+class Corpus:
+    """列指向スナップショットを読み込んだコーパス"""
+
+    def __init__(self, data_dir: Path, payload: Dict):
+        self.data_dir = Path(data_dir)
+        self.parties = payload['parties']
+        self._name = payload['氏名']
+        self._registered = payload['登録名']
+        self._yomi = payload['よみ']
+        self._x = payload['x']
+        self._party = array('I')
+        self._party.frombytes(payload['party'])
+        self._municipality = array('I')
+        self._municipality.frombytes(payload['municipality'])
+        self._irregular = payload['irregular']
+        self.irregular_municipalities = {self._municipality[row] for row in self._irregular}
+        self.municipalities = [
+            Municipality(self, i, *entry[:4], *entry[6:])
+            for i, entry in enumerate(payload['files'])
+        ]
+        self.by_code = {m.code: m for m in self.municipalities}
+
+    def member(self, row: int) -> Dict:
+        """行番号から議員データのdictを復元"""
+        if row in self._irregular:
+            return self._irregular[row]
+        return {
+            '氏名': self._name[row],
+            '登録名': self._registered[row],
+            'よみ': self._yomi[row],
+            X_FIELD: self._x[row],
+            '所属': self.parties[self._party[row]],
+        }
+
+    def councillor(self, row: int) -> Optional[Councillor]:
+        """行番号からCouncillorを作成（dictでない要素はNone）"""
+        muni = self.municipalities[self._municipality[row]]
+        if row in self._irregular:
+            member = self._irregular[row]
+            if not isinstance(member, dict):
+                return None
+            return Councillor.from_dict(member, muni.code, muni.name, muni.prefecture)
+        return Councillor(
+            self._name[row], self._registered[row], self._yomi[row], self._x[row],
+            self.parties[self._party[row]], muni.code, muni.name, muni.prefecture,
+        )
+
+    def iter_councillors(self) -> Iterator[Councillor]:
+        """全議員をCouncillor形式で自治体順に列挙"""
+        for row in range(self.member_count):
+            councillor = self.councillor(row)
+            if councillor is not None:
+                yield councillor
+
+    def municipality_of(self, row: int) -> Municipality:
+        return self.municipalities[self._municipality[row]]
+
+    def iter_members(self) -> Iterator[Tuple[Municipality, Dict]]:
+        """(自治体, 議員データ) を自治体順に列挙"""
+        for muni in self.municipalities:
+            for member in muni.members:
+                yield muni, member
+
+    @property
+    def member_count(self) -> int:
+        return len(self._municipality)
+
+    def __len__(self):
+        return len(self.municipalities)
+
+    def __iter__(self):
+        return iter(self.municipalities)
+
+
+class SourceFile:
+    """スナップショットを使わずに直接読み込んだ1ファイル（Municipalityと同じ属性を持つ）"""
+
+    __slots__ = ('data_dir', 'relpath', 'code', 'name', 'prefecture', 'digest', 'error', 'document')
+
+    def __init__(self, data_dir: Path, relpath: str):
+        self.data_dir = Path(data_dir)
+        self.relpath = relpath
+        path = self.path
+        self.code, self.name = parse_filename(path)
+        self.prefecture = path.parent.name if path.parent != self.data_dir else ''
+        self.document, self.error, self.digest = read_source(path)
+
+    @property
+    def path(self) -> Path:
+        return self.data_dir / self.relpath
+
+    @property
+    def members(self) -> List:
+        return self.document if isinstance(self.document, list) else []
+
+    @property
+    def councillors(self) -> List[Councillor]:
+        return [Councillor.from_dict(m, self.code, self.name, self.prefecture)
+                for m in self.members if isinstance(m, dict)]
+
+    def __len__(self):
+        return len(self.members)
+
+    def __repr__(self):
+        return f'SourceFile({self.code!r}, {self.name!r})'
+
+
+def _git_paths(data_dir: Path, *args: str) -> List[str]:
+    """data_dirで実行したgitコマンドが出力したパス（data_dirからの相対パス）"""
+    try:
+        completed = subprocess.run(['git', args[0], '-z', *args[1:]], cwd=data_dir, capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        detail = getattr(e, 'stderr', b'') or b''
+        raise ValueError(f"git {' '.join(args)} に失敗しました: {detail.decode('utf-8', 'replace').strip() or e}")
+    return [p for p in completed.stdout.decode('utf-8').split('\0') if p]
+
+
+def changed_sources(rev: str, data_dir: Path = DATA_DIR) -> Tuple[List[SourceFile], List[str]]:
+    """rev以降に変更されたソースファイル（作業ツリーの未コミット・未追跡分を含む）
+
+    変更・追加されたファイルを読み込んだ SourceFile の一覧（パス順）と、
+    削除されたファイルの相対パスの一覧を返す。git diff --name-only で差分を取得する。
+    """
+    data_dir = Path(data_dir)
+    paths = set(_git_paths(data_dir, 'diff', '--name-only', '--no-renames', '--relative', rev, '--', '.'))
+    paths.update(_git_paths(data_dir, 'ls-files', '--others', '--exclude-standard', '--', '.'))
+    # 直下と都道府県ディレクトリの議員リストのみ（iter_source_filesと同じ範囲）
+    paths = sorted(p for p in paths if len(Path(p).parts) <= 2 and fnmatch(Path(p).name, FILE_PATTERN))
+    changed = [SourceFile(data_dir, p) for p in paths if (data_dir / p).is_file()]
+    removed = [p for p in paths if not (data_dir / p).exists()]
+    return changed, removed
+
+
+def _stat_sources(data_dir: Path) -> List[Tuple[str, int, int]]:
+    """ソースファイルの (相対パス, サイズ, 更新時刻) 一覧"""
+    result = []
+    for path in iter_source_files(data_dir):
+        st = path.stat()
+        result.append((path.relative_to(data_dir).as_posix(), st.st_size, st.st_mtime_ns))
+    return result
+
+
+def read_source(path: Path):
+    """JSONを読み込み (内容, エラー, ハッシュ) を返す"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha1(raw).hexdigest()
+    try:
+        return json.loads(raw.decode('utf-8')), None, digest
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        return None, str(e), digest
+
+
+def default_workers() -> int:
+    """ワーカー数（環境変数 CORPUS_WORKERS で指定、未指定ならCPU数）"""
+    value = os.environ.get(WORKERS_ENV)
+    if value:
+        return max(1, int(value))
+    return os.cpu_count() or 1
+
+
+def parse_workers_option(argv: List[str]) -> Optional[int]:
+    """コマンドライン引数から --workers N を取得"""
+    for i, arg in enumerate(argv):
+        if arg == '--workers' and i + 1 < len(argv):
+            return max(1, int(argv[i + 1]))
+        if arg.startswith('--workers='):
+            return max(1, int(arg.split('=', 1)[1]))
+    return None
+
+
+def parse_changed_since_option(argv: List[str]) -> Optional[str]:
+    """コマンドライン引数から --changed-since REV を取得"""
+    for i, arg in enumerate(argv):
+        if arg == '--changed-since' and i + 1 < len(argv):
+            return argv[i + 1]
+        if arg.startswith('--changed-since='):
+            return arg.split('=', 1)[1]
+    return None
+
+
+def load_files(paths: List[Path], workers: Optional[int] = None,
+               mode: str = 'auto') -> List[Tuple]:
+    """複数のJSONを並列に読み込み、入力と同じ順序で (内容, エラー, ハッシュ) を返す
+
+    mode: 'process' / 'thread' / 'serial' / 'auto'（合計サイズで自動選択）
+    """
+    paths = list(paths)
+    workers = workers or default_workers()
+    if mode == 'auto':
+        if workers == 1 or len(paths) <= 1:
+            mode = 'serial'
+        elif sum(p.stat().st_size for p in paths) < PROCESS_POOL_MIN_BYTES:
+            mode = 'thread'
+        else:
+            mode = 'process'
+
+    if mode == 'serial':
+        return [read_source(p) for p in paths]
+    executor_class = ProcessPoolExecutor if mode == 'process' else ThreadPoolExecutor
+    chunksize = max(1, len(paths) // (workers * 4)) if mode == 'process' else 1
+    with executor_class(max_workers=workers) as executor:
+        # mapは完了順ではなく入力順で結果を返すので出力が毎回同じになる
+        return list(executor.map(read_source, paths, chunksize=chunksize))
+
+
+def _file_cache_path(file_cache_dir: Path, relpath: str) -> Path:
+    return file_cache_dir / (hashlib.sha1(relpath.encode('utf-8')).hexdigest() + '.bin')
+
+
+def _read_file_cache(path: Path) -> Optional[Dict]:
+    try:
+        with open(path, 'rb') as f:
+            entry = marshal.load(f)
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    if not isinstance(entry, dict) or entry.get('tag') != cache_tag():
+        return None
+    return entry
+
+
+def _write_file_cache(path: Path, entry: Dict):
+    entry['tag'] = cache_tag()
+    tmp_path = path.with_name(path.name + f'.{os.getpid()}.tmp')
+    with open(tmp_path, 'wb') as f:
+        marshal.dump(entry, f)
+    os.replace(tmp_path, path)
+
+
+def _load_documents(data_dir: Path, sources: List[Tuple[str, int, int]],
+                    file_cache_dir: Optional[Path], workers: Optional[int]) -> List[Tuple]:
+    """ファイルごとのパースキャッシュを使ってソースを読み込む（変更分だけパース）"""
+    if file_cache_dir is None:
+        CACHE_STATS['file_misses'] = len(sources)
+        return load_files([data_dir / s[0] for s in sources], workers)
+
+    file_cache_dir.mkdir(parents=True, exist_ok=True)
+    results: List = [None] * len(sources)
+    misses = []
+    hits = hash_hits = 0
+    for i, (relpath, size, mtime_ns) in enumerate(sources):
+        cache_path = _file_cache_path(file_cache_dir, relpath)
+        entry = _read_file_cache(cache_path)
+        if entry is not None and entry['size'] == size:
+            if entry['mtime_ns'] == mtime_ns:
+                hits += 1
+            elif file_digest(data_dir / relpath) == entry['digest']:
+                # 内容が同じなら更新時刻だけ書き換える
+                entry['mtime_ns'] = mtime_ns
+                _write_file_cache(cache_path, entry)
+                hash_hits += 1
+            else:
+                entry = None
+            if entry is not None:
+                results[i] = (entry['document'], entry['error'], entry['digest'])
+                continue
+        misses.append(i)
+
+    loaded = load_files([data_dir / sources[i][0] for i in misses], workers)
+    for i, result in zip(misses, loaded):
+        relpath, size, mtime_ns = sources[i]
+        document, error, digest = result
+        _write_file_cache(_file_cache_path(file_cache_dir, relpath), {
+            'size': size, 'mtime_ns': mtime_ns, 'digest': digest,
+            'document': document, 'error': error,
+        })
+        results[i] = result
+
+    # 削除されたソースのキャッシュを掃除
+    expected = {_file_cache_path(file_cache_dir, s[0]).name for s in sources}
+    for path in file_cache_dir.glob('*.bin'):
+        if path.name not in expected:
+            path.unlink(missing_ok=True)
+
+    CACHE_STATS.update(file_hits=hits, file_hash_hits=hash_hits, file_misses=len(misses))
+    return results
+
+
+def build_payload(data_dir: Path, sources: List[Tuple[str, int, int]],
+                  workers: Optional[int] = None, file_cache_dir: Optional[Path] = None) -> Dict:
+    """ソースJSONからスナップショットの内容を構築（file_cache_dirがあれば変更分だけパース）"""
+    party_ids: Dict[str, int] = {}
+    payload = {
+        'version': cache_tag(),
+        'files': [],
+        'parties': [],
+        '氏名': [], '登録名': [], 'よみ': [], 'x': [],
+        'irregular': {},
+    }
+    party = array('I')
+    municipality = array('I')
+    loaded = _load_documents(data_dir, sources, file_cache_dir, workers)
+
+    for index, (relpath, size, mtime_ns) in enumerate(sources):
+        path = data_dir / relpath
+        code, name = parse_filename(path)
+        prefecture = path.parent.name if path.parent != data_dir else ''
+        document, error, digest = loaded[index]
+        start = len(municipality)
+        raw = None
+        if error is None and not isinstance(document, list):
+            # リスト以外（nullを含む）はそのまま保持する
+            raw = [document]
+        elif error is None:
+            for member in document:
+                row = len(municipality)
+                municipality.append(index)
+                if is_regular_member(member):
+                    party_name = member['所属']
+                    if party_name not in party_ids:
+                        party_ids[party_name] = len(payload['parties'])
+                        payload['parties'].append(party_name)
+                    party.append(party_ids[party_name])
+                    payload['氏名'].append(member['氏名'])
+                    payload['登録名'].append(member['登録名'])
+                    payload['よみ'].append(member['よみ'])
+                    payload['x'].append(member[X_FIELD])
+                else:
+                    payload['irregular'][row] = member
+                    party.append(0)
+                    for column in ('氏名', '登録名', 'よみ', 'x'):
+                        payload[column].append(None)
+        payload['files'].append(
+            (relpath, code, name, prefecture, size, mtime_ns, digest,
+             error, start, len(municipality), raw)
+        )
+
+    payload['party'] = party.tobytes()
+    payload['municipality'] = municipality.tobytes()
+    return payload
+
+
+def _read_snapshot(path: Path) -> Optional[Dict]:
+    """スナップショットを読み込む（壊れている・古い形式ならNone）"""
+    try:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                payload = marshal.loads(mm)
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    if not isinstance(payload, dict) or payload.get('version') != cache_tag():
+        return None
+    return payload
+
+
+def _write_snapshot(path: Path, payload: Dict):
+    """スナップショットをアトミックに書き込む"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + f'.{os.getpid()}.tmp')
+    with open(tmp_path, 'wb') as f:
+        marshal.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def _check_freshness(data_dir: Path, payload: Dict, sources: List[Tuple[str, int, int]]) -> str:
+    """スナップショットとソースを比較する（更新時刻が違えばハッシュで確認）
+
+    'fresh': 一致 / 'touched': 内容は同じで更新時刻のみ変化 / 'stale': 再構築が必要
+    """
+    files = payload['files']
+    if [s[0] for s in sources] != [f[0] for f in files]:
+        return 'stale'
+    touched = False
+    for i, (relpath, size, mtime_ns) in enumerate(sources):
+        entry = files[i]
+        if entry[4] == size and entry[5] == mtime_ns:
+            continue
+        if entry[4] != size or file_digest(data_dir / relpath) != entry[6]:
+            return 'stale'
+        files[i] = entry[:4] + (size, mtime_ns) + entry[6:]
+        touched = True
+    return 'touched' if touched else 'fresh'
+
+
+def load_corpus(data_dir: Path = DATA_DIR, rebuild: bool = False,
+                snapshot_path: Optional[Path] = None, workers: Optional[int] = None) -> Corpus:
+    """スナップショットからコーパスを読み込む（必要なら並列に再構築）
+
+    rebuild=True の場合はスナップショットもファイルごとのキャッシュも使わずに全てパースする。
+    """
+    started = time.perf_counter()
+    CACHE_STATS.clear()
+    data_dir = Path(data_dir)
+    snapshot_path = Path(snapshot_path) if snapshot_path else snapshot_path_for(data_dir)
+    file_cache_dir = snapshot_path.with_suffix('.files')
+    sources = _stat_sources(data_dir)
+
+    payload = None if rebuild else _read_snapshot(snapshot_path)
+    freshness = 'missing'
+    if payload is not None:
+        freshness = _check_freshness(data_dir, payload, sources)
+        if freshness == 'touched':
+            _write_snapshot(snapshot_path, payload)
+        elif freshness == 'stale':
+            payload = None
+
+    if payload is None:
+        if rebuild:
+            shutil.rmtree(file_cache_dir, ignore_errors=True)
+        payload = build_payload(data_dir, sources, workers, file_cache_dir)
+        _write_snapshot(snapshot_path, payload)
+
+    corpus = Corpus(data_dir, payload)
+    CACHE_STATS.update(snapshot='rebuilt' if rebuild else freshness,
+                       files=len(sources), seconds=time.perf_counter() - started)
+    return corpus
+
+
+def format_cache_stats(stats: Optional[Dict] = None) -> str:
+    """キャッシュ利用状況を1行にまとめる"""
+    stats = CACHE_STATS if stats is None else stats
+    labels = {
+        'fresh': 'スナップショット使用',
+        'touched': 'スナップショット使用（更新時刻のみ変化）',
+        'stale': 'スナップショット再構築',
+        'missing': 'スナップショット新規作成',
+        'rebuilt': '強制再構築（キャッシュ不使用）',
+    }
+    line = f"[cache] {labels.get(stats.get('snapshot'), stats.get('snapshot'))}"
+    if 'file_misses' in stats:
+        line += (f" / ファイルキャッシュ: ヒット {stats.get('file_hits', 0)}"
+                 f", ハッシュ一致 {stats.get('file_hash_hits', 0)}"
+                 f", パース {stats['file_misses']}")
+    line += f" / {stats.get('files', 0)}ファイル {stats.get('seconds', 0) * 1000:.1f}ms"
+    return line
+
+
+def print_cache_stats(argv: List[str]):
+    """--cache-stats が指定されていればキャッシュ利用状況を標準エラーに出力"""
+    if '--cache-stats' in argv:
+        print(format_cache_stats(), file=sys.stderr)
+
+
+def main():
+    argv = sys.argv[1:]
+    rebuild = '--rebuild' in argv
+    workers = parse_workers_option(argv)
+    corpus = load_corpus(rebuild=rebuild, workers=workers)
+    print(f"スナップショット: {snapshot_path_for(DATA_DIR)}")
+    print(f"自治体数: {len(corpus)}")
+    print(f"議員数: {corpus.member_count}")
+    print(f"会派数: {len(corpus.parties)}")
+
+    if '--cache-stats' in argv:
+        # キャッシュを使わない場合（全ファイルをパース）と使う場合の読み込み時間を比較
+        started = time.perf_counter()
+        build_payload(DATA_DIR, _stat_sources(DATA_DIR), workers)
+        cold = time.perf_counter() - started
+        load_corpus(workers=workers)
+        print(f"\nコールド（全ファイルをパース）: {cold * 1000:.1f}ms")
+        print(f"ウォーム: {format_cache_stats()}")
+
+    errors = [m for m in corpus if m.error]
+    for muni in errors:
+        print(f"JSONエラー: {muni.relpath} - {muni.error}")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+議員1人分のデータを表すコンパクトなレコード型
+
+議員データをJSONと同じdictで持つと、議員ごとにキー文字列の参照と
+所属・自治体名のコピーを抱えることになる。Councillorは__slots__で属性を固定し、
+所属・自治体名・都道府県はsys.internで共有するため、全国規模のコーパスを
+常駐プロセス（発見デーモンなど）で保持してもメモリが膨らまない。
+
+v1.2スキーマのdictとは from_dict() / to_dict() で相互に変換できる。
+"""
+
+import sys
+from typing import Dict, Optional
+
+X_FIELD = 'X（旧Twitter）'
+V12_FIELDS = ('氏名', '登録名', 'よみ', X_FIELD, '所属')
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Councillor:
+    """議員レコード（所属・自治体名・都道府県はintern済み）"""
+
+    __slots__ = ('name', 'registered_name', 'yomi', 'x_url', 'party',
+                 'municipality_code', 'municipality', 'prefecture')
+
+    def __init__(self, name: str, registered_name: str, yomi: str, x_url: Optional[str],
+                 party: str, municipality_code: str = '', municipality: str = '',
+                 prefecture: str = ''):
+        self.name = name
+        self.registered_name = registered_name
+        self.yomi = yomi
+        self.x_url = x_url
+        self.party = _intern(party)
+        self.municipality_code = _intern(municipality_code)
+        self.municipality = _intern(municipality)
+        self.prefecture = _intern(prefecture)
+
+    @property
+    def has_x(self) -> bool:
+        """X（旧Twitter）が登録されているか（空文字や文字列の'null'は未登録扱い）"""
+        return bool(self.x_url) and self.x_url != 'null'
+
+    @classmethod
+    def from_dict(cls, member: Dict, municipality_code: str = '', municipality: str = '',
+                  prefecture: str = '') -> 'Councillor':
+        """v1.2スキーマのdictから作成"""
+        return cls(
+            member.get('氏名', ''),
+            member.get('登録名', ''),
+            member.get('よみ', ''),
+            member.get(X_FIELD),
+            member.get('所属', ''),
+            municipality_code,
+            municipality,
+            prefecture,
+        )
+
+    def to_dict(self) -> Dict:
+        """v1.2スキーマのdict（キー順もスキーマ通り）に変換"""
+        return {
+            '氏名': self.name,
+            '登録名': self.registered_name,
+            'よみ': self.yomi,
+            X_FIELD: self.x_url,
+            '所属': self.party,
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Councillor):
+            return NotImplemented
+        return all(getattr(self, a) == getattr(other, a) for a in self.__slots__)
+
+    def __hash__(self):
+        return hash((self.municipality_code, self.name, self.yomi))
+
+    def __repr__(self):
+        return f'Councillor({self.name!r}, {self.municipality!r}, {self.party!r})'
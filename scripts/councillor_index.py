@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+議員データのSQLiteインデックス
+
+全ての 議員リスト_*.json を .cache/corpus/councillors.sqlite に取り込み、
+自治体コード・都道府県・所属・政党（所属の会派名を正規化したもの、parties.py）・X URLにインデックスを張る。
+氏名・登録名・よみはFTS5で全文検索できる。
+
+自治体ごとにソースのハッシュを記録しており、変更された自治体だけを入れ替える。
+
+使用方法:
+    python scripts/councillor_index.py build [--rebuild]
+    python scripts/councillor_index.py search <キーワード>
+    python scripts/councillor_index.py query [--prefecture 13_東京都] [--municipality 132012]
+                                             [--party 公明党] [--national-party 自由民主党]
+                                             [--no-x | --has-x]
+    python scripts/councillor_index.py x <URL>
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from corpus import DATA_DIR, X_FIELD, cache_path_for, has_x_account, load_corpus
+from parties import FALLBACK_ALIASES, PARTY_ALIASES, normalize_party
+
+SCHEMA_VERSION = 2
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS municipalities (
+    code TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    prefecture TEXT NOT NULL,
+    source TEXT NOT NULL,
+    source_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS councillors (
+    id INTEGER PRIMARY KEY,
+    municipality_code TEXT NOT NULL,
+    municipality_name TEXT NOT NULL,
+    prefecture TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    氏名 TEXT,
+    登録名 TEXT,
+    よみ TEXT,
+    x_url TEXT,
+    has_x INTEGER NOT NULL,
+    所属 TEXT,
+    政党 TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_councillors_municipality ON councillors (municipality_code);
+CREATE INDEX IF NOT EXISTS idx_councillors_municipality_name ON councillors (municipality_name, has_x);
+CREATE INDEX IF NOT EXISTS idx_councillors_prefecture ON councillors (prefecture, 所属, has_x);
+CREATE INDEX IF NOT EXISTS idx_councillors_party ON councillors (所属, has_x);
+CREATE INDEX IF NOT EXISTS idx_councillors_national_party ON councillors (政党, has_x);
+CREATE INDEX IF NOT EXISTS idx_councillors_x_url ON councillors (x_url);
+"""
+
+FTS_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS councillors_fts USING fts5 (
+    氏名, 登録名, よみ,
+    content='councillors', content_rowid='id', tokenize='{tokenizer}'
+);
+"""
+
+# FTS5のtrigramは3文字未満の検索語に使えないため、その場合はLIKEで検索する
+TRIGRAM_MIN_LENGTH = 3
+
+
+def index_path_for(data_dir: Path) -> Path:
+    """データディレクトリごとのインデックスファイルパス"""
+    return cache_path_for(data_dir, 'councillors', '.sqlite')
+
+
+def party_aliases_hash() -> str:
+    """政党の別名表のハッシュ（政党列は normalize_party() の結果なので、別名表が変わったら作り直す）"""
+    return hashlib.sha1(repr((PARTY_ALIASES, FALLBACK_ALIASES)).encode('utf-8')).hexdigest()
+
+
+def _create_schema(conn: sqlite3.Connection):
+    conn.executescript(SCHEMA_SQL)
+    try:
+        conn.executescript(FTS_SQL.format(tokenizer='trigram'))
+        tokenizer = 'trigram'
+    except sqlite3.OperationalError:
+        # 古いSQLite（3.34未満）ではtrigramが使えない
+        conn.executescript(FTS_SQL.format(tokenizer='unicode61'))
+        tokenizer = 'unicode61'
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('tokenizer', ?)", (tokenizer,))
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('party_aliases', ?)", (party_aliases_hash(),))
+
+
+def _meta(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def _delete_municipality(conn: sqlite3.Connection, code: str):
+    rows = conn.execute(
+        "SELECT id, 氏名, 登録名, よみ FROM councillors WHERE municipality_code = ?", (code,)
+    ).fetchall()
+    conn.executemany(
+        "INSERT INTO councillors_fts (councillors_fts, rowid, 氏名, 登録名, よみ) "
+        "VALUES ('delete', ?, ?, ?, ?)",
+        rows,
+    )
+    conn.execute("DELETE FROM councillors WHERE municipality_code = ?", (code,))
+    conn.execute("DELETE FROM municipalities WHERE code = ?", (code,))
+
+
+def _insert_municipality(conn: sqlite3.Connection, muni):
+    conn.execute(
+        "INSERT INTO municipalities VALUES (?, ?, ?, ?, ?)",
+        (muni.code, muni.name, muni.prefecture, muni.relpath, muni.digest),
+    )
+    for position, member in enumerate(muni.members):
+        if not isinstance(member, dict):
+            continue
+        cursor = conn.execute(
+            "INSERT INTO councillors (municipality_code, municipality_name, prefecture, position,"
+            " 氏名, 登録名, よみ, x_url, has_x, 所属, 政党) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                muni.code, muni.name, muni.prefecture, position,
+                member.get('氏名'), member.get('登録名'), member.get('よみ'),
+                member.get(X_FIELD) if has_x_account(member) else None,
+                int(has_x_account(member)), member.get('所属'), normalize_party(member.get('所属')),
+            ),
+        )
+        conn.execute(
+            "INSERT INTO councillors_fts (rowid, 氏名, 登録名, よみ) VALUES (?, ?, ?, ?)",
+            (cursor.lastrowid, member.get('氏名'), member.get('登録名'), member.get('よみ')),
+        )
+
+
+def build_index(data_dir: Path = DATA_DIR, db_path: Optional[Path] = None,
+                rebuild: bool = False) -> Dict[str, int]:
+    """インデックスを構築・更新し、更新件数を返す"""
+    db_path = Path(db_path) if db_path else index_path_for(data_dir)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    if rebuild and db_path.exists():
+        db_path.unlink()
+
+    corpus = load_corpus(data_dir)
+    conn = sqlite3.connect(db_path)
+    try:
+        if (_meta(conn, 'schema_version') != str(SCHEMA_VERSION)
+                or _meta(conn, 'party_aliases') != party_aliases_hash()):
+            conn.close()
+            db_path.unlink()
+            conn = sqlite3.connect(db_path)
+        _create_schema(conn)
+
+        indexed = dict(conn.execute("SELECT code, source_hash FROM municipalities"))
+        current = {muni.code: muni for muni in corpus if muni.code and not muni.error}
+        stats = {'updated': 0, 'removed': 0, 'unchanged': 0}
+
+        with conn:
+            for code in indexed.keys() - current.keys():
+                _delete_municipality(conn, code)
+                stats['removed'] += 1
+            for code, muni in current.items():
+                if indexed.get(code) == muni.digest:
+                    stats['unchanged'] += 1
+                    continue
+                if code in indexed:
+                    _delete_municipality(conn, code)
+                _insert_municipality(conn, muni)
+                stats['updated'] += 1
+    finally:
+        conn.close()
+    return stats
+
+
+def open_index(data_dir: Path = DATA_DIR, db_path: Optional[Path] = None) -> sqlite3.Connection:
+    """最新のインデックスを開く（行はsqlite3.Rowで返す）"""
+    db_path = Path(db_path) if db_path else index_path_for(data_dir)
+    build_index(data_dir, db_path)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def find_members(conn: sqlite3.Connection, prefecture: Optional[str] = None,
+                 municipality_code: Optional[str] = None, party: Optional[str] = None,
+                 has_x: Optional[bool] = None, limit: Optional[int] = None,
+                 national_party: Optional[str] = None) -> List[sqlite3.Row]:
+    """条件に合う議員を取得
+
+    partyは所属の前方一致（例: '公明党' → '公明党入間市議団'）、national_partyは正規化した政党名の一致
+    （例: '自由民主党' → '自民党新政会'）。
+    """
+    clauses = []
+    params: List = []
+    if prefecture is not None:
+        clauses.append("prefecture = ?")
+        params.append(prefecture)
+    if municipality_code is not None:
+        clauses.append("municipality_code = ?")
+        params.append(municipality_code)
+    if party is not None:
+        # 範囲条件にするとLIKEと違って所属のインデックスが使える
+        clauses.append("所属 >= ? AND 所属 < ?")
+        params.extend([party, party + '\U0010ffff'])
+    if national_party is not None:
+        clauses.append("政党 = ?")
+        params.append(national_party)
+    if has_x is not None:
+        clauses.append("has_x = ?")
+        params.append(int(has_x))
+    sql = "SELECT * FROM councillors"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY id"
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
+    return conn.execute(sql, params).fetchall()
+
+
+def find_by_x_url(conn: sqlite3.Connection, url: str) -> List[sqlite3.Row]:
+    """X URLから議員を取得"""
+    return conn.execute("SELECT * FROM councillors WHERE x_url = ? ORDER BY id", (url,)).fetchall()
+
+
+def search(conn: sqlite3.Connection, text: str, limit: int = 20) -> List[sqlite3.Row]:
+    """氏名・登録名・よみを全文検索"""
+    terms = [t for t in text.replace('　', ' ').split(' ') if t]
+    if not terms:
+        return []
+    tokenizer = _meta(conn, 'tokenizer')
+    if tokenizer == 'trigram' and all(len(t) >= TRIGRAM_MIN_LENGTH for t in terms):
+        query = ' '.join('"' + t.replace('"', '""') + '"' for t in terms)
+        return conn.execute(
+            "SELECT c.* FROM councillors_fts JOIN councillors c ON c.id = councillors_fts.rowid"
+            " WHERE councillors_fts MATCH ? ORDER BY rank LIMIT ?",
+            (query, limit),
+        ).fetchall()
+    clauses = " AND ".join(["(氏名 LIKE ? OR 登録名 LIKE ? OR よみ LIKE ?)"] * len(terms))
+    params: List = []
+    for t in terms:
+        params.extend([f'%{t}%'] * 3)
+    return conn.execute(
+        f"SELECT * FROM councillors WHERE {clauses} ORDER BY id LIMIT ?", params + [limit]
+    ).fetchall()
+
+
+def print_rows(rows: Iterable[sqlite3.Row]):
+    count = 0
+    for row in rows:
+        count += 1
+        x_url = row['x_url'] or '-'
+        print(f"{row['prefecture']} {row['municipality_name']} {row['氏名']}（{row['よみ']}） - {row['所属']} {x_url}")
+    print(f"\n{count}件")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='議員データのSQLiteインデックス')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='インデックスを構築・更新')
+    build_parser.add_argument('--rebuild', action='store_true', help='最初から作り直す')
+
+    search_parser = subparsers.add_parser('search', help='氏名・よみで全文検索')
+    search_parser.add_argument('text')
+    search_parser.add_argument('--limit', type=int, default=20)
+
+    query_parser = subparsers.add_parser('query', help='条件で議員を検索')
+    query_parser.add_argument('--prefecture')
+    query_parser.add_argument('--municipality')
+    query_parser.add_argument('--party', help='所属（前方一致）')
+    query_parser.add_argument('--national-party', help='政党（会派名を正規化した政党名）')
+    x_group = query_parser.add_mutually_exclusive_group()
+    x_group.add_argument('--has-x', dest='has_x', action='store_true', default=None)
+    x_group.add_argument('--no-x', dest='has_x', action='store_false')
+    query_parser.add_argument('--limit', type=int)
+
+    x_parser = subparsers.add_parser('x', help='X URLから議員を検索')
+    x_parser.add_argument('url')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        stats = build_index(rebuild=args.rebuild)
+        print(f"インデックス: {index_path_for(DATA_DIR)}")
+        print(f"更新: {stats['updated']} / 削除: {stats['removed']} / 変更なし: {stats['unchanged']}")
+        return 0
+
+    conn = open_index()
+    try:
+        if args.command == 'search':
+            print_rows(search(conn, args.text, args.limit))
+        elif args.command == 'query':
+            print_rows(find_members(conn, args.prefecture, args.municipality, args.party,
+                                    args.has_x, args.limit, args.national_party))
+        elif args.command == 'x':
+            print_rows(find_by_x_url(conn, args.url))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+表記ゆれを考慮した重複議員の検出
+
+同じ人物が複数の自治体のファイル（または1つのファイルに2回）に登録されていないかを、
+よみの空白（全角・半角）やカタカナ/ひらがな、氏名の異体字（髙/高、﨑/崎 など）の違いを吸収して探す。
+全ての組み合わせは比較せず、次の2段階で候補を絞り込むため、議員数にほぼ比例した時間で終わる:
+- ブロッキング: 正規化したよみの先頭の文字が同じ議員だけを比較する
+- MinHash/LSH: 氏名・よみの文字bigramの集合からMinHashの署名を作り、署名の帯（band）の値が
+  1つでも一致した組だけを候補にする
+
+候補の組は文字bigram集合のJaccard係数で検証し、閾値以上の組を union-find でまとめたクラスタを
+類似度（クラスタ内の最も弱い結び付き）と一緒に報告する。同姓同名の別人も含まれうるため警告として扱う。
+
+使用方法:
+    python scripts/duplicates.py
+    （check_data_quality.py からも実行される）
+"""
+
+import sys
+import zlib
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from corpus import DATA_DIR, print_cache_stats
+from integrity import KATAKANA_TO_HIRAGANA, normalize_text
+from pipeline import Stage, run_pipeline
+
+# MinHashの署名の長さと帯の分け方（BANDS×ROWS = NUM_HASHES）
+# 帯が一致する確率が1/2になる類似度は (1/BANDS)^(1/ROWS) ≒ 0.35 で、閾値より十分低い
+NUM_HASHES = 16
+BANDS = 8
+ROWS = NUM_HASHES // BANDS
+# この類似度（Jaccard係数）以上の組を重複の候補とする
+SIMILARITY_THRESHOLD = 0.6
+# ブロッキングに使うよみの先頭の文字数
+BLOCK_PREFIX = 1
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_HASH_PARAMS = [((i * 0x9E3779B1 + 0x7F4A7C15) % _MERSENNE_PRIME | 1,
+                 (i * 0x85EBCA77 + 0x165667B1) % _MERSENNE_PRIME) for i in range(NUM_HASHES)]
+
+# 氏名の異体字（旧字体・俗字）→ 通用字体（NFKCで揃わないもの）
+VARIANT_KANJI = str.maketrans({
+    '髙': '高', '﨑': '崎', '嵜': '崎', '邊': '辺', '邉': '辺', '齋': '斎', '齊': '斉', '濵': '浜',
+    '濱': '浜', '德': '徳', '廣': '広', '澤': '沢', '櫻': '桜', '眞': '真', '國': '国', '惠': '恵',
+    '實': '実', '藏': '蔵', '冨': '富', '嶋': '島', '嶌': '島', '檜': '桧', '槇': '槙', '榮': '栄',
+    '黑': '黒', '關': '関', '圓': '円', '淸': '清', '靜': '静', '龍': '竜', '瀨': '瀬', '禮': '礼',
+    '壽': '寿', '來': '来',
+})
+
+
+def normalize_yomi(yomi) -> str:
+    """よみの比較用の文字列（NFKC・空白除去・カタカナをひらがなに揃える）"""
+    return normalize_text(yomi).translate(KATAKANA_TO_HIRAGANA)
+
+
+def normalize_name(name) -> str:
+    """氏名の比較用の文字列（NFKC・空白除去・異体字を通用字体に揃える）"""
+    return normalize_text(name).translate(VARIANT_KANJI)
+
+
+def shingles(name: str, yomi: str) -> FrozenSet[str]:
+    """氏名・よみの文字bigramの集合（1文字の場合はその文字）"""
+    result = set()
+    for prefix, text in (('n', name), ('y', yomi)):
+        if len(text) == 1:
+            result.add(prefix + text)
+        result.update(prefix + text[i:i + 2] for i in range(len(text) - 1))
+    return frozenset(result)
+
+
+def minhash(features: FrozenSet[str]) -> Tuple[int, ...]:
+    """MinHashの署名（文字列のハッシュは実行ごとに変わらないcrc32を使う）"""
+    hashes = [zlib.crc32(feature.encode('utf-8')) for feature in features]
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _HASH_PARAMS)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    intersection = len(a & b)
+    return intersection / (len(a) + len(b) - intersection)
+
+
+class DuplicateCluster:
+    """重複の可能性がある議員の組"""
+
+    __slots__ = ('score', 'entries')
+
+    def __init__(self, score: float, entries: List[str]):
+        self.score = score
+        self.entries = entries
+
+    def __str__(self):
+        return f"類似度 {self.score:.2f}: {', '.join(self.entries)}"
+
+    def __repr__(self):
+        return f'DuplicateCluster({self.score:.2f}, {self.entries!r})'
+
+
+class DuplicateIndex:
+    """よみの先頭でブロッキングし、ブロック内をLSHの帯で索引する"""
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.entries: List[str] = []
+        self.features: List[FrozenSet[str]] = []
+        self.buckets: Dict[Tuple[str, int, Tuple[int, ...]], List[int]] = {}
+        # 正規化後に完全に一致する議員は最初の1人だけを索引に入れ、組を直接記録する
+        self.first_by_features: Dict[FrozenSet[str], int] = {}
+        self.exact_pairs: List[Tuple[int, int]] = []
+
+    def add(self, muni):
+        """1ファイル分（Municipality / SourceFile / PipelineItem）を索引に追加"""
+        for i, member in enumerate(muni.members):
+            if not isinstance(member, dict):
+                continue
+            name = normalize_name(member.get('氏名'))
+            yomi = normalize_yomi(member.get('よみ'))
+            if not name:
+                continue
+            features = shingles(name, yomi)
+            index = len(self.entries)
+            self.entries.append(f"{muni.relpath}#/{i} ({member.get('氏名')})")
+            self.features.append(features)
+            first = self.first_by_features.setdefault(features, index)
+            if first != index:
+                self.exact_pairs.append((first, index))
+                continue
+            # よみのない議員は氏名の先頭でブロッキングする
+            block = yomi[:BLOCK_PREFIX] if yomi else 'n' + name[:BLOCK_PREFIX]
+            signature = minhash(features)
+            for band in range(BANDS):
+                key = (block, band, signature[band * ROWS:(band + 1) * ROWS])
+                self.buckets.setdefault(key, []).append(index)
+
+    def candidate_pairs(self):
+        """帯が一致した組（重複を除く、完全に一致する組を含む）"""
+        yield from self.exact_pairs
+        seen = set()
+        for members in self.buckets.values():
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    if (a, b) not in seen:
+                        seen.add((a, b))
+                        yield a, b
+
+    def clusters(self) -> List[DuplicateCluster]:
+        """類似度が閾値以上の組をまとめたクラスタ（最初に出現した議員の順）"""
+        parent = list(range(len(self.entries)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        weakest: Dict[int, float] = {}
+        edges = []
+        for a, b in self.candidate_pairs():
+            score = jaccard(self.features[a], self.features[b])
+            if score >= self.threshold:
+                edges.append((a, b, score))
+                root_a, root_b = find(a), find(b)
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        for a, _, score in edges:
+            root = find(a)
+            weakest[root] = min(score, weakest.get(root, score))
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(self.entries)):
+            root = find(i)
+            if root in weakest:
+                groups.setdefault(root, []).append(i)
+        return [DuplicateCluster(weakest[root], [self.entries[i] for i in members])
+                for root, members in sorted(groups.items())]
+
+
+class DuplicateStage(Stage):
+    """パイプラインのステージ: 表記ゆれを考慮して重複議員の候補を探す"""
+
+    name = 'duplicates'
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.index = DuplicateIndex(SIMILARITY_THRESHOLD if threshold is None else threshold)
+        self.clusters: List[DuplicateCluster] = []
+
+    def process(self, item, results):
+        self.index.add(item)
+
+    def finish(self):
+        self.clusters = self.index.clusters()
+        if self.clusters:
+            print(f"\n⚠️  {len(self.clusters)}組の重複候補が見つかりました:")
+            for cluster in self.clusters:
+                print(f"  - {cluster}")
+        else:
+            print("\n✅ 重複候補なし")
+
+
+def main():
+    stage = DuplicateStage()
+    run_pipeline([stage], DATA_DIR)
+    print_cache_stats(sys.argv[1:])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
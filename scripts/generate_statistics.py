@@ -1,101 +1,230 @@
 #!/usr/bin/env python3
 """
 統計情報を生成してMarkdown形式で出力するスクリプト
+
+集計は statistics_engine.py で行い、Markdownのほかに JSON・CSV でも出力できる。
+自治体ごとの集計値は statistics_store.py のストアに保存し、内容が変わった自治体だけを集計し直す。
+
+使用方法:
+    python scripts/generate_statistics.py                  # Markdown
+    python scripts/generate_statistics.py --format json    # 自治体・都道府県・政党・会派別の集計をJSONで
+    python scripts/generate_statistics.py --format csv     # 自治体ごとの集計をCSVで
 """
 
+import csv
+import io
 import json
-import glob
-from collections import defaultdict
+import sys
 from datetime import datetime
 
-def generate_statistics_markdown():
+from corpus import parse_workers_option, print_cache_stats
+from pipeline import Stage, run_pipeline
+from statistics_engine import CouncillorTable, StatisticsResult, count_municipalities
+from statistics_store import open_store
+
+FORMATS = ('markdown', 'json', 'csv')
+CSV_COLUMNS = ('自治体コード', '自治体名', '都道府県', '議員数', 'X登録数', '登録率')
+
+
+class StatisticsStage(Stage):
+    """パイプラインのステージ: 自治体ごとの議員数・X登録数・会派を集計する
+
+    ストアに同じ内容のファイルの集計値があればそれを使い、ない自治体だけを表にまとめて集計する。
+    """
+
+    name = 'stats'
+
+    def __init__(self, output=None, fmt='markdown', store=None):
+        self.table = CouncillorTable()
+        self.output = output
+        self.format = fmt
+        self.store = store
+        self.partials = []
+        self.relpaths = []
+        self.misses = []
+        self.result = None
+        self.markdown = None
+
+    def start(self, context):
+        if self.store is None:
+            self.store = open_store(context.data_dir)
+
+    def process(self, item, results):
+        partial = self.store.get(item.relpath, item.digest, item.path)
+        if partial is None:
+            self.misses.append((len(self.partials), item.relpath, item.digest, item.path))
+            self.table.add(item)
+        self.partials.append(partial)
+        self.relpaths.append(item.relpath)
+
+    def format_cache_stats(self):
+        return self.store.format_cache_stats()
+
+    def finish(self):
+        for (index, relpath, digest, path), counts in zip(self.misses, count_municipalities(self.table)):
+            self.partials[index] = counts
+            self.store.put(relpath, digest, counts, path)
+        # コーパスから消えたファイルのパーシャルは残さない
+        self.store.retain(self.relpaths)
+        self.store.save()
+        self.result = StatisticsResult(self.partials)
+        self.markdown = render_statistics_markdown(self.result)
+        if self.output is not None:
+            print(render_statistics(self.result, self.format, self.markdown), file=self.output)
+
+
+def parse_format_option(argv):
+    """コマンドライン引数から --format (markdown/json/csv) を取得"""
+    for i, arg in enumerate(argv):
+        if arg == '--format' and i + 1 < len(argv):
+            value = argv[i + 1]
+        elif arg.startswith('--format='):
+            value = arg.split('=', 1)[1]
+        else:
+            continue
+        if value not in FORMATS:
+            raise ValueError(f"--format は {', '.join(FORMATS)} のいずれかを指定してください")
+        return value
+    return 'markdown'
+
+
+def generate_statistics_markdown(workers=None):
     """統計情報のMarkdownを生成"""
-    stats = defaultdict(lambda: {"total": 0, "with_x": 0, "parties": defaultdict(int)})
-    
-    # 都道府県別ディレクトリに対応
-    json_files = glob.glob("data/processed/*.json")
-    json_files.extend(glob.glob("data/processed/*/*.json"))
-    
-    for filepath in sorted(json_files):
-        filename = filepath.split("/")[-1]
-        parts = filename.split("_")
-        code = parts[1]
-        municipality = parts[2].replace(".json", "")
-        
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
-        for member in data:
-            stats[municipality]["total"] += 1
-            stats[municipality]["code"] = code
-            
-            if member.get("X（旧Twitter）"):
-                stats[municipality]["with_x"] += 1
-            
-            party = member.get("所属", "不明")
-            stats[municipality]["parties"][party] += 1
-    
+    return generate_statistics(workers=workers)
+
+
+def generate_statistics(workers=None, fmt='markdown'):
+    """統計情報を指定の形式で生成"""
+    # 都道府県別ディレクトリに対応（共通スナップショットから読み込む）
+    stage = StatisticsStage(fmt=fmt)
+    run_pipeline([stage], workers=workers)
+    return render_statistics(stage.result, fmt, stage.markdown)
+
+
+def render_statistics(result, fmt, markdown=None):
+    if fmt == 'json':
+        return render_statistics_json(result)
+    if fmt == 'csv':
+        return render_statistics_csv(result)
+    return markdown if markdown is not None else render_statistics_markdown(result)
+
+
+def render_statistics_markdown(result):
+    """集計結果からMarkdownを生成"""
     # Markdown生成
     output = []
     output.append("# 議員データ統計レポート")
     output.append(f"\n生成日時: {datetime.now().strftime('%Y年%m月%d日 %H:%M')}")
-    
+
     # 全体統計
-    total_municipalities = len(stats)
-    total_members = sum(s["total"] for s in stats.values())
-    total_with_x = sum(s["with_x"] for s in stats.values())
-    
+    total_municipalities = len(result.municipalities)
+    total_members = result.total_members
+    total_with_x = result.total_with_x
+
     output.append("\n## 全体統計")
     output.append(f"- 収集自治体数: {total_municipalities}")
     output.append(f"- 総議員数: {total_members}名")
     output.append(f"- X登録議員数: {total_with_x}名 ({total_with_x/total_members*100:.1f}%)")
-    
+
+    # 政党統計（会派名を政党名に正規化して集計）
+    output.append("\n## 政党別統計")
+    output.append("| 政党 | 議員数 | 割合 | 会派数 |")
+    output.append("|------|--------|------|--------|")
+
+    for party, count in result.top_national_parties():
+        output.append(f"| {party} | {count} | {count/total_members*100:.1f}% | {len(result.party_groups[party])} |")
+
     # 会派統計
-    all_parties = defaultdict(int)
-    for muni_stats in stats.values():
-        for party, count in muni_stats["parties"].items():
-            all_parties[party] += count
-    
     output.append("\n## 会派別統計")
     output.append("| 会派名 | 議員数 | 割合 |")
     output.append("|--------|--------|------|")
-    
-    for party, count in sorted(all_parties.items(), key=lambda x: x[1], reverse=True)[:10]:
+
+    for party, count in result.top_parties():
         output.append(f"| {party} | {count} | {count/total_members*100:.1f}% |")
-    
+
     # X登録率ランキング
     output.append("\n## X登録率ランキング")
-    
+
     # TOP 10
     output.append("\n### TOP 10（登録率が高い自治体）")
     output.append("| 順位 | 自治体名 | 登録率 | 登録数/総数 |")
     output.append("|------|----------|--------|-------------|")
-    
-    ranked = sorted(
-        [(m, s["with_x"]/s["total"]*100 if s["total"] > 0 else 0, s) for m, s in stats.items()],
-        key=lambda x: x[1],
-        reverse=True
-    )
-    
-    for i, (muni, rate, s) in enumerate(ranked[:10], 1):
-        output.append(f"| {i} | {muni} | {rate:.1f}% | {s['with_x']}/{s['total']} |")
-    
+
+    municipalities = result.municipalities
+    for i, index in enumerate(result.top, 1):
+        s = municipalities[index]
+        output.append(f"| {i} | {s.name} | {s.rate:.1f}% | {s.with_x}/{s.total} |")
+
     # BOTTOM 10（0%を除く）
     output.append("\n### 改善が必要な自治体（登録率が低い、0%を除く）")
     output.append("| 順位 | 自治体名 | 登録率 | 登録数/総数 |")
     output.append("|------|----------|--------|-------------|")
-    
-    low_ranked = [x for x in ranked if x[1] > 0][-10:]
-    for i, (muni, rate, s) in enumerate(low_ranked, 1):
-        output.append(f"| {i} | {muni} | {rate:.1f}% | {s['with_x']}/{s['total']} |")
-    
+
+    for i, index in enumerate(result.bottom, 1):
+        s = municipalities[index]
+        output.append(f"| {i} | {s.name} | {s.rate:.1f}% | {s.with_x}/{s.total} |")
+
     # 登録率0%の自治体
-    zero_x = [x for x in ranked if x[1] == 0]
-    if zero_x:
-        output.append(f"\n### X登録率0%の自治体（{len(zero_x)}自治体）")
-        output.append(", ".join([x[0] for x in zero_x]))
-    
+    if result.zero:
+        output.append(f"\n### X登録率0%の自治体（{len(result.zero)}自治体）")
+        output.append(", ".join([municipalities[i].name for i in result.zero]))
+
     return "\n".join(output)
 
+
+def _counts_dict(c, **extra):
+    entry = dict(extra)
+    entry.update(total=c.total, with_x=c.with_x, rate=round(c.rate, 2))
+    return entry
+
+
+def render_statistics_json(result):
+    """集計結果をJSONで出力（自治体はファイル単位、都道府県・政党・会派別の集計と登録率の分布を含む）"""
+    total = result.total_members
+    payload = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'total': {
+            'municipalities': len(result.municipalities),
+            'members': total,
+            'with_x': result.total_with_x,
+            'rate': round(result.total_with_x / total * 100, 2) if total else 0,
+        },
+        'parties': [{'party': party, 'count': count, 'share': round(count / total * 100, 2)}
+                    for party, count in result.top_parties(len(result.parties))],
+        'national_parties': [{'party': party, 'count': count, 'share': round(count / total * 100, 2),
+                              'groups': result.party_groups[party]}
+                             for party, count in result.top_national_parties()],
+        'rate_percentiles': {f'p{p}': round(v, 2) for p, v in result.percentiles.items()},
+        'prefectures': [_counts_dict(c, prefecture=c.prefecture) for c in result.prefectures],
+        'municipalities': [
+            _counts_dict(c, code=c.code, name=c.name, prefecture=c.prefecture, parties=c.parties)
+            for c in result.files
+        ],
+        'ranking': {
+            'top': [result.municipalities[i].name for i in result.top],
+            'bottom': [result.municipalities[i].name for i in result.bottom],
+            'zero': [result.municipalities[i].name for i in result.zero],
+        },
+    }
+    return json.dumps(payload, ensure_ascii=False, indent=2)
+
+
+def render_statistics_csv(result):
+    """自治体（ファイル）ごとの集計をCSVで出力"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(CSV_COLUMNS)
+    for c in result.files:
+        writer.writerow((c.code, c.name, c.prefecture, c.total, c.with_x, f'{c.rate:.1f}'))
+    return buffer.getvalue().rstrip('\n')
+
+
 if __name__ == "__main__":
-    print(generate_statistics_markdown())
\ No newline at end of file
+    argv = sys.argv[1:]
+    try:
+        fmt = parse_format_option(argv)
+    except ValueError as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(generate_statistics(workers=parse_workers_option(argv), fmt=fmt))
+    print_cache_stats(argv)
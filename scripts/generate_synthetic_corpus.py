@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+全国47都道府県分の合成コーパスを生成するスクリプト（性能評価用）
+
+実データ（data/processed）から次の分布を取り、同じシードとスケールなら
+毎回同じ内容の 議員リスト_{code}_{name}.json を書き出す:
+- 自治体ごとの議員数・X登録の有無・所属（会派名に含まれる自治体名は合成した名前に置換）
+- 氏名・よみの姓と名（表記の区切り方も実データの自治体ごとの傾向に合わせる）
+- X URLのホスト（x.com / twitter.com）。ハンドルはよみのローマ字から作る
+
+スケール1で実際の自治体数（全国1741）、10で約1.7万、100で約17万ファイルになる。
+
+使用方法:
+    python scripts/generate_synthetic_corpus.py --scale 1
+    python scripts/generate_synthetic_corpus.py --scale 10 --output /tmp/synthetic
+    python scripts/generate_synthetic_corpus.py --scale 0.1 --seed 42 --force
+"""
+
+import argparse
+import json
+import random
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from corpus import DATA_DIR, ROOT_DIR, X_FIELD, load_corpus
+
+SYNTHETIC_DIR = ROOT_DIR / '.cache' / 'synthetic'
+GENERATOR_VERSION = 1
+DEFAULT_SEED = 20240101
+
+# (都道府県コード, 都道府県名, 自治体数（市区町村、東京23区を含む）)
+PREFECTURES = [
+    ('01', '北海道', 179), ('02', '青森県', 40), ('03', '岩手県', 33), ('04', '宮城県', 35),
+    ('05', '秋田県', 25), ('06', '山形県', 35), ('07', '福島県', 59), ('08', '茨城県', 44),
+    ('09', '栃木県', 25), ('10', '群馬県', 35), ('11', '埼玉県', 63), ('12', '千葉県', 54),
+    ('13', '東京都', 62), ('14', '神奈川県', 33), ('15', '新潟県', 30), ('16', '富山県', 15),
+    ('17', '石川県', 19), ('18', '福井県', 17), ('19', '山梨県', 27), ('20', '長野県', 77),
+    ('21', '岐阜県', 42), ('22', '静岡県', 35), ('23', '愛知県', 54), ('24', '三重県', 29),
+    ('25', '滋賀県', 19), ('26', '京都府', 26), ('27', '大阪府', 43), ('28', '兵庫県', 41),
+    ('29', '奈良県', 39), ('30', '和歌山県', 30), ('31', '鳥取県', 19), ('32', '島根県', 19),
+    ('33', '岡山県', 27), ('34', '広島県', 23), ('35', '山口県', 19), ('36', '徳島県', 24),
+    ('37', '香川県', 17), ('38', '愛媛県', 20), ('39', '高知県', 34), ('40', '福岡県', 60),
+    ('41', '佐賀県', 20), ('42', '長崎県', 21), ('43', '熊本県', 45), ('44', '大分県', 18),
+    ('45', '宮崎県', 26), ('46', '鹿児島県', 43), ('47', '沖縄県', 41),
+]
+
+MUNICIPALITY_SUFFIXES = ('市', '町', '村', '区')
+
+# ヘボン式の簡易ローマ字表（Xハンドルの生成用）
+ROMAJI = dict(zip(
+    'あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわをんがぎぐげござじずぜぞだぢづでどばびぶべぼぱぴぷぺぽぁぃぅぇぉ',
+    'a i u e o ka ki ku ke ko sa shi su se so ta chi tsu te to na ni nu ne no ha hi fu he ho '
+    'ma mi mu me mo ya yu yo ra ri ru re ro wa wo n ga gi gu ge go za ji zu ze zo da ji zu de do '
+    'ba bi bu be bo pa pi pu pe po a i u e o'.split()
+))
+ROMAJI_DIGRAPHS = {'ゃ': 'ya', 'ゅ': 'yu', 'ょ': 'yo'}
+
+
+def romanize(kana: str) -> str:
+    """ひらがなをローマ字に変換（変換できない文字は除く）"""
+    result = []
+    double_next = False
+    for ch in kana:
+        if ch == 'っ':
+            double_next = True
+            continue
+        if ch in ROMAJI_DIGRAPHS and result:
+            prev = result.pop()
+            prefix = prev[:-1] if prev not in ('a', 'i', 'u', 'e', 'o') else prev
+            if prefix.endswith(('sh', 'ch', 'j')):
+                result.append(prefix + ROMAJI_DIGRAPHS[ch][1:])
+            else:
+                result.append(prefix + ROMAJI_DIGRAPHS[ch])
+            continue
+        if ch == 'ー':
+            continue
+        roman = ROMAJI.get(ch)
+        if roman is None:
+            continue
+        if double_next and roman[0] not in 'aiueon':
+            roman = roman[0] + roman
+        double_next = False
+        result.append(roman)
+    return ''.join(result)
+
+
+def check_digit(body: str) -> str:
+    """全国地方公共団体コードの検査数字（桁数が多い合成コードにも同じ計算を使う）"""
+    weights = range(len(body) + 1, 1, -1)
+    remainder = sum(int(d) * w for d, w in zip(body, weights)) % 11
+    return str((11 - remainder) % 10)
+
+
+def municipality_code(prefecture_code: str, serial: int, width: int) -> str:
+    body = f"{prefecture_code}{serial:0{width}d}"
+    return body + check_digit(body)
+
+
+def _split_name(text: str) -> Tuple[Optional[List[str]], str]:
+    """氏名・よみを (姓, 名) と区切り文字に分ける"""
+    for sep in ('　', ' '):
+        parts = text.split(sep)
+        if len(parts) == 2 and all(parts):
+            return parts, sep
+    return None, ''
+
+
+class CorpusProfile:
+    """実データから取った分布"""
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.surnames: List[Tuple[str, str]] = []
+        self.given_names: List[Tuple[str, str]] = []
+        self.templates: List[Dict] = []
+        self.name_chars: List[str] = []
+        self.suffixes: List[str] = []
+
+        for muni in load_corpus(data_dir):
+            if not muni.name:
+                continue
+            stem = muni.name.rstrip(''.join(MUNICIPALITY_SUFFIXES))
+            self.name_chars.extend(stem)
+            if muni.name[-1] in MUNICIPALITY_SUFFIXES:
+                self.suffixes.append(muni.name[-1])
+
+            members = []
+            for councillor in muni.councillors:
+                name_parts, name_sep = _split_name(councillor.name or '')
+                yomi_parts, yomi_sep = _split_name(councillor.yomi or '')
+                if name_parts and yomi_parts:
+                    self.surnames.append((name_parts[0], yomi_parts[0]))
+                    self.given_names.append((name_parts[1], yomi_parts[1]))
+                party = councillor.party or ''
+                if muni.name in party:
+                    party = party.replace(muni.name, '{name}')
+                elif stem and stem in party:
+                    party = party.replace(stem, '{stem}')
+                members.append({
+                    'name_sep': name_sep,
+                    'yomi_sep': yomi_sep,
+                    'same_registered': councillor.registered_name == councillor.name,
+                    'x_host': councillor.x_url.rsplit('/', 1)[0] if councillor.has_x else None,
+                    'party': party,
+                })
+            if members:
+                self.templates.append({'members': members})
+
+        if not self.templates or not self.surnames or not self.given_names:
+            raise ValueError(f'{data_dir} に分布を取れる議員データがありません')
+        if not self.suffixes:
+            self.suffixes = ['市']
+
+
+class SyntheticGenerator:
+    """都道府県ごとに独立した乱数で合成コーパスを生成する"""
+
+    def __init__(self, profile: CorpusProfile, scale: float, seed: int = DEFAULT_SEED):
+        self.profile = profile
+        self.scale = scale
+        self.seed = seed
+
+    def municipality_count(self, base_count: int) -> int:
+        return max(1, round(base_count * self.scale))
+
+    def _municipality_name(self, rng: random.Random, used: set) -> str:
+        chars = self.profile.name_chars
+        for length in (2, 2, 2, 3, 3, 4):
+            name = ''.join(rng.choice(chars) for _ in range(length)) + rng.choice(self.profile.suffixes)
+            if name not in used:
+                used.add(name)
+                return name
+        name = f"{name[:-1]}{len(used)}{name[-1]}"
+        used.add(name)
+        return name
+
+    def _handle(self, rng: random.Random, surname_yomi: str, given_yomi: str, used: set) -> str:
+        surname, given = romanize(surname_yomi), romanize(given_yomi)
+        pattern = rng.randrange(4)
+        if pattern == 0:
+            handle = f"{surname}_{given}"
+        elif pattern == 1:
+            handle = f"{given}{surname}"
+        elif pattern == 2:
+            handle = f"{surname.capitalize()}{given.capitalize()}"
+        else:
+            handle = f"{surname}{given}{rng.randrange(1, 100)}"
+        handle = handle[:15] or 'user'
+        base = handle
+        while handle.lower() in used:
+            handle = f"{base[:12]}{rng.randrange(1000)}"
+        used.add(handle.lower())
+        return handle
+
+    def _member(self, rng: random.Random, template: Dict, name: str, stem: str, handles: set) -> Dict:
+        surname, surname_yomi = rng.choice(self.profile.surnames)
+        given, given_yomi = rng.choice(self.profile.given_names)
+        full_name = f"{surname}{template['name_sep']}{given}"
+        registered = full_name if template['same_registered'] else f"{surname}{template['name_sep']}{given_yomi}"
+        x_url = None
+        if template['x_host']:
+            x_url = f"{template['x_host']}/{self._handle(rng, surname_yomi, given_yomi, handles)}"
+        return {
+            '氏名': full_name,
+            '登録名': registered,
+            'よみ': f"{surname_yomi}{template['yomi_sep']}{given_yomi}",
+            X_FIELD: x_url,
+            '所属': template['party'].replace('{name}', name).replace('{stem}', stem),
+        }
+
+    def generate_prefecture(self, prefecture_code: str, base_count: int,
+                            handles: set) -> List[Tuple[str, str, List[Dict]]]:
+        """1都道府県分の (自治体コード, 自治体名, 議員データ) を生成
+
+        handlesは生成済みのXハンドル（全国で重複しないよう都道府県をまたいで共有する）
+        """
+        rng = random.Random(f"{self.seed}:{self.scale}:{prefecture_code}")
+        count = self.municipality_count(base_count)
+        width = max(3, len(str(count)))
+        used_names: set = set()
+        result = []
+        for serial in range(1, count + 1):
+            code = municipality_code(prefecture_code, serial, width)
+            name = self._municipality_name(rng, used_names)
+            stem = name[:-1]
+            template = rng.choice(self.profile.templates)
+            members = [self._member(rng, t, name, stem, handles) for t in template['members']]
+            result.append((code, name, members))
+        return result
+
+    def write(self, output_dir: Path) -> Dict:
+        """output_dir/processed 以下に書き出し、生成情報を返す"""
+        processed_dir = output_dir / 'processed'
+        if processed_dir.exists():
+            shutil.rmtree(processed_dir)
+        totals = {'municipalities': 0, 'councillors': 0, 'with_x': 0}
+        handles: set = set()
+        for prefecture_code, prefecture_name, base_count in PREFECTURES:
+            pref_dir = processed_dir / f"{prefecture_code}_{prefecture_name}"
+            pref_dir.mkdir(parents=True)
+            for code, name, members in self.generate_prefecture(prefecture_code, base_count, handles):
+                path = pref_dir / f"議員リスト_{code}_{name}.json"
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(members, f, ensure_ascii=False, indent=2)
+                totals['municipalities'] += 1
+                totals['councillors'] += len(members)
+                totals['with_x'] += sum(1 for m in members if m[X_FIELD])
+        info = {'version': GENERATOR_VERSION, 'seed': self.seed, 'scale': self.scale, **totals}
+        with open(output_dir / 'synthetic.json', 'w', encoding='utf-8') as f:
+            json.dump(info, f, ensure_ascii=False, indent=2)
+        return info
+
+
+def synthetic_dir_for(scale: float) -> Path:
+    return SYNTHETIC_DIR / f"{scale:g}x"
+
+
+def ensure_synthetic_corpus(scale: float, output_dir: Optional[Path] = None, seed: int = DEFAULT_SEED,
+                            force: bool = False, data_dir: Path = DATA_DIR) -> Tuple[Path, Dict]:
+    """合成コーパスがなければ生成し、(processedディレクトリ, 生成情報) を返す"""
+    output_dir = Path(output_dir) if output_dir else synthetic_dir_for(scale)
+    info_path = output_dir / 'synthetic.json'
+    if not force and info_path.exists():
+        with open(info_path, encoding='utf-8') as f:
+            info = json.load(f)
+        if (info.get('version'), info.get('seed'), info.get('scale')) == (GENERATOR_VERSION, seed, scale):
+            return output_dir / 'processed', info
+    output_dir.mkdir(parents=True, exist_ok=True)
+    info = SyntheticGenerator(CorpusProfile(data_dir), scale, seed).write(output_dir)
+    return output_dir / 'processed', info
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='全国47都道府県分の合成コーパスを生成')
+    parser.add_argument('--scale', type=float, default=1.0, help='実際の自治体数に対する倍率（既定: 1）')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--output', type=Path, help='出力先（既定: .cache/synthetic/{scale}x）')
+    parser.add_argument('--force', action='store_true', help='既に生成済みでも作り直す')
+    args = parser.parse_args(argv)
+
+    processed_dir, info = ensure_synthetic_corpus(args.scale, args.output, args.seed, args.force)
+    print(f"合成コーパス: {processed_dir}")
+    print(f"自治体数: {info['municipalities']}, 議員数: {info['councillors']}, "
+          f"X登録: {info['with_x']} ({info['with_x'] / max(info['councillors'], 1) * 100:.1f}%)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
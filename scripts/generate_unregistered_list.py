@@ -1,72 +1,42 @@
 #!/usr/bin/env python3
-import json
 from pathlib import Path
 from collections import defaultdict
 
-def load_json_file(file_path):
-    """JSONファイルを読み込む"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+from councillor_index import find_members, open_index
+from pipeline import Stage
 
-def get_municipality_info(json_path):
-    """ファイル名から自治体情報を取得"""
-    # ファイル名: 議員リスト_自治体コード_自治体名.json
-    filename = json_path.stem
-    parts = filename.split('_')
-    
-    if len(parts) >= 3:
-        code = parts[1]
-        municipality_name = parts[2]
-        
-        # 都道府県コードから都道府県名を取得
-        prefecture_code = code[:2]
-        prefecture_map = {
-            "11": "埼玉県",
-            "13": "東京都"
-        }
-        prefecture = prefecture_map.get(prefecture_code, f"{prefecture_code}_不明")
-        
-        return prefecture, municipality_name
-    
-    return "不明", "不明"
+# データディレクトリのパス
+DATA_DIR = Path(__file__).parent.parent / "data" / "processed"
+OUTPUT_FILE = Path(__file__).parent.parent / "manual_search" / "x未登録議員一覧.txt"
 
-def main():
-    # データディレクトリのパス
-    data_dir = Path(__file__).parent.parent / "data" / "processed"
-    output_file = Path(__file__).parent.parent / "manual_search" / "x未登録議員一覧.txt"
-    
-    # 都道府県別・自治体別にデータを整理
+def get_prefecture_name(code):
+    """自治体コードから都道府県名を取得"""
+    prefecture_code = code[:2]
+    prefecture_map = {
+        "11": "埼玉県",
+        "13": "東京都"
+    }
+    return prefecture_map.get(prefecture_code, f"{prefecture_code}_不明")
+
+def collect_unregistered(rows):
+    """(自治体コード, 自治体名, 氏名, よみ, 所属) の一覧を都道府県別・自治体別に整理"""
     unregistered_by_location = defaultdict(lambda: defaultdict(list))
-    total_members = 0
-    total_unregistered = 0
-    
-    # すべてのJSONファイルを処理
-    for json_file in sorted(data_dir.glob("**/議員リスト_*.json")):
-        # CSVファイルをスキップ
-        if json_file.suffix != '.json':
-            continue
-            
-        data = load_json_file(json_file)
-        
-        # 自治体情報を取得
-        prefecture, municipality_name = get_municipality_info(json_file)
+    for code, municipality_name, name, reading, party in rows:
+        # 議員情報を整理
+        name = name or ""
+        reading = reading or ""
+        party = party if party is not None else "無所属"
         
-        # 議員データを処理（dataはリスト形式）
-        for member in data:
-            total_members += 1
-            
-            # X_accountが未登録の議員を抽出
-            x_account = member.get("X（旧Twitter）", "")
-            if not x_account or x_account == "null":
-                total_unregistered += 1
-                
-                # 議員情報を整理
-                name = member.get("氏名", "")
-                reading = member.get("よみ", "")
-                party = member.get("所属", "無所属")
-                
-                member_info = f"{name}（{reading}） - {party}"
-                unregistered_by_location[prefecture][municipality_name].append(member_info)
+        member_info = f"{name}（{reading}） - {party}"
+        prefecture = get_prefecture_name(code)
+        unregistered_by_location[prefecture][municipality_name].append(member_info)
+    return unregistered_by_location
+
+def write_unregistered_list(output_file, total_members, unregistered_rows):
+    """X未登録議員一覧を書き出す"""
+    # 都道府県別・自治体別にデータを整理
+    unregistered_by_location = collect_unregistered(unregistered_rows)
+    total_unregistered = len(unregistered_rows)
     
     # ファイルに出力
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -101,5 +71,42 @@ def main():
     print(f"総議員数: {total_members}名")
     print(f"X未登録議員数: {total_unregistered}名 ({total_unregistered/total_members*100:.1f}%)")
 
+class UnregisteredStage(Stage):
+    """パイプラインのステージ: X未登録の議員を集めて一覧を書き出す"""
+    
+    name = 'unregistered'
+    
+    def __init__(self, output_file=OUTPUT_FILE):
+        self.output_file = output_file
+        self.total_members = 0
+        self.rows = []
+    
+    def process(self, item, results):
+        # 議員インデックスと同じく、自治体コードがあり読み込めたファイルだけを対象にする
+        if not item.code or item.error:
+            return
+        for councillor in item.councillors:
+            self.total_members += 1
+            if not councillor.has_x:
+                self.rows.append((item.code, item.name, councillor.name,
+                                  councillor.yomi, councillor.party))
+    
+    def finish(self):
+        write_unregistered_list(self.output_file, self.total_members, self.rows)
+
+def main():
+    # 議員インデックスからX未登録の議員を取得
+    conn = open_index(DATA_DIR)
+    try:
+        total_members = conn.execute("SELECT COUNT(*) FROM councillors").fetchone()[0]
+        unregistered = [
+            (row["municipality_code"], row["municipality_name"], row["氏名"], row["よみ"], row["所属"])
+            for row in find_members(conn, has_x=False)
+        ]
+    finally:
+        conn.close()
+    
+    write_unregistered_list(OUTPUT_FILE, total_members, unregistered)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
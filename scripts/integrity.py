@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+ファイルをまたぐ整合性チェック
+
+1ファイルずつのスキーマ検証では見つからない、コーパス全体での不変条件を確認する。
+X URL・氏名+よみの正規化キー・自治体コードのハッシュ索引を作りながら全議員を
+1回だけ走査するため、処理時間は議員数に比例する（全組み合わせの比較はしない）。
+
+チェック内容:
+- 同じX URLが複数の議員に登録されている（エラー）
+- ファイル名の自治体コードが都道府県ディレクトリと一致しない（エラー）
+- 同じ自治体コードのファイルが複数ある（エラー）
+- 同じ氏名+よみの議員が複数の自治体にいる（警告。同姓同名の可能性があるため）
+
+衝突は1件ずつではなく、同じキーを持つ全ての議員・ファイルをまとめた組として報告する。
+議員の位置は「ファイルの相対パス#JSONポインタ」（例: 13_東京都/議員リスト_….json#/3）で示す。
+
+ファイルごとの比較用キーは内容のハッシュごとに .cache/corpus/integrity.bin へキャッシュするため、
+validate_data.py で検証結果キャッシュに当たったファイルは議員データを復元せずに済む。
+
+使用方法:
+    python scripts/integrity.py
+    （validate_data.py と check_data_quality.py からも実行される）
+"""
+
+import marshal
+import os
+import re
+import sys
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from corpus import DATA_DIR, cache_path_for, print_cache_stats
+from pipeline import Stage, run_pipeline
+
+X_URL_RE = re.compile(r'^https?://(?:www\.|mobile\.)?(?:x|twitter)\.com/([A-Za-z0-9_]+)/?(?:[?#].*)?$', re.I)
+KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+# キーのキャッシュの形式（キーの作り方を変えたら上げる）
+KEY_CACHE_VERSION = 1
+
+# 種類ごとの (重大度, 見出し)。レポートはこの順に並べる
+KINDS = {
+    'x_url': ('error', '同じX URLが複数の議員に登録されています'),
+    'prefecture': ('error', '自治体コードが都道府県ディレクトリと一致しません'),
+    'code': ('error', '同じ自治体コードのファイルが複数あります'),
+    'name': ('warning', '同じ氏名+よみの議員が複数の自治体にいます'),
+}
+
+
+def x_url_key(url) -> Optional[str]:
+    """X URLの比較用キー（x.com/twitter.comの違い・大文字小文字・末尾のスラッシュを無視）"""
+    if not isinstance(url, str) or not url or url == 'null':
+        return None
+    match = X_URL_RE.match(url.strip())
+    if match:
+        return 'x.com/' + match.group(1).lower()
+    return url.strip().rstrip('/').lower()
+
+
+def normalize_text(value) -> str:
+    """NFKC正規化して空白（全角を含む）を除く"""
+    if not isinstance(value, str):
+        return ''
+    if not unicodedata.is_normalized('NFKC', value):
+        value = unicodedata.normalize('NFKC', value)
+    return ''.join(value.split())
+
+
+def name_key(name, yomi) -> Optional[str]:
+    """氏名+よみの比較用キー（よみはカタカナをひらがなに揃える）"""
+    name = normalize_text(name)
+    yomi = normalize_text(yomi).translate(KATAKANA_TO_HIRAGANA)
+    if not name or not yomi:
+        return None
+    return f'{name}/{yomi}'
+
+
+def file_keys(members) -> Tuple[List[Tuple[int, str, str]], List[Tuple[int, str]]]:
+    """1ファイル分の比較用キー ([(番号, 氏名, X URLキー)], [(番号, 氏名+よみキー)])"""
+    x_keys = []
+    name_keys = []
+    for i, member in enumerate(members):
+        if not isinstance(member, dict):
+            continue
+        label = member.get('氏名')
+        x_key = x_url_key(member.get('X（旧Twitter）'))
+        if x_key is not None:
+            x_keys.append((i, label, x_key))
+        n_key = name_key(label, member.get('よみ'))
+        if n_key is not None:
+            name_keys.append((i, n_key))
+    return x_keys, name_keys
+
+
+def load_keys(path) -> Dict[str, tuple]:
+    """キーのキャッシュ {内容のハッシュ: file_keys()の結果} を読み込む"""
+    try:
+        with open(path, 'rb') as f:
+            payload = marshal.load(f)
+    except (OSError, ValueError, EOFError, TypeError):
+        return {}
+    if not isinstance(payload, dict) or payload.get('version') != KEY_CACHE_VERSION:
+        return {}
+    return payload['keys']
+
+
+def save_keys(path, keys: Dict[str, tuple]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        marshal.dump({'version': KEY_CACHE_VERSION, 'keys': keys}, f)
+    os.replace(tmp_path, path)
+
+
+class Collision:
+    """同じキーを持つ議員・ファイルの組"""
+
+    __slots__ = ('kind', 'key', 'entries')
+
+    def __init__(self, kind: str, key: str, entries: List[str]):
+        self.kind = kind
+        self.key = key
+        self.entries = entries
+
+    @property
+    def severity(self) -> str:
+        return KINDS[self.kind][0]
+
+    def __str__(self):
+        return f"{self.key}: {', '.join(self.entries)}"
+
+    def __repr__(self):
+        return f'Collision({self.kind!r}, {self.key!r}, {self.entries!r})'
+
+
+class IntegrityIndex:
+    """X URL・氏名+よみ・自治体コードのハッシュ索引"""
+
+    def __init__(self):
+        self.x_urls: Dict[str, List[Tuple[str, str]]] = {}
+        self.names: Dict[str, List[Tuple[str, str]]] = {}
+        self.codes: Dict[str, List[str]] = {}
+        self.prefecture_mismatches: List[Collision] = []
+
+    def add(self, muni, keys=None):
+        """1ファイル分（Municipality / SourceFile / PipelineItem）を索引に追加
+
+        keys（file_keys()の結果）を渡した場合は議員データを読まない。
+        """
+        relpath = muni.relpath
+        if muni.code:
+            self.codes.setdefault(muni.code, []).append(relpath)
+            prefix = muni.prefecture.split('_', 1)[0]
+            if muni.prefecture and prefix != muni.code[:2]:
+                self.prefecture_mismatches.append(
+                    Collision('prefecture', f'{muni.code}（{muni.prefecture}）', [relpath])
+                )
+
+        x_keys, name_keys = file_keys(muni.members) if keys is None else keys
+        for i, label, x_key in x_keys:
+            self.x_urls.setdefault(x_key, []).append((f"{relpath}#/{i}", label))
+        for i, n_key in name_keys:
+            self.names.setdefault(n_key, []).append((f"{relpath}#/{i}", muni.code or relpath))
+
+    def collisions(self) -> List[Collision]:
+        """全ての衝突を種類順・出現順に返す"""
+        result = []
+        for key, members in self.x_urls.items():
+            if len(members) > 1:
+                result.append(Collision('x_url', key, [f'{loc} ({label})' for loc, label in members]))
+        result.extend(self.prefecture_mismatches)
+        for code, relpaths in self.codes.items():
+            if len(relpaths) > 1:
+                result.append(Collision('code', code, list(relpaths)))
+        for key, members in self.names.items():
+            # 同じ自治体内で同じキーが重なっているだけの組は対象外
+            if len({muni for _, muni in members}) > 1:
+                result.append(Collision('name', key, [loc for loc, _ in members]))
+        order = list(KINDS)
+        result.sort(key=lambda c: order.index(c.kind))
+        return result
+
+
+def format_collisions(collisions: List[Collision]) -> List[str]:
+    """種類ごとの見出しと衝突の組の行"""
+    lines = []
+    for kind, (_, title) in KINDS.items():
+        group = [c for c in collisions if c.kind == kind]
+        if group:
+            lines.append(f"{title}（{len(group)}組）")
+            lines.extend(f"  - {c}" for c in group)
+    return lines
+
+
+class IntegrityStage(Stage):
+    """パイプラインのステージ: ファイルをまたぐ整合性を検証する
+
+    ファイルごとのキーは内容のハッシュをキーにキャッシュし、内容が変わったファイルだけ議員データを読む。
+    """
+
+    name = 'integrity'
+    gate = True
+
+    def __init__(self, cache_path=None):
+        self.index = IntegrityIndex()
+        self.collisions: List[Collision] = []
+        self.cache_path = cache_path
+        self.cached: Dict[str, tuple] = {}
+        self.keys: Dict[str, tuple] = {}
+        self.cache_hits = 0
+        self.computed = 0
+        self.exit_code = 0
+
+    def start(self, context):
+        if self.cache_path is None:
+            self.cache_path = cache_path_for(context.data_dir, 'integrity', '.bin')
+        self.cached = load_keys(self.cache_path)
+
+    def process(self, item, results):
+        keys = self.cached.get(item.digest) if item.digest else None
+        if keys is None:
+            keys = file_keys(item.members)
+            self.computed += 1
+        else:
+            self.cache_hits += 1
+        if item.digest:
+            self.keys[item.digest] = keys
+        self.index.add(item, keys)
+
+    def finish(self):
+        # 今回のコーパスに含まれるファイルのキーだけを残す
+        if self.keys != self.cached:
+            save_keys(self.cache_path, self.keys)
+        self.collisions = self.index.collisions()
+        errors = [c for c in self.collisions if c.severity == 'error']
+        warnings = [c for c in self.collisions if c.severity == 'warning']
+        if errors:
+            print(f"\n❌ Found {len(errors)} cross-file errors:")
+            for line in format_collisions(errors):
+                print(f"  {line}")
+        if warnings:
+            print(f"\n⚠️  Found {len(warnings)} cross-file warnings:")
+            for line in format_collisions(warnings):
+                print(f"  {line}")
+        if not self.collisions:
+            print("\n✅ No cross-file conflicts")
+        self.exit_code = 1 if errors else 0
+
+
+def main():
+    stage = IntegrityStage()
+    run_pipeline([stage], DATA_DIR)
+    print_cache_stats(sys.argv[1:])
+    return stage.exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+議員データのスキーマ移行ツール
+
+data/processed 以下の全ての 議員リスト_*.json を、あるスキーマバージョンから次の
+バージョンへ一括で書き換える。バージョン間の変更は MIGRATIONS にフィールド変換の
+並びとして宣言し、途中のバージョンがあれば順に適用する。
+
+処理の流れ:
+1. 全ファイルを並列に読み込み、宣言された変換を適用する（変換は議員ごとに独立）
+2. 変換後の内容を移行先のスキーマで検証する
+3. 1件でも不適合があれば何も書き込まずに終了する
+4. 内容が変わるファイルだけを一時ファイル + os.replace で並列に書き換える
+   （読み込み後に別の更新が入ったファイルは上書きしない）
+
+書式（インデント2・ensure_ascii=False・末尾の改行の有無）は元のファイルに合わせるため、
+変換で変わらない議員の行は差分に出ない。
+
+使用方法:
+    python scripts/migrate_schema.py --dry-run          # v1.1 → v1.2 の変更内容を表示
+    python scripts/migrate_schema.py --dry-run --diff   # ファイルごとの差分も表示
+    python scripts/migrate_schema.py                    # 検証して書き換える
+    python scripts/migrate_schema.py --from 1.1 --to 1.2 --workers 8
+"""
+
+import argparse
+import difflib
+import hashlib
+import io
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from corpus import (DATA_DIR, PROCESS_POOL_MIN_BYTES, ROOT_DIR, default_workers,
+                    iter_source_files)
+from councillor import V12_FIELDS, X_FIELD
+from integrity import X_URL_RE
+from stream_validator import load_stream_validator
+
+SCHEMA_DIR = ROOT_DIR / 'schema'
+VERSIONS = ('1.1', '1.2')
+
+
+def schema_path_for(version: str) -> Path:
+    return SCHEMA_DIR / f'municipal_councillor_v{version}.json'
+
+
+def normalize_x_url(value):
+    """X URLを https://x.com/ハンドル の形に揃える（揃えられない値はそのまま返す）"""
+    if not isinstance(value, str):
+        return value
+    if not value.strip() or value == 'null':
+        return None
+    match = X_URL_RE.match(value.strip())
+    if match:
+        return f'https://x.com/{match.group(1)}'
+    return value
+
+
+class Transform:
+    """議員1人分のdictに対するフィールド変換
+
+    apply() は変換後のdictを返す（変更がなければ同じオブジェクトを返してよい）。
+    describe() はdry-runの集計に使う説明。
+    """
+
+    def apply(self, member: Dict) -> Dict:
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        raise NotImplementedError
+
+
+class AddField(Transform):
+    """フィールドがなければ既定値で追加"""
+
+    def __init__(self, field: str, default=None):
+        self.field = field
+        self.default = default
+
+    def apply(self, member):
+        if self.field in member:
+            return member
+        member = dict(member)
+        member[self.field] = self.default
+        return member
+
+    def describe(self):
+        return f'{self.field} を追加（既定値 {json.dumps(self.default, ensure_ascii=False)}）'
+
+
+class DropField(Transform):
+    """フィールドを削除"""
+
+    def __init__(self, field: str):
+        self.field = field
+
+    def apply(self, member):
+        if self.field not in member:
+            return member
+        return {k: v for k, v in member.items() if k != self.field}
+
+    def describe(self):
+        return f'{self.field} を削除'
+
+
+class RenameField(Transform):
+    """フィールド名を変更（移行先の名前が既にあれば元のフィールドを残す）"""
+
+    def __init__(self, old: str, new: str):
+        self.old = old
+        self.new = new
+
+    def apply(self, member):
+        if self.old not in member or self.new in member:
+            return member
+        return {(self.new if k == self.old else k): v for k, v in member.items()}
+
+    def describe(self):
+        return f'{self.old} を {self.new} に名前変更'
+
+
+class MapField(Transform):
+    """フィールドの値を関数で変換"""
+
+    def __init__(self, field: str, func, description: str):
+        self.field = field
+        self.func = func
+        self.description = description
+
+    def apply(self, member):
+        if self.field not in member:
+            return member
+        value = self.func(member[self.field])
+        if value == member[self.field] and type(value) is type(member[self.field]):
+            return member
+        member = dict(member)
+        member[self.field] = value
+        return member
+
+    def describe(self):
+        return f'{self.field}: {self.description}'
+
+
+class OrderFields(Transform):
+    """フィールドを指定の順に並べる（指定にないフィールドは元の順で後ろに残す）"""
+
+    def __init__(self, fields: Tuple[str, ...]):
+        self.fields = fields
+
+    def apply(self, member):
+        ordered = [k for k in self.fields if k in member]
+        ordered += [k for k in member if k not in self.fields]
+        if ordered == list(member):
+            return member
+        return {k: member[k] for k in ordered}
+
+    def describe(self):
+        return f"フィールドを {'・'.join(self.fields)} の順に並べ替え"
+
+
+# (移行元, 移行先) ごとの変換。VERSIONS の隣り合うバージョンについて宣言する
+MIGRATIONS: Dict[Tuple[str, str], List[Transform]] = {
+    ('1.1', '1.2'): [
+        AddField(X_FIELD, None),
+        MapField(X_FIELD, normalize_x_url, 'URLを https://x.com/ハンドル の形に統一'),
+        DropField('公式サイトアドレス'),
+        DropField('リンク'),
+        OrderFields(V12_FIELDS),
+    ],
+}
+
+
+def migration_steps(from_version: str, to_version: str) -> List[Tuple[str, str]]:
+    """from_version から to_version までの (移行元, 移行先) の並び"""
+    if from_version not in VERSIONS or to_version not in VERSIONS:
+        raise ValueError(f"未対応のバージョンです（対応: {', '.join(VERSIONS)}）")
+    start, end = VERSIONS.index(from_version), VERSIONS.index(to_version)
+    if start >= end:
+        raise ValueError(f'v{from_version} から v{to_version} へは移行できません（上位バージョンへの移行のみ）')
+    return [(VERSIONS[i], VERSIONS[i + 1]) for i in range(start, end)]
+
+
+def migration_transforms(from_version: str, to_version: str) -> List[Transform]:
+    transforms = []
+    for step in migration_steps(from_version, to_version):
+        transforms.extend(MIGRATIONS[step])
+    return transforms
+
+
+def detect_format(text: str) -> Tuple[Optional[int], bool]:
+    """元のファイルの (インデント幅, 末尾の改行の有無)。1行で書かれていればインデントはNone"""
+    trailing_newline = text.endswith('\n')
+    for line in text.splitlines()[1:]:
+        stripped = line.lstrip(' ')
+        if stripped:
+            return (len(line) - len(stripped)) or None, trailing_newline
+    return None, trailing_newline
+
+
+def dump_document(document, indent: Optional[int], trailing_newline: bool) -> str:
+    text = json.dumps(document, ensure_ascii=False, indent=indent)
+    return text + '\n' if trailing_newline else text
+
+
+def migrate_document(document: List, transforms: List[Transform]) -> Tuple[List, Counter]:
+    """議員の並びに変換を適用し (変換後の内容, 変換ごとの適用件数) を返す"""
+    counts = Counter()
+    result = []
+    for member in document:
+        if isinstance(member, dict):
+            for i, transform in enumerate(transforms):
+                migrated = transform.apply(member)
+                if migrated is not member:
+                    counts[i] += 1
+                    member = migrated
+        result.append(member)
+    return result, counts
+
+
+def _migrate_source(task):
+    """ワーカーで1ファイル分を移行し、結果のdictを返す
+
+    text は内容が変わる場合だけ入る。error は読み込めなかった場合、
+    violations は移行後の内容が移行先のスキーマに適合しない場合に入る。
+    """
+    data_dir, relpath, from_version, to_version = task
+    with open(os.path.join(data_dir, relpath), 'rb') as f:
+        raw = f.read()
+    result = {'relpath': relpath, 'digest': hashlib.sha1(raw).hexdigest(),
+              'text': None, 'counts': Counter(), 'error': None, 'violations': []}
+    try:
+        source = raw.decode('utf-8')
+        document = json.loads(source)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        result['error'] = str(e)
+        return result
+    if not isinstance(document, list):
+        result['error'] = 'file does not contain a list of objects'
+        return result
+
+    migrated, result['counts'] = migrate_document(document, migration_transforms(from_version, to_version))
+    text = dump_document(migrated, *detect_format(source))
+    if text != source:
+        result['text'] = text
+
+    validator = load_stream_validator(schema_path_for(to_version))
+    if not validator.is_valid(migrated):
+        # 書き込み後のファイルと同じ位置（行:列: JSONポインタ）でエラーを示す
+        stream = validator.validate_stream(io.BytesIO(text.encode('utf-8')))
+        result['violations'] = [str(e) for e in stream.errors]
+    return result
+
+
+def _write_atomic(task) -> Optional[str]:
+    """ファイルを一時ファイル経由で置き換える。読み込み後に変更されていればその旨を返す"""
+    path, digest, text = task
+    with open(path, 'rb') as f:
+        if hashlib.sha1(f.read()).hexdigest() != digest:
+            return '移行の計画後にファイルが変更されたため書き換えませんでした'
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return None
+
+
+def _select_mode(paths: List[Path], workers: int) -> str:
+    if workers == 1 or len(paths) <= 1:
+        return 'serial'
+    if sum(p.stat().st_size for p in paths) < PROCESS_POOL_MIN_BYTES:
+        return 'thread'
+    return 'process'
+
+
+def plan_migration(data_dir: Path, from_version: str, to_version: str,
+                   workers: Optional[int] = None) -> List[Dict]:
+    """全ファイルの移行結果をコーパスの順序で返す（ファイルは書き換えない）"""
+    migration_steps(from_version, to_version)
+    data_dir = Path(data_dir)
+    paths = iter_source_files(data_dir)
+    tasks = [(os.fspath(data_dir), p.relative_to(data_dir).as_posix(), from_version, to_version)
+             for p in paths]
+    workers = workers or default_workers()
+    mode = _select_mode(paths, workers)
+    if mode == 'serial':
+        return [_migrate_source(task) for task in tasks]
+    executor_class = ProcessPoolExecutor if mode == 'process' else ThreadPoolExecutor
+    chunksize = max(1, len(tasks) // (workers * 4)) if mode == 'process' else 1
+    with executor_class(max_workers=workers) as executor:
+        # mapは入力順で結果を返すので表示が毎回同じになる
+        return list(executor.map(_migrate_source, tasks, chunksize=chunksize))
+
+
+def apply_migration(data_dir: Path, results: List[Dict], workers: Optional[int] = None) -> List[str]:
+    """内容が変わるファイルを並列に書き換え、書き換えられなかったファイルのメッセージを返す"""
+    tasks = [(os.path.join(data_dir, r['relpath']), r['digest'], r['text'])
+             for r in results if r['text'] is not None]
+    # 書き込みはI/O待ちが中心なのでスレッドで並列化する
+    with ThreadPoolExecutor(max_workers=workers or default_workers()) as executor:
+        outcomes = list(executor.map(_write_atomic, tasks))
+    return [f'{path}: {message}' for (path, _, _), message in zip(tasks, outcomes) if message]
+
+
+def format_summary(results: List[Dict], transforms: List[Transform]) -> List[str]:
+    """変換ごとの適用件数と変更されるファイルの一覧"""
+    totals = Counter()
+    for r in results:
+        totals.update(r['counts'])
+    changed = [r for r in results if r['text'] is not None]
+    lines = ['変換:']
+    lines.extend(f'  - {t.describe()}: {totals[i]}件' for i, t in enumerate(transforms))
+    lines.append(f'変更されるファイル: {len(changed)} / {len(results)}')
+    for r in changed:
+        members = sum(r['counts'].values())
+        lines.append(f"  - {r['relpath']}（変換 {members}件）")
+    return lines
+
+
+def format_diff(data_dir: Path, result: Dict) -> str:
+    with open(os.path.join(data_dir, result['relpath']), encoding='utf-8') as f:
+        before = f.read()
+    return ''.join(difflib.unified_diff(
+        before.splitlines(keepends=True), result['text'].splitlines(keepends=True),
+        fromfile=f"a/{result['relpath']}", tofile=f"b/{result['relpath']}",
+    ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='議員データを新しいスキーマバージョンへ一括移行')
+    parser.add_argument('--from', dest='from_version', default=VERSIONS[-2], help='移行元のバージョン')
+    parser.add_argument('--to', dest='to_version', default=VERSIONS[-1], help='移行先のバージョン')
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR, help='議員データのディレクトリ')
+    parser.add_argument('--dry-run', action='store_true', help='書き換えずに変更内容だけを表示')
+    parser.add_argument('--diff', action='store_true', help='ファイルごとの差分を表示')
+    parser.add_argument('--workers', type=int, help='並列数（既定はCPU数）')
+    args = parser.parse_args(argv)
+
+    try:
+        transforms = migration_transforms(args.from_version, args.to_version)
+    except ValueError as e:
+        print(f'エラー: {e}')
+        return 1
+    results = plan_migration(args.data_dir, args.from_version, args.to_version, args.workers)
+    print(f'スキーマ移行: v{args.from_version} → v{args.to_version}（{len(results)}ファイル）')
+    for line in format_summary(results, transforms):
+        print(line)
+    if args.diff:
+        for r in results:
+            if r['text'] is not None:
+                print(format_diff(args.data_dir, r), end='')
+
+    unreadable = [r for r in results if r['error']]
+    invalid = [r for r in results if r['violations']]
+    if unreadable or invalid:
+        print(f'\n❌ 移行後の内容が v{args.to_version} に適合しないため、何も書き換えていません')
+        for r in unreadable:
+            print(f"  - {r['relpath']}: {r['error']}")
+        for r in invalid:
+            for violation in r['violations']:
+                print(f"  - {r['relpath']}:{violation}")
+        return 1
+    print(f'\n✅ 移行後の全ファイルが v{args.to_version} に適合しています')
+
+    if args.dry_run:
+        print('（--dry-run のため書き換えていません）')
+        return 0
+    failures = apply_migration(args.data_dir, results, args.workers)
+    written = sum(1 for r in results if r['text'] is not None) - len(failures)
+    print(f'{written}ファイルを書き換えました')
+    for message in failures:
+        print(f'  ⚠️ {message}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
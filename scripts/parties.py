@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+会派名から政党への正規化
+
+所属には「自民党新政会」「日本共産党入間市議団」「都民ファーストの会・立憲民主党昭島市議団」のような
+議会の会派名が入っているため、別名表（PARTY_ALIASES）のキーワードを Aho-Corasick 法で1回の走査で
+探し、会派名を政党名に変換する:
+- 複数の政党名を含む会派（合同会派）は、最も左に現れる政党にする
+- 政党名を含まない会派は「無所属」「諸派」のキーワードで判定し、どれにも当たらなければ地域会派とする
+- 空・「未確認」・「不明」は不明とする
+
+変換結果は会派名（異なる文字列）ごとにキャッシュするため、議員1人あたりの変換は辞書の参照だけになる。
+
+使用方法:
+    python scripts/parties.py                  # 全国の政党別議員数と、会派名→政党の対応
+    python scripts/parties.py 自民党新政会     # 指定した会派名の変換結果
+"""
+
+import sys
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+INDEPENDENT = '無所属'
+MINOR_PARTIES = '諸派'
+LOCAL_GROUP = '地域会派'
+UNKNOWN_PARTY = '不明'
+
+# 政党 → 会派名に含まれる別名（長い別名ほど優先されるので、短い略称も並べてよい）
+PARTY_ALIASES: Dict[str, Tuple[str, ...]] = {
+    '自由民主党': ('自由民主党', '自由民主', '自民党', '自民'),
+    '立憲民主党': ('立憲民主党', '立憲民主', '立憲', 'りっけん'),
+    '公明党': ('公明党', '公明'),
+    '日本共産党': ('日本共産党', '共産党', '共産'),
+    '日本維新の会': ('日本維新の会', '維新'),
+    '国民民主党': ('国民民主党', '国民民主', '国民'),
+    'れいわ新選組': ('れいわ新選組', 'れいわ'),
+    '社会民主党': ('社会民主党', '社民党', '社民'),
+    '参政党': ('参政党', '参政'),
+    '都民ファーストの会': ('都民ファーストの会', '都民ファースト'),
+    '生活者ネットワーク': ('生活者ネットワーク', '生活者ネット'),
+    'チームみらい': ('チームみらい',),
+}
+
+# 政党名が見つからない場合にだけ使う別名（「無会派（日本共産党…）」は日本共産党になる）
+FALLBACK_ALIASES: Dict[str, Tuple[str, ...]] = {
+    INDEPENDENT: ('無所属', '無会派', '会派に属さない'),
+    MINOR_PARTIES: ('諸派',),
+    UNKNOWN_PARTY: ('未確認', UNKNOWN_PARTY),
+}
+
+PARTIES = tuple(PARTY_ALIASES)
+
+
+class AhoCorasick:
+    """複数のキーワードを1回の走査で探すオートマトン（キーワード → 値）"""
+
+    def __init__(self, keywords: Dict[str, object]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, object]]] = [[]]
+        for keyword, value in keywords.items():
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = self.goto[state][char] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append((len(keyword), value))
+
+        # 幅優先で失敗遷移を張り、失敗先の出力を引き継ぐ
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, object]]:
+        """見つかったキーワードの (開始位置, 終了位置, 値) を終了位置の順に返す"""
+        state = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, value in output[state]:
+                yield end - length, end, value
+
+
+def _build_matcher() -> AhoCorasick:
+    keywords = {}
+    for priority, table in enumerate((PARTY_ALIASES, FALLBACK_ALIASES)):
+        for party, aliases in table.items():
+            for alias in aliases:
+                keywords[alias] = (priority, party)
+    return AhoCorasick(keywords)
+
+
+_matcher = _build_matcher()
+
+
+@lru_cache(maxsize=None)
+def normalize_party(affiliation: Optional[str]) -> str:
+    """会派名（所属）を政党名に変換する（会派名ごとにキャッシュ）"""
+    if not affiliation:
+        return UNKNOWN_PARTY
+    best = None
+    for start, end, (priority, party) in _matcher.iter_matches(affiliation):
+        # 政党の別名を優先し、同じ優先度なら左に現れるもの、同じ位置なら長いものを選ぶ
+        key = (priority, start, start - end)
+        if best is None or key < best[0]:
+            best = (key, party)
+    return best[1] if best else LOCAL_GROUP
+
+
+def is_national_party(party: str) -> bool:
+    """正規化した政党名が実在の政党（無所属・諸派・地域会派・不明以外）か"""
+    return party in PARTY_ALIASES
+
+
+def rollup_parties(counts: Dict[str, int]) -> Dict[str, int]:
+    """会派別の人数を政党別にまとめる（会派名ごとに1回だけ変換する）"""
+    result: Dict[str, int] = {}
+    for affiliation, count in counts.items():
+        party = normalize_party(affiliation)
+        result[party] = result.get(party, 0) + count
+    return result
+
+
+def party_groups(affiliations: Iterable[str]) -> Dict[str, List[str]]:
+    """政党 → 会派名の一覧（政党の出現順、会派名は重複を除く）"""
+    groups: Dict[str, List[str]] = {}
+    for affiliation in dict.fromkeys(affiliations):
+        groups.setdefault(normalize_party(affiliation), []).append(affiliation)
+    return groups
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        for affiliation in argv:
+            print(f"{affiliation} → {normalize_party(affiliation)}")
+        return 0
+
+    from corpus import load_corpus
+
+    affiliations = Counter()
+    for muni in load_corpus():
+        affiliations.update(c.party for c in muni.councillors)
+    national = rollup_parties(affiliations)
+    groups = party_groups(a for a, _ in affiliations.most_common())
+    total = sum(national.values())
+    print("| 政党 | 議員数 | 割合 | 会派数 |")
+    print("|------|--------|------|--------|")
+    for party, count in sorted(national.items(), key=lambda item: item[1], reverse=True):
+        print(f"| {party} | {count} | {count / total * 100:.1f}% | {len(groups[party])} |")
+    for party, names in groups.items():
+        print(f"\n{party}: {', '.join(name or '（空）' for name in names)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
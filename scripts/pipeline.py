@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+コーパスを1回だけ読み込み、自治体ごとに複数のステージへ流すパイプライン
+
+各ステージは次のメソッドを持つプラグインとして各スクリプトに定義されている:
+- start(context): 読み込み前の準備（スキーマ・マニフェストの読み込みなど）
+- process(item, results): 1自治体分の処理（resultsは依存ステージの処理結果）
+- finish(): 全自治体の処理後の集計・出力
+
+ステージは requires で依存するステージ名を宣言でき、依存関係のないステージ同士は
+別スレッドで並行に処理される。各自治体は依存ステージの処理が終わり次第、
+次のステージへ順に流れる（1つのステージ内では常にコーパスの順序で処理される）。
+finish() は全ステージの処理後に依存順で呼ばれるため、レポートの出力順は毎回同じになる。
+
+gate = True のステージ（データの検証）は他のステージより先に実行され、
+いずれかが exit_code != 0 で終わった場合は残りのステージ（出力の生成）を実行しない。
+
+使用方法:
+    python scripts/pipeline.py                   # 全ステージ（make update-all）
+    python scripts/pipeline.py --only schema,stats
+    python scripts/pipeline.py --full            # ビューア用データを全て再生成
+    python scripts/pipeline.py --workers 8 --cache-stats
+"""
+
+import argparse
+import queue
+import sys
+import threading
+import time
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from corpus import DATA_DIR, ROOT_DIR, load_corpus, print_cache_stats
+
+
+class Stage:
+    """パイプラインのステージの基底クラス"""
+
+    name = ''
+    requires: Sequence[str] = ()
+    gate = False
+
+    def start(self, context: 'PipelineContext'):
+        pass
+
+    def process(self, item: 'PipelineItem', results: Dict):
+        return None
+
+    def finish(self):
+        pass
+
+
+class PipelineContext:
+    """全ステージで共有する実行時の情報"""
+
+    def __init__(self, data_dir: Path, corpus=None, workers: Optional[int] = None):
+        self.data_dir = Path(data_dir)
+        self.corpus = corpus
+        self.workers = workers
+
+
+class PipelineItem:
+    """ステージ間で共有する1自治体分のデータ（議員データの復元は1回だけ行う）"""
+
+    def __init__(self, municipality):
+        self.municipality = municipality
+
+    def __getattr__(self, name):
+        return getattr(self.municipality, name)
+
+    @cached_property
+    def document(self):
+        return self.municipality.document
+
+    @cached_property
+    def members(self):
+        return self.municipality.members
+
+    @cached_property
+    def councillors(self):
+        return self.municipality.councillors
+
+    def __repr__(self):
+        return f'PipelineItem({self.municipality!r})'
+
+
+class StageTiming:
+    """ステージごとの処理時間"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.process_seconds = 0.0
+        self.finish_seconds = 0.0
+
+    @property
+    def total_seconds(self) -> float:
+        return self.process_seconds + self.finish_seconds
+
+
+class PipelineResult:
+    """パイプラインの実行結果"""
+
+    def __init__(self, timings: List[StageTiming], load_seconds: float, wall_seconds: float,
+                 skipped: Sequence[str] = ()):
+        self.timings = timings
+        self.load_seconds = load_seconds
+        self.wall_seconds = wall_seconds
+        self.skipped = list(skipped)
+
+    def format_timings(self) -> str:
+        lines = ["## ステージ別の処理時間",
+                 f"- コーパス読み込み: {self.load_seconds * 1000:.1f}ms"]
+        for t in self.timings:
+            lines.append(
+                f"- {t.name}: {t.total_seconds * 1000:.1f}ms"
+                f"（処理 {t.process_seconds * 1000:.1f}ms / {t.items}自治体,"
+                f" 集計 {t.finish_seconds * 1000:.1f}ms）"
+            )
+        for name in self.skipped:
+            lines.append(f"- {name}: 検証エラーのため実行せず")
+        lines.append(f"- 全体（実時間）: {self.wall_seconds * 1000:.1f}ms")
+        return "\n".join(lines)
+
+
+def sort_stages(stages: Sequence[Stage]) -> List[Stage]:
+    """依存関係の順にステージを並べる（未知の依存や循環があればValueError）"""
+    by_name = {}
+    for stage in stages:
+        if not stage.name or stage.name in by_name:
+            raise ValueError(f'ステージ名が空または重複しています: {stage.name!r}')
+        by_name[stage.name] = stage
+    for stage in stages:
+        for dep in stage.requires:
+            if dep not in by_name:
+                raise ValueError(f'{stage.name}: 依存ステージ {dep} がありません')
+
+    ordered = []
+    state = {}
+
+    def visit(stage, path):
+        if state.get(stage.name) == 'done':
+            return
+        if state.get(stage.name) == 'visiting':
+            raise ValueError(f'ステージの依存関係が循環しています: {" -> ".join(path)}')
+        state[stage.name] = 'visiting'
+        for dep in stage.requires:
+            visit(by_name[dep], path + [dep])
+        state[stage.name] = 'done'
+        ordered.append(stage)
+
+    for stage in stages:
+        visit(stage, [stage.name])
+    return ordered
+
+
+class _ItemState:
+    """1自治体分の各ステージの処理結果"""
+
+    __slots__ = ('item', 'results', 'queued', 'lock')
+
+    def __init__(self, item: PipelineItem):
+        self.item = item
+        self.results: Dict = {}
+        self.queued = set()
+        self.lock = threading.Lock()
+
+
+class _StageRunner:
+    """1ステージ分のスレッド（依存ステージが終わった自治体から順に処理する）"""
+
+    def __init__(self, stage: Stage, count: int):
+        self.stage = stage
+        self.count = count
+        self.queue = queue.Queue()
+        self.dependents: List['_StageRunner'] = []
+        self.timing = StageTiming(stage.name)
+        self.error: Optional[BaseException] = None
+        self.thread = threading.Thread(target=self._run, name=f'pipeline-{stage.name}', daemon=True)
+
+    def _run(self):
+        for _ in range(self.count):
+            state = self.queue.get()
+            result = None
+            if self.error is None:
+                started = time.perf_counter()
+                try:
+                    result = self.stage.process(
+                        state.item, {dep: state.results[dep] for dep in self.stage.requires}
+                    )
+                except BaseException as e:  # 後続ステージを止めないよう記録して読み飛ばす
+                    self.error = e
+                self.timing.process_seconds += time.perf_counter() - started
+                self.timing.items += 1
+            with state.lock:
+                state.results[self.stage.name] = result
+            for runner in self.dependents:
+                runner.offer(state)
+
+    def offer(self, state: _ItemState):
+        # 全ての依存ステージの結果が揃った時点で1回だけキューに入れる
+        with state.lock:
+            if self.stage.name in state.queued:
+                return
+            if any(dep not in state.results for dep in self.stage.requires):
+                return
+            state.queued.add(self.stage.name)
+        self.queue.put(state)
+
+
+def _run_stages(ordered: List[Stage], context: PipelineContext) -> List[StageTiming]:
+    """読み込み済みのコーパスを各ステージに流し、依存順に finish() を呼ぶ"""
+    count = len(context.corpus)
+    runners = {stage.name: _StageRunner(stage, count) for stage in ordered}
+    for stage in ordered:
+        for dep in stage.requires:
+            runners[dep].dependents.append(runners[stage.name])
+    roots = [runners[s.name] for s in ordered if not s.requires]
+
+    for runner in runners.values():
+        runner.thread.start()
+    for muni in context.corpus:
+        state = _ItemState(PipelineItem(muni))
+        for runner in roots:
+            runner.offer(state)
+    for runner in runners.values():
+        runner.thread.join()
+
+    for runner in runners.values():
+        if runner.error is not None:
+            raise runner.error
+
+    for stage in ordered:
+        timing = runners[stage.name].timing
+        started = time.perf_counter()
+        stage.finish()
+        timing.finish_seconds = time.perf_counter() - started
+    return [runners[s.name].timing for s in ordered]
+
+
+def run_pipeline(stages: Sequence[Stage], data_dir: Path = DATA_DIR, workers: Optional[int] = None,
+                 corpus=None, rebuild: bool = False) -> PipelineResult:
+    """コーパスを1回だけ読み込み、全ステージに流す
+
+    gate = True のステージが失敗した場合、残りのステージは start() も呼ばずに読み飛ばす。
+    """
+    wall_started = time.perf_counter()
+    ordered = sort_stages(stages)
+    gates = [s for s in ordered if s.gate]
+    outputs = [s for s in ordered if not s.gate]
+    gate_names = {s.name for s in gates}
+    for stage in outputs:
+        if gate_names.intersection(stage.requires):
+            raise ValueError(f'{stage.name}: 検証ステージには依存できません')
+
+    # 検証ステージがある場合、出力ステージの準備は検証が通ってから行う
+    first = gates or outputs
+    context = PipelineContext(data_dir, corpus, workers)
+    for stage in first:
+        stage.start(context)
+    load_started = time.perf_counter()
+    if context.corpus is None:
+        context.corpus = load_corpus(context.data_dir, rebuild=rebuild, workers=workers)
+    load_seconds = time.perf_counter() - load_started
+
+    timings = _run_stages(first, context)
+    if first is outputs or not outputs:
+        return PipelineResult(timings, load_seconds, time.perf_counter() - wall_started)
+
+    failed = [s.name for s in gates if getattr(s, 'exit_code', 0)]
+    if failed:
+        print(f"\n検証エラーのため出力を更新しません（{', '.join(failed)}）: "
+              f"{', '.join(s.name for s in outputs)}", file=sys.stderr)
+        return PipelineResult(timings, load_seconds, time.perf_counter() - wall_started,
+                              [s.name for s in outputs])
+    for stage in outputs:
+        stage.start(context)
+    timings += _run_stages(outputs, context)
+    return PipelineResult(timings, load_seconds, time.perf_counter() - wall_started)
+
+
+def default_stages(full_rebuild: bool = False) -> List[Stage]:
+    """make update-all で実行するステージ"""
+    from check_data_quality import QualityStage
+    from generate_statistics import StatisticsStage
+    from generate_unregistered_list import UnregisteredStage
+    from integrity import IntegrityStage
+    from update_viewer_data import ViewerStage
+    from validate_data import SchemaStage
+
+    return [
+        SchemaStage(),
+        IntegrityStage(),
+        ViewerStage(ROOT_DIR / 'viewer' / 'js', full_rebuild),
+        StatisticsStage(output=sys.stdout),
+        UnregisteredStage(),
+        QualityStage(),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='コーパスを1回だけ読み込んで全ての更新処理を行う')
+    parser.add_argument('--only', help='実行するステージ名（カンマ区切り）')
+    parser.add_argument('--full', action='store_true', help='ビューア用データを全て再生成')
+    parser.add_argument('--workers', type=int, help='読み込み・検証の並列数')
+    parser.add_argument('--cache-stats', action='store_true', help='コーパスキャッシュの利用状況を表示')
+    args = parser.parse_args(argv)
+
+    stages = default_stages(args.full)
+    if args.only:
+        names = [n.strip() for n in args.only.split(',') if n.strip()]
+        unknown = set(names) - {s.name for s in stages}
+        if unknown:
+            parser.error(f"不明なステージ: {', '.join(sorted(unknown))}")
+        stages = [s for s in stages if s.name in names]
+
+    result = run_pipeline(stages, workers=args.workers)
+    print_cache_stats(['--cache-stats'] if args.cache_stats else [])
+    if args.cache_stats:
+        for stage in stages:
+            if hasattr(stage, 'format_cache_stats'):
+                print(stage.format_cache_stats(), file=sys.stderr)
+    print("\n" + result.format_timings())
+    return max((getattr(s, 'exit_code', 0) for s in stages), default=0)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
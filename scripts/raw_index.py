@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+rawデータ（data/raw/<都道府県>/<自治体>/<YYYYMMDD>/）のスナップショット日付のインデックス
+
+data/raw を1回だけ走査し、自治体ごとに最新・最古のスナップショット日付と件数を求めて、
+処理済みファイル（data/processed）と自治体コード・自治体名のハッシュマップで突き合わせる。
+
+- 自治体ディレクトリは「自治体名」または「自治体コード_自治体名」のどちらでもよい
+- 都道府県ディレクトリ（「11_埼玉県」のように2桁の番号で始まる）を挟まない古い配置
+  （data/raw/<自治体>/<YYYYMMDD>/）にも対応する
+- 自治体ディレクトリの更新時刻（スナップショットを追加すると変わる）ごとに結果をキャッシュし、
+  2回目以降は更新時刻が変わった自治体のスナップショットだけを数え直す
+
+キャッシュは .cache/corpus/raw_index.bin に保存する。
+"""
+
+import marshal
+import os
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from corpus import cache_path_for
+
+# キャッシュの形式（集計内容を変えたら上げる）
+RAW_INDEX_VERSION = 1
+SNAPSHOT_RE = re.compile(r'^\d{8}$')
+PREFECTURE_RE = re.compile(r'^\d{2}_')
+MUNICIPALITY_RE = re.compile(r'^(\d{6})_(.+)$')
+# この日数より古いスナップショットは更新を検討する
+STALE_DAYS = 30
+
+
+def raw_dir_for(data_dir: Path) -> Path:
+    """処理済みデータのディレクトリ（data/processed）に対応するrawディレクトリ（data/raw）"""
+    return Path(data_dir).parent / 'raw'
+
+
+def _parse_date(name: str) -> Optional[date]:
+    try:
+        return datetime.strptime(name, '%Y%m%d').date()
+    except ValueError:
+        return None
+
+
+class RawSnapshots:
+    """1自治体分のrawスナップショット（日付はYYYYMMDDの文字列）"""
+
+    __slots__ = ('prefecture', 'name', 'code', 'latest', 'earliest', 'count')
+
+    def __init__(self, prefecture: str, name: str, code: Optional[str], latest: Optional[str],
+                 earliest: Optional[str], count: int):
+        self.prefecture = prefecture
+        self.name = name
+        self.code = code
+        self.latest = latest
+        self.earliest = earliest
+        self.count = count
+
+    @property
+    def key(self) -> str:
+        return f'{self.prefecture}/{self.name}' if self.prefecture else self.name
+
+    @property
+    def latest_date(self) -> Optional[date]:
+        return _parse_date(self.latest) if self.latest else None
+
+    def age(self, today: Optional[date] = None) -> Optional[int]:
+        """最新スナップショットからの経過日数（スナップショットがなければNone）"""
+        latest = self.latest_date
+        if latest is None:
+            return None
+        return ((today or date.today()) - latest).days
+
+    def __repr__(self):
+        return f'RawSnapshots({self.key!r}, latest={self.latest!r}, count={self.count})'
+
+
+def _scan_snapshots(path: str) -> Tuple[Optional[str], Optional[str], int]:
+    """自治体ディレクトリの (最新の日付, 最古の日付, スナップショット数)"""
+    names = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if SNAPSHOT_RE.match(entry.name) and entry.is_dir():
+                names.append(entry.name)
+    # YYYYMMDDは文字列の順が日付の順なので、全てを日付に変換せずに両端から有効な日付を探す
+    names.sort()
+    latest = next((name for name in reversed(names) if _parse_date(name)), None)
+    earliest = next((name for name in names if _parse_date(name)), None)
+    return latest, earliest, len(names)
+
+
+class RawIndex:
+    """rawディレクトリ全体のインデックス {「都道府県/自治体名」: RawSnapshots}"""
+
+    def __init__(self, raw_dir: Path, cache_path: Optional[Path] = None):
+        self.raw_dir = Path(raw_dir)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.snapshots: Dict[str, RawSnapshots] = {}
+        self.scanned = 0
+        self.reused = 0
+
+    def _load_cache(self) -> Dict[str, tuple]:
+        if self.cache_path is None:
+            return {}
+        try:
+            with open(self.cache_path, 'rb') as f:
+                payload = marshal.load(f)
+        except (OSError, ValueError, EOFError, TypeError):
+            return {}
+        if not isinstance(payload, dict) or payload.get('version') != RAW_INDEX_VERSION:
+            return {}
+        if payload.get('raw_dir') != os.fspath(self.raw_dir.resolve()):
+            return {}
+        return payload['entries']
+
+    def _save_cache(self, entries: Dict[str, tuple]):
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f'{self.cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            marshal.dump({'version': RAW_INDEX_VERSION, 'raw_dir': os.fspath(self.raw_dir.resolve()),
+                          'entries': entries}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _municipality_dirs(self) -> Iterable[Tuple[str, os.DirEntry]]:
+        """(都道府県, 自治体ディレクトリ) を名前順に返す"""
+        if not self.raw_dir.is_dir():
+            return
+        with os.scandir(self.raw_dir) as entries:
+            top = sorted((e for e in entries if e.is_dir()), key=lambda e: e.name)
+        for entry in top:
+            if not PREFECTURE_RE.match(entry.name):
+                yield '', entry
+                continue
+            with os.scandir(entry.path) as children:
+                for child in sorted((c for c in children if c.is_dir()), key=lambda c: c.name):
+                    yield entry.name, child
+
+    def scan(self) -> 'RawIndex':
+        cached = self._load_cache()
+        entries = {}
+        for prefecture, entry in self._municipality_dirs():
+            key = f'{prefecture}/{entry.name}' if prefecture else entry.name
+            mtime = entry.stat().st_mtime_ns
+            previous = cached.get(key)
+            if previous is not None and previous[0] == mtime:
+                result = previous
+                self.reused += 1
+            else:
+                result = (mtime,) + _scan_snapshots(entry.path)
+                self.scanned += 1
+            entries[key] = result
+            match = MUNICIPALITY_RE.match(entry.name)
+            code, name = match.groups() if match else (None, entry.name)
+            self.snapshots[key] = RawSnapshots(prefecture, name, code, result[1], result[2], result[3])
+        if entries != cached:
+            self._save_cache(entries)
+        return self
+
+    def __iter__(self):
+        return iter(self.snapshots.values())
+
+    def __len__(self):
+        return len(self.snapshots)
+
+
+def load_raw_index(data_dir: Path, raw_dir: Optional[Path] = None,
+                   cache_path: Optional[Path] = None) -> RawIndex:
+    """処理済みデータのディレクトリに対応するrawインデックスを読み込む（キャッシュを使う）"""
+    raw_dir = Path(raw_dir) if raw_dir else raw_dir_for(data_dir)
+    cache_path = Path(cache_path) if cache_path else cache_path_for(data_dir, 'raw_index', '.bin')
+    return RawIndex(raw_dir, cache_path).scan()
+
+
+def reconcile(raw: Iterable[RawSnapshots], processed: Iterable[Tuple[str, str, str, str]]
+              ) -> Tuple[Dict[str, RawSnapshots], List[RawSnapshots]]:
+    """rawスナップショットと処理済みファイル (相対パス, 自治体コード, 自治体名, 都道府県) を突き合わせる
+
+    自治体コード → (都道府県, 自治体名) → 自治体名（都道府県のないrawで、同名の自治体が1つだけの場合）の
+    順にハッシュマップで探し、({処理済みの相対パス: rawスナップショット}, 対応する処理済みファイルのないraw) を返す。
+    """
+    by_code: Dict[str, str] = {}
+    by_name: Dict[Tuple[str, str], str] = {}
+    by_bare_name: Dict[str, List[str]] = {}
+    for relpath, code, name, prefecture in processed:
+        if code:
+            by_code.setdefault(code, relpath)
+        by_name.setdefault((prefecture, name), relpath)
+        by_bare_name.setdefault(name, []).append(relpath)
+
+    matched: Dict[str, RawSnapshots] = {}
+    unmatched: List[RawSnapshots] = []
+    for snapshots in raw:
+        relpath = by_code.get(snapshots.code) if snapshots.code else None
+        if relpath is None:
+            relpath = by_name.get((snapshots.prefecture, snapshots.name))
+        if relpath is None and not snapshots.prefecture:
+            candidates = by_bare_name.get(snapshots.name, ())
+            relpath = candidates[0] if len(candidates) == 1 else None
+        if relpath is None:
+            unmatched.append(snapshots)
+            continue
+        current = matched.get(relpath)
+        # 同じ自治体のrawが複数の配置にある場合は新しいスナップショットの方を使う
+        if current is None or (snapshots.latest or '') > (current.latest or ''):
+            matched[relpath] = snapshots
+    return matched, unmatched
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+議員データ用のJSONスキーマ検証（draft-07のサブセットをPythonの関数にコンパイルする）
+
+スキーマは読み込み時に1回だけ、キーワードごとの専用チェック関数にコンパイルする。
+正規表現は事前にコンパイルし、配列は1つのループで全要素を検証する。
+
+対応しているキーワード:
+    type, properties, required, additionalProperties, items, pattern, format (uri),
+    enum, const, minItems, maxItems, minLength, maxLength
+注釈のみのキーワード（$schema, title, description など）は無視し、
+それ以外のキーワードが含まれていればSchemaErrorにする（検証されないまま通さない）。
+
+使用方法:
+    from schema_validator import load_validator
+    validator = load_validator('schema/municipal_councillor_v1.2.json')
+    for error in validator.iter_errors(data):
+        print(error)   # 例: [3].X（旧Twitter）: 'https://twitter.com/abc' does not match pattern
+"""
+
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+
+ANNOTATION_KEYWORDS = frozenset({
+    '$schema', '$id', '$comment', 'title', 'description', 'default', 'examples',
+})
+
+JSON_TYPES = {
+    'string': lambda v: isinstance(v, str),
+    'null': lambda v: v is None,
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'boolean': lambda v: isinstance(v, bool),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+}
+
+Path = Tuple
+Check = Callable[[object, Path, List['ValidationError']], None]
+
+
+class SchemaError(Exception):
+    """スキーマ自体に未対応・不正な記述がある"""
+
+
+class ValidationError(Exception):
+    """検証エラー（pathはエラー箇所。配列の添字とプロパティ名のタプル）"""
+
+    def __init__(self, message: str, path: Path = ()):
+        super().__init__(message)
+        self.message = message
+        self.path = path
+
+    def __str__(self):
+        location = format_path(self.path)
+        return f'{location}: {self.message}' if location else self.message
+
+
+def format_path(path: Path) -> str:
+    """(3, 'X（旧Twitter）') → '[3].X（旧Twitter）'"""
+    parts = []
+    for part in path:
+        if isinstance(part, int):
+            parts.append(f'[{part}]')
+        else:
+            parts.append(f'.{part}' if parts else str(part))
+    return ''.join(parts)
+
+
+def _short(value, limit: int = 60) -> str:
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+
+# urlparseでスキームとホスト部が空でないことと同じ判定（urlparseより大幅に速い）
+URI_RE = re.compile(r'[A-Za-z][A-Za-z0-9+.\-]*://[^/?#]')
+
+
+def _is_uri(value: str) -> bool:
+    return URI_RE.match(value.strip()) is not None
+
+
+@lru_cache(maxsize=None)
+def compile_pattern(pattern: str):
+    """JSON Schema（ECMA-262）のpatternをPythonの正規表現にする
+
+    Pythonの $ は末尾の改行の直前にも一致するため、エスケープされていない・文字クラスの外の $ を
+    文字列の末尾だけに一致する \\Z に置き換える（'https://x.com/a\\n' のような値を受け付けないように）。
+    """
+    parts = []
+    escaped = in_class = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '$':
+            char = r'\Z'
+        parts.append(char)
+    return re.compile(''.join(parts))
+
+
+def _compile_type(types) -> Tuple[Callable, Tuple[str, ...]]:
+    names = tuple(types) if isinstance(types, list) else (types,)
+    for name in names:
+        if name not in JSON_TYPES:
+            raise SchemaError(f'未対応のtype: {name}')
+    if names == ('string',):
+        return (lambda v: isinstance(v, str)), names
+    if names == ('string', 'null') or names == ('null', 'string'):
+        return (lambda v: v is None or isinstance(v, str)), names
+    if names == ('object',):
+        return (lambda v: isinstance(v, dict)), names
+    if names == ('array',):
+        return (lambda v: isinstance(v, list)), names
+    tests = [JSON_TYPES[name] for name in names]
+    return (lambda v: any(test(v) for test in tests)), names
+
+
+def _compile_string_checks(schema: Dict) -> List[Check]:
+    checks = []
+    if 'pattern' in schema:
+        pattern = schema['pattern']
+        search = compile_pattern(pattern).search
+
+        def check_pattern(v, path, errors):
+            if isinstance(v, str) and search(v) is None:
+                errors.append(ValidationError(f'{v!r} does not match {pattern!r}', path))
+        checks.append(check_pattern)
+    if 'format' in schema:
+        if schema['format'] != 'uri':
+            raise SchemaError(f'未対応のformat: {schema["format"]}')
+
+        def check_uri(v, path, errors):
+            if isinstance(v, str) and not _is_uri(v):
+                errors.append(ValidationError(f'{v!r} is not a valid uri', path))
+        checks.append(check_uri)
+    if 'minLength' in schema or 'maxLength' in schema:
+        min_length = schema.get('minLength', 0)
+        max_length = schema.get('maxLength')
+
+        def check_length(v, path, errors):
+            if isinstance(v, str) and (len(v) < min_length or (max_length is not None and len(v) > max_length)):
+                errors.append(ValidationError(f'{_short(v)} has invalid length', path))
+        checks.append(check_length)
+    return checks
+
+
+def _compile_object(schema: Dict) -> Check:
+    required = tuple(schema.get('required', ()))
+    required_keys = frozenset(required)
+    properties = tuple((name, _compile(sub)) for name, sub in schema.get('properties', {}).items())
+    allowed = frozenset(name for name, _ in properties)
+    additional = schema.get('additionalProperties', True)
+    additional_check = _compile(additional) if isinstance(additional, dict) else None
+
+    def check_object(v, path, errors):
+        if not isinstance(v, dict):
+            return
+        keys = v.keys()
+        if required_keys and not required_keys <= keys:
+            for name in required:
+                if name not in v:
+                    errors.append(ValidationError(f'Missing required property: {name}', path))
+        if additional is False:
+            if not keys <= allowed:
+                for name in v:
+                    if name not in allowed:
+                        errors.append(ValidationError(f'Additional property not allowed: {name}', path))
+        elif additional_check is not None:
+            for name in v:
+                if name not in allowed:
+                    additional_check(v[name], path + (name,), errors)
+        for name, prop_check in properties:
+            if name in v:
+                prop_check(v[name], path + (name,), errors)
+    return check_object
+
+
+def _compile_array(schema: Dict) -> Check:
+    items = schema.get('items')
+    if isinstance(items, list):
+        raise SchemaError('タプル形式のitemsには未対応です')
+    item_check = _compile(items) if isinstance(items, dict) else None
+    min_items = schema.get('minItems', 0)
+    max_items = schema.get('maxItems')
+
+    def check_array(v, path, errors):
+        if not isinstance(v, list):
+            return
+        if len(v) < min_items or (max_items is not None and len(v) > max_items):
+            errors.append(ValidationError(f'Array has invalid length: {len(v)}', path))
+        if item_check is not None:
+            # 配列全体を1つのループで検証する
+            for i, item in enumerate(v):
+                item_check(item, path + (i,), errors)
+    return check_array
+
+
+def _compile(schema) -> Check:
+    """スキーマを (値, パス, エラーリスト) を受け取るチェック関数にコンパイル"""
+    if schema is True or schema == {}:
+        return lambda v, path, errors: None
+    if schema is False:
+        return lambda v, path, errors: errors.append(ValidationError('No value is allowed', path))
+    if not isinstance(schema, dict):
+        raise SchemaError(f'スキーマはオブジェクトである必要があります: {schema!r}')
+
+    supported = ANNOTATION_KEYWORDS | {
+        'type', 'properties', 'required', 'additionalProperties', 'items', 'pattern', 'format',
+        'enum', 'const', 'minItems', 'maxItems', 'minLength', 'maxLength',
+    }
+    unsupported = set(schema) - supported
+    if unsupported:
+        raise SchemaError(f'未対応のキーワード: {", ".join(sorted(unsupported))}')
+
+    checks: List[Check] = []
+    if 'enum' in schema or 'const' in schema:
+        allowed_values = schema['enum'] if 'enum' in schema else [schema['const']]
+
+        def check_enum(v, path, errors):
+            if not any(v == a and type(v) is type(a) for a in allowed_values):
+                errors.append(ValidationError(f'{_short(v)} is not one of {allowed_values!r}', path))
+        checks.append(check_enum)
+    checks.extend(_compile_string_checks(schema))
+    if {'properties', 'required', 'additionalProperties'} & schema.keys():
+        checks.append(_compile_object(schema))
+    if {'items', 'minItems', 'maxItems'} & schema.keys():
+        checks.append(_compile_array(schema))
+
+    if 'type' not in schema:
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(v, path, errors):
+            for check in checks:
+                check(v, path, errors)
+        return check_all
+
+    type_ok, type_names = _compile_type(schema['type'])
+    expected = ' or '.join(type_names)
+
+    if not checks:
+        def check_type(v, path, errors):
+            if not type_ok(v):
+                errors.append(ValidationError(f'{_short(v)} is not of type {expected}', path))
+        return check_type
+
+    if len(checks) == 1:
+        only = checks[0]
+
+        def check_type_and(v, path, errors):
+            if not type_ok(v):
+                errors.append(ValidationError(f'{_short(v)} is not of type {expected}', path))
+                return
+            only(v, path, errors)
+        return check_type_and
+
+    def check_type_and_all(v, path, errors):
+        if not type_ok(v):
+            errors.append(ValidationError(f'{_short(v)} is not of type {expected}', path))
+            return
+        for check in checks:
+            check(v, path, errors)
+    return check_type_and_all
+
+
+TYPE_EXPRESSIONS = {
+    'string': 'isinstance({v}, str)',
+    'null': '{v} is None',
+    'object': 'isinstance({v}, dict)',
+    'array': 'isinstance({v}, list)',
+    'boolean': 'isinstance({v}, bool)',
+    'integer': '(isinstance({v}, int) and not isinstance({v}, bool))',
+    'number': '(isinstance({v}, (int, float)) and not isinstance({v}, bool))',
+}
+
+
+class _SourceBuilder:
+    """スキーマから「妥当ならTrueを返す」関数のソースを生成する
+
+    エラーの位置やメッセージを組み立てない分、妥当なデータの検証が速い。
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.constants: Dict[str, object] = {'_MISSING': object(), '_is_uri': _is_uri}
+        self.counter = 0
+
+    def constant(self, value) -> str:
+        name = f'_c{len(self.constants)}'
+        self.constants[name] = value
+        return name
+
+    def variable(self) -> str:
+        self.counter += 1
+        return f'v{self.counter}'
+
+    def emit(self, line: str, depth: int):
+        self.lines.append('    ' * depth + line)
+
+    def node(self, schema, v: str, depth: int):
+        if schema is True or schema == {}:
+            return
+        if schema is False:
+            self.emit('return False', depth)
+            return
+        types = schema.get('type')
+        if types is not None:
+            names = types if isinstance(types, list) else [types]
+            condition = ' or '.join(TYPE_EXPRESSIONS[name].format(v=v) for name in names)
+            self.emit(f'if not ({condition}): return False', depth)
+        if 'enum' in schema or 'const' in schema:
+            allowed = self.constant(schema['enum'] if 'enum' in schema else [schema['const']])
+            self.emit(f'if not any({v} == a and type({v}) is type(a) for a in {allowed}): return False', depth)
+        if 'pattern' in schema:
+            search = self.constant(compile_pattern(schema['pattern']).search)
+            guard = '' if types == 'string' else f'isinstance({v}, str) and '
+            self.emit(f'if {guard}{search}({v}) is None: return False', depth)
+        if schema.get('format') == 'uri':
+            guard = '' if types == 'string' else f'isinstance({v}, str) and '
+            self.emit(f'if {guard}not _is_uri({v}): return False', depth)
+        if 'minLength' in schema or 'maxLength' in schema:
+            self.emit(f'if isinstance({v}, str):', depth)
+            self.emit(f'if len({v}) < {int(schema.get("minLength", 0))}: return False', depth + 1)
+            if 'maxLength' in schema:
+                self.emit(f'if len({v}) > {int(schema["maxLength"])}: return False', depth + 1)
+        if {'properties', 'required', 'additionalProperties'} & schema.keys():
+            self.object(schema, v, depth)
+        if {'items', 'minItems', 'maxItems'} & schema.keys():
+            self.array(schema, v, depth)
+
+    def object(self, schema, v: str, depth: int):
+        if schema.get('type') != 'object':
+            self.emit(f'if isinstance({v}, dict):', depth)
+            depth += 1
+            self.emit('pass', depth)
+        properties = schema.get('properties', {})
+        required = schema.get('required', [])
+        if required:
+            self.emit(f'if not {self.constant(frozenset(required))} <= {v}.keys(): return False', depth)
+        additional = schema.get('additionalProperties', True)
+        allowed = self.constant(frozenset(properties))
+        if additional is False:
+            self.emit(f'if not {v}.keys() <= {allowed}: return False', depth)
+        elif isinstance(additional, dict) and additional != {}:
+            key = self.variable()
+            value = self.variable()
+            self.emit(f'for {key}, {value} in {v}.items():', depth)
+            self.emit(f'if {key} not in {allowed}:', depth + 1)
+            self.emit('pass', depth + 2)
+            self.node(additional, value, depth + 2)
+        for name, sub in properties.items():
+            if sub is True or sub == {}:
+                continue
+            value = self.variable()
+            if name in required:
+                # 必須プロパティは存在を確認済み
+                self.emit(f'{value} = {v}[{name!r}]', depth)
+                self.node(sub, value, depth)
+            else:
+                self.emit(f'{value} = {v}.get({name!r}, _MISSING)', depth)
+                self.emit(f'if {value} is not _MISSING:', depth)
+                self.emit('pass', depth + 1)
+                self.node(sub, value, depth + 1)
+
+    def array(self, schema, v: str, depth: int):
+        if schema.get('type') != 'array':
+            self.emit(f'if isinstance({v}, list):', depth)
+            depth += 1
+            self.emit('pass', depth)
+        if 'minItems' in schema:
+            self.emit(f'if len({v}) < {int(schema["minItems"])}: return False', depth)
+        if 'maxItems' in schema:
+            self.emit(f'if len({v}) > {int(schema["maxItems"])}: return False', depth)
+        items = schema.get('items')
+        if isinstance(items, dict) and items != {}:
+            item = self.variable()
+            # 配列全体を1つのループで検証する
+            self.emit(f'for {item} in {v}:', depth)
+            self.emit('pass', depth + 1)
+            self.node(items, item, depth + 1)
+
+    def build(self, schema) -> Callable[[object], bool]:
+        self.emit('def is_valid(v0):', 0)
+        self.node(schema, 'v0', 1)
+        self.emit('return True', 1)
+        namespace = dict(self.constants)
+        exec(compile('\n'.join(self.lines), '<schema>', 'exec'), namespace)
+        return namespace['is_valid']
+
+
+class Validator:
+    """コンパイル済みのスキーマ"""
+
+    def __init__(self, schema: Dict):
+        self.schema = schema
+        # 未対応のキーワードはここでSchemaErrorになる
+        self._check = _compile(schema)
+        self._is_valid = _SourceBuilder().build(schema)
+
+    def iter_errors(self, instance) -> List[ValidationError]:
+        """全ての検証エラーを出現順に返す"""
+        # 妥当なデータは生成した関数だけで判定し、エラーがある場合のみ詳細を集める
+        if self._is_valid(instance):
+            return []
+        errors: List[ValidationError] = []
+        self._check(instance, (), errors)
+        return errors
+
+    def validate(self, instance):
+        """最初の検証エラーを送出する"""
+        errors = self.iter_errors(instance)
+        if errors:
+            raise errors[0]
+
+    def is_valid(self, instance) -> bool:
+        return self._is_valid(instance)
+
+
+@lru_cache(maxsize=None)
+def _load_validator(path: str, mtime_ns: int) -> Validator:
+    with open(path, encoding='utf-8') as f:
+        return Validator(json.load(f))
+
+
+def load_validator(path) -> Validator:
+    """スキーマファイルを読み込んでコンパイル（更新されるまで再コンパイルしない）"""
+    path = os.fspath(path)
+    return _load_validator(path, os.stat(path).st_mtime_ns)
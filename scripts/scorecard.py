@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+自治体ごとのデータ品質スコアカード
+
+check_data_quality.py の実行時に自治体ごとの品質を項目別に採点し、JSONファイルとして保存する:
+- X登録率、存在しない・名前が変わったX URL（verify_x_urls.py のキャッシュ）
+- よみ・氏名の不備（check_readings.py）、重複の疑い（duplicates.py）、所属の欠落（政党が不明）
+- スキーマ違反（validate_data.py の検証結果キャッシュを使う）、rawスナップショットの経過日数
+
+ファイル内容だけで決まる項目は前回のスコアカードのものを内容のハッシュごとに再利用し、
+変わったファイルだけを数え直す。保存は内容が変わったときだけ行う。
+
+項目ごとのスコア（0〜1）に重みを掛けた不足分（重み×(1−スコア)）を優先度として、
+推奨アクションを優先度付きキュー（heapq）から順に取り出す。
+
+他のレポートは、全てのチェックを実行し直さずにこのファイル（.cache/corpus/quality_scorecard.json）を
+load_scorecard() で読めばよい。生成物なのでリポジトリには含めない。
+
+使用方法:
+    python scripts/check_data_quality.py     # スコアカードを更新（make quality）
+    python scripts/scorecard.py              # 保存済みのスコアカードから推奨アクションとスコアの低い自治体を表示
+    python scripts/scorecard.py --top 20
+"""
+
+import argparse
+import heapq
+import json
+import os
+import sys
+from collections import Counter
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from check_readings import check_member
+from corpus import DATA_DIR, cache_path_for, file_digest
+from parties import UNKNOWN_PARTY, normalize_party
+from raw_index import STALE_DAYS
+from stream_validator import DEFAULT_MAX_ERRORS, load_stream_validator
+from validate_data import load_verdicts, select_schema_path, validate_loaded
+
+# スコアカードの形式（項目や採点方法を変えたら上げる）
+SCORECARD_VERSION = 1
+
+# 項目 → (重み, 見出し)。同じ優先度のアクションはこの順に並べる
+COMPONENTS = {
+    'schema': (3, 'スキーマ違反'),
+    'x_coverage': (2, 'X登録率'),
+    'x_liveness': (2, '存在しないX URL'),
+    'freshness': (2, 'データの鮮度'),
+    'duplicates': (2, '重複の疑い'),
+    'readings': (1, 'よみ・氏名の不備'),
+    'affiliation': (1, '所属の欠落'),
+}
+TOTAL_WEIGHT = sum(weight for weight, _ in COMPONENTS.values())
+# レポートに表示する推奨アクションの数
+ACTION_LIMIT = 10
+
+# ファイル内容だけで決まる項目（内容のハッシュが同じなら前回の値を使う）
+FILE_METRICS = ('members', 'with_x', 'schema_errors', 'schema_warnings', 'readings', 'reading_defects',
+                'missing_affiliation')
+
+
+def scorecard_path_for(data_dir: Path) -> Path:
+    """データディレクトリごとのスコアカードのパス"""
+    return cache_path_for(data_dir, 'quality_scorecard', '.json')
+
+
+def load_scorecard(path: Path) -> Optional[Dict]:
+    """保存済みのスコアカード（存在しない・形式が違う場合はNone）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            scorecard = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(scorecard, dict) or scorecard.get('version') != SCORECARD_VERSION:
+        return None
+    return scorecard
+
+
+def _location_relpath(location: str) -> str:
+    """「相対パス#/番号 (氏名)」の位置から相対パスを取り出す"""
+    return location.split('#/', 1)[0]
+
+
+def component_scores(row: Dict) -> Dict[str, float]:
+    """項目ごとのスコア（1が問題なし、0が最も悪い）"""
+    members = row['members']
+    if not members:
+        return {kind: 0.0 for kind in COMPONENTS}
+    age = row['snapshot_age']
+    return {
+        'schema': 0.0 if row['schema_errors'] else 1.0,
+        'x_coverage': row['with_x'] / members,
+        'x_liveness': 1 - row['dead_x'] / row['with_x'] if row['with_x'] else 1.0,
+        # 更新の目安の日数を過ぎたら経過日数に反比例して下げる
+        'freshness': 0.0 if age is None else min(1.0, STALE_DAYS / max(age, 1)),
+        'duplicates': 1 - row['duplicates'] / members,
+        'readings': 1 - row['readings'] / members,
+        'affiliation': 1 - row['missing_affiliation'] / members,
+    }
+
+
+def action_text(kind: str, row: Dict) -> str:
+    name = row['name']
+    if not row['members']:
+        return f"{name}の議員データを収集"
+    if kind == 'schema':
+        return f"{name}のスキーマ違反（{row['schema_errors']}件）を修正（python scripts/validate_data.py）"
+    if kind == 'x_coverage':
+        return f"{name}のXアカウントを再調査（登録 {row['with_x']}/{row['members']}名）"
+    if kind == 'x_liveness':
+        return f"{name}の存在しない・名前が変わったX URL（{row['dead_x']}件）を更新"
+    if kind == 'freshness':
+        if row['snapshot_age'] is None:
+            return f"{name}のrawデータを追加"
+        return f"{name}のデータを更新（最新のrawから{row['snapshot_age']}日）"
+    if kind == 'duplicates':
+        return f"{name}の重複候補（{row['duplicates']}名）を確認"
+    if kind == 'readings':
+        return f"{name}のよみ・氏名の表記（{row['readings']}名）を修正（python scripts/check_readings.py）"
+    return f"{name}の所属が不明な議員（{row['missing_affiliation']}名）を調査"
+
+
+def rank_actions(rows: Iterable[Dict], unmatched_raw: Iterable = (), limit: Optional[int] = None) -> List[Dict]:
+    """優先度（重み×スコアの不足分）の高い順の推奨アクション"""
+    order = {kind: i for i, kind in enumerate(COMPONENTS)}
+    queue = []
+    for row in rows:
+        if not row['members']:
+            # データのない自治体は全項目が0点なので、1つのアクションにまとめる
+            heapq.heappush(queue, (-TOTAL_WEIGHT, -1, row['relpath'], 'no_data', row))
+            continue
+        for kind, score in row['scores'].items():
+            deficit = round(COMPONENTS[kind][0] * (1 - score), 3)
+            if deficit > 0:
+                heapq.heappush(queue, (-deficit, order[kind], row['relpath'], kind, row))
+    for snapshots in unmatched_raw:
+        heapq.heappush(queue, (-TOTAL_WEIGHT, -1, snapshots.key, 'no_data', {'name': snapshots.key, 'members': 0}))
+
+    actions = []
+    while queue and (limit is None or len(actions) < limit):
+        priority, _, relpath, kind, row = heapq.heappop(queue)
+        actions.append({'priority': -priority, 'relpath': relpath, 'kind': kind, 'action': action_text(kind, row)})
+    return actions
+
+
+class ScorecardBuilder:
+    """パイプラインの各ファイルからスコアカードを組み立てる（QualityStageから使う）"""
+
+    def __init__(self, path: Optional[Path] = None, schema_path: Optional[str] = None):
+        self.path = path
+        self.schema_path = schema_path or select_schema_path()
+        self.schema_digest = file_digest(self.schema_path)
+        self.validator = None
+        self.verdicts = None
+        self.previous: Dict[str, Dict] = {}
+        self.rows: List[Dict] = []
+        self.reused = 0
+        self.computed = 0
+
+    def start(self, data_dir: Path):
+        if self.path is None:
+            self.path = scorecard_path_for(data_dir)
+        previous = load_scorecard(self.path)
+        if previous and previous.get('schema_digest') == self.schema_digest:
+            self.previous = {row['relpath']: row for row in previous['municipalities']}
+        self.verdicts = load_verdicts(cache_path_for(data_dir, 'validation', '.bin'))
+
+    def _schema_counts(self, item):
+        verdict = (self.verdicts or {}).get((item.digest, self.schema_digest, DEFAULT_MAX_ERRORS))
+        if verdict is None:
+            if self.validator is None:
+                self.validator = load_stream_validator(self.schema_path)
+            _, errors, warnings = validate_loaded(item.path, item.document, item.error, self.validator)
+        else:
+            errors, warnings = verdict
+        return len(errors), len(warnings)
+
+    def _file_metrics(self, item) -> Dict:
+        members = [m for m in item.members if isinstance(m, dict)] if isinstance(item.members, list) else []
+        defects = Counter()
+        readings = 0
+        for member in members:
+            kinds = check_member(member)
+            defects.update(kinds)
+            readings += bool(kinds)
+        schema_errors, schema_warnings = self._schema_counts(item)
+        return {
+            'members': len(members),
+            'with_x': sum(1 for c in item.councillors if c.has_x),
+            'schema_errors': schema_errors,
+            'schema_warnings': schema_warnings,
+            'readings': readings,
+            'reading_defects': dict(sorted(defects.items())),
+            'missing_affiliation': sum(1 for c in item.councillors if normalize_party(c.party) == UNKNOWN_PARTY),
+        }
+
+    def add(self, item):
+        previous = self.previous.get(item.relpath)
+        if previous is not None and previous.get('digest') == item.digest:
+            metrics = {key: previous[key] for key in FILE_METRICS}
+            self.reused += 1
+        else:
+            metrics = self._file_metrics(item)
+            self.computed += 1
+        self.rows.append({'relpath': item.relpath, 'code': item.code, 'name': item.name,
+                          'prefecture': item.prefecture, 'digest': item.digest, **metrics})
+
+    def build(self, freshness: Iterable[Dict] = (), duplicates: Iterable = (), liveness: Optional[Iterable] = None,
+              unmatched_raw: Iterable = (), today: Optional[date] = None) -> Dict:
+        """ファイルをまたぐ項目（鮮度・重複・X URLの生存）を加えて採点する"""
+        ages = {row['relpath']: row for row in freshness}
+        duplicate_counts = Counter(_location_relpath(entry) for cluster in duplicates for entry in cluster.entries)
+        dead_counts = Counter(_location_relpath(problem[0]) for problem in liveness or ())
+        rows = []
+        for row in self.rows:
+            fresh = ages.get(row['relpath'], {})
+            latest = fresh.get('latest')
+            row = dict(row, latest_snapshot=latest.isoformat() if latest else None,
+                       snapshot_age=fresh.get('age'), duplicates=duplicate_counts[row['relpath']],
+                       dead_x=dead_counts[row['relpath']], liveness_checked=liveness is not None)
+            row['scores'] = {kind: round(score, 3) for kind, score in component_scores(row).items()}
+            row['score'] = round(sum(COMPONENTS[kind][0] * score for kind, score in row['scores'].items())
+                                 / TOTAL_WEIGHT * 100, 1)
+            rows.append(row)
+        unmatched_raw = list(unmatched_raw)
+        return {
+            'version': SCORECARD_VERSION,
+            'as_of': (today or date.today()).isoformat(),
+            'schema_digest': self.schema_digest,
+            'weights': {kind: weight for kind, (weight, _) in COMPONENTS.items()},
+            'municipalities': rows,
+            'unmatched_raw': [snapshots.key for snapshots in unmatched_raw],
+            'actions': rank_actions(rows, unmatched_raw),
+        }
+
+    def save(self, scorecard: Dict) -> bool:
+        """内容が変わった場合だけ一時ファイル経由で書き込み、書き込んだかを返す"""
+        text = json.dumps(scorecard, ensure_ascii=False, indent=2) + '\n'
+        try:
+            if self.path.read_text(encoding='utf-8') == text:
+                return False
+        except OSError:
+            pass
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+        return True
+
+
+def format_scorecard(scorecard: Dict, top: int = ACTION_LIMIT) -> List[str]:
+    lines = [f"=== データ品質スコアカード（{scorecard['as_of']}） ==="]
+    lines.append("\n## 推奨アクション")
+    for i, action in enumerate(scorecard['actions'][:top], 1):
+        lines.append(f"{i}. {action['action']}（優先度 {action['priority']:g}）")
+    lines.append("\n## 品質スコアの低い自治体")
+    lines.append("| 自治体 | 都道府県 | スコア | " + " | ".join(title for _, title in COMPONENTS.values()) + " |")
+    lines.append("|" + "------|" * (len(COMPONENTS) + 3))
+    for row in sorted(scorecard['municipalities'], key=lambda r: (r['score'], r['relpath']))[:top]:
+        cells = " | ".join(f"{row['scores'][kind]:.2f}" for kind in COMPONENTS)
+        lines.append(f"| {row['name']} | {row['prefecture']} | {row['score']:.1f} | {cells} |")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='保存済みのデータ品質スコアカードを表示')
+    parser.add_argument('--top', type=int, default=ACTION_LIMIT, help='表示するアクション・自治体の数')
+    args = parser.parse_args(argv)
+
+    scorecard = load_scorecard(scorecard_path_for(DATA_DIR))
+    if scorecard is None:
+        print("スコアカードがありません（python scripts/check_data_quality.py で作成）", file=sys.stderr)
+        return 1
+    for line in format_scorecard(scorecard, args.top):
+        print(line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -21,6 +21,10 @@ from datetime import datetime
 import webbrowser
 import urllib.parse
 
+from corpus import has_x_account, parse_filename
+from statistics_engine import MunicipalityCounts, merge_counts
+from statistics_store import directory_counts
+
 class XAccountSearcher:
     """Xアカウント検索クラス"""
     
@@ -138,7 +142,7 @@ class XAccountSearcher:
         without_account = []
         
         for member in self.data:
-            if member.get('X（旧Twitter）'):
+            if has_x_account(member):
                 with_account.append(member)
             else:
                 without_account.append(member)
@@ -307,20 +311,41 @@ def process_municipality(json_path: Path) -> Dict:
     }
 
 def generate_prefecture_report(prefecture_dir: Path, results: List[Dict]):
-    """都道府県レベルの統合レポート生成"""
+    """都道府県レベルの統合レポート生成
+    
+    議員数・X登録数は統計ストアの自治体ごとの集計値を使う（内容が変わった自治体だけ数え直す）。
+    統計ストアに集計値がない自治体は process_municipality() で数えた値を使い、レポートに明記する。
+    """
+    partials = directory_counts(prefecture_dir.parent, prefecture_dir.name)
+    counts = []
+    unmatched = []
+    for r in results:
+        path = Path(r['path'])
+        relpath = f"{prefecture_dir.name}/{path.name}"
+        if relpath in partials:
+            counts.append(partials[relpath])
+            continue
+        code, name = parse_filename(path)
+        counts.append(MunicipalityCounts(code, r['name'] or name, prefecture_dir.name,
+                                         r['total'], r['with_account']))
+        unmatched.append(r['name'] or name)
+    
     report = []
     report.append(f"# {prefecture_dir.name} Xアカウント収集状況")
     report.append(f"生成日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     report.append("")
     
-    # 統計
-    total_members = sum(r['total'] for r in results)
-    total_with_account = sum(r['with_account'] for r in results)
+    # 統計（自治体ごとの集計値を都道府県の合計にまとめる）
+    total = merge_counts(counts)
+    total_members = total.total
+    total_with_account = total.with_x
     
     report.append("## 統計サマリー")
-    report.append(f"- 自治体数: {len(results)}")
+    report.append(f"- 自治体数: {len(counts)}")
     report.append(f"- 総議員数: {total_members}")
-    report.append(f"- Xアカウント登録済み: {total_with_account} ({total_with_account/total_members*100:.1f}%)")
+    report.append(f"- Xアカウント登録済み: {total_with_account} ({total.rate:.1f}%)")
+    if unmatched:
+        report.append(f"- 統計ストアに集計値がない自治体（個別に集計）: {', '.join(unmatched)}")
     report.append("")
     
     # 自治体別詳細
@@ -329,12 +354,10 @@ def generate_prefecture_report(prefecture_dir: Path, results: List[Dict]):
     report.append("|----------|--------|---------|--------|----------|")
     
     # 登録率でソート
-    sorted_results = sorted(results, key=lambda x: x['percentage'], reverse=True)
-    
-    for r in sorted_results:
+    for c in sorted(counts, key=lambda c: c.rate, reverse=True):
         report.append(
-            f"| {r['name']} | {r['total']} | {r['with_account']} | "
-            f"{r['percentage']:.1f}% | {r['without_account']} |"
+            f"| {c.name} | {c.total} | {c.with_x} | "
+            f"{c.rate:.1f}% | {c.total - c.with_x} |"
         )
     
     # 保存
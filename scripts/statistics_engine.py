@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+議員データの統計エンジン
+
+議員1人ごとにdictを作って数える代わりに、議員を列（自治体インデックス・所属ID・
+X登録フラグ）として array に詰め、集計はまとめて行う:
+- 自治体ごとの議員数・X登録数は列全体のbincount（collections.Counter）で求める
+- 自治体×所属の議員数は (自治体, 所属) の組のbincountで求める
+- 同名の自治体・都道府県・全国への集約は自治体単位の集計値を足し合わせるだけ
+- ランキングは全体をソートせずに heapq の上位k件・下位k件で取り出す
+- 政党別の集計は会派別の人数を会派名ごとに1回だけ政党名に変換してまとめる（parties.py）
+
+NumPyは使わず標準ライブラリだけで動く（列は array、bincountは Counter で行う）。
+"""
+
+import heapq
+import statistics
+from array import array
+from collections import Counter
+from itertools import compress
+from typing import Dict, Iterable, List, Optional
+
+from parties import UNKNOWN_PARTY, party_groups, rollup_parties
+
+PERCENTILES = (10, 25, 50, 75, 90)
+RANKING_SIZE = 10
+
+
+def bincount(values: Iterable[int], minlength: int = 0) -> List[int]:
+    """0以上の整数の出現回数（numpy.bincount と同じ形のリスト）"""
+    counts = Counter(values)
+    size = max(minlength, max(counts) + 1 if counts else 0)
+    return [counts.get(i, 0) for i in range(size)]
+
+
+def registration_rate(with_x: int, total: int) -> float:
+    """X登録率（%）"""
+    return with_x / total * 100 if total > 0 else 0
+
+
+class CouncillorTable:
+    """議員を列で持つ表（自治体はファイル単位、所属は出現順のID）"""
+
+    def __init__(self):
+        self.codes: List[str] = []
+        self.names: List[str] = []
+        self.prefectures: List[str] = []
+        self.parties: List[str] = []
+        self._party_ids: Dict[str, int] = {}
+        self._corpus_party_ids: Dict[int, List[int]] = {}
+        self.municipality = array('I')
+        self.party = array('I')
+        self.has_x = array('B')
+
+    def party_id(self, party: str) -> int:
+        party_id = self._party_ids.get(party)
+        if party_id is None:
+            party_id = self._party_ids[party] = len(self.parties)
+            self.parties.append(party)
+        return party_id
+
+    def add_municipality(self, code: str, name: str, prefecture: str, councillors):
+        """1ファイル分の議員（Councillor）を表の末尾に追加"""
+        index = len(self.codes)
+        self.codes.append(code)
+        self.names.append(name)
+        self.prefectures.append(prefecture)
+        self.municipality.extend([index] * len(councillors))
+        self.party.extend([self.party_id(c.party or UNKNOWN_PARTY) for c in councillors])
+        self.has_x.extend([c.has_x for c in councillors])
+
+    def add(self, item):
+        """1ファイル分（Municipality / SourceFile / PipelineItem）を追加
+
+        スナップショットの自治体は議員データを復元せず、所属IDとXの列をそのまま取り込む。
+        """
+        muni = getattr(item, 'municipality', item)
+        columns = muni.columns() if hasattr(muni, 'columns') else None
+        if columns is None:
+            self.add_municipality(item.code, item.name, item.prefecture, item.councillors)
+            return
+        party_column, x_column = columns
+        mapping = self._corpus_party_ids.get(id(muni.corpus))
+        if mapping is None or len(mapping) != len(muni.corpus.parties):
+            mapping = self._corpus_party_ids[id(muni.corpus)] = [
+                self.party_id(party or UNKNOWN_PARTY) for party in muni.corpus.parties
+            ]
+        index = len(self.codes)
+        self.codes.append(muni.code)
+        self.names.append(muni.name)
+        self.prefectures.append(muni.prefecture)
+        self.municipality.extend([index] * len(party_column))
+        self.party.extend(map(mapping.__getitem__, party_column))
+        self.has_x.extend([bool(x) and x != 'null' for x in x_column])
+
+    def __len__(self):
+        return len(self.municipality)
+
+
+class MunicipalityCounts:
+    """1ファイル（自治体）分の集計値"""
+
+    __slots__ = ('code', 'name', 'prefecture', 'total', 'with_x', 'parties')
+
+    def __init__(self, code: str, name: str, prefecture: str, total: int = 0, with_x: int = 0,
+                 parties: Optional[Dict[str, int]] = None):
+        self.code = code
+        self.name = name
+        self.prefecture = prefecture
+        self.total = total
+        self.with_x = with_x
+        self.parties = parties if parties is not None else {}
+
+    @property
+    def rate(self) -> float:
+        return registration_rate(self.with_x, self.total)
+
+    def merge(self, other: 'MunicipalityCounts'):
+        """別の集計値を足し込む（所属は初出順を保つ）"""
+        self.total += other.total
+        self.with_x += other.with_x
+        parties = self.parties
+        for party, count in other.parties.items():
+            parties[party] = parties.get(party, 0) + count
+
+    def __repr__(self):
+        return f'MunicipalityCounts({self.code!r}, {self.name!r}, {self.with_x}/{self.total})'
+
+
+def count_municipalities(table: CouncillorTable) -> List[MunicipalityCounts]:
+    """表から自治体（ファイル）ごとの集計値を表の順に求める"""
+    n = len(table.codes)
+    totals = bincount(table.municipality, n)
+    with_x = bincount(compress(table.municipality, table.has_x), n)
+    result = [MunicipalityCounts(table.codes[i], table.names[i], table.prefectures[i], totals[i], with_x[i])
+              for i in range(n)]
+    # Counterは (自治体, 所属) の初出順を保つので、自治体ごとの所属も初出順に並ぶ
+    parties = table.parties
+    for (index, party_id), count in Counter(zip(table.municipality, table.party)).items():
+        result[index].parties[parties[party_id]] = count
+    return result
+
+
+def count_municipality(item) -> MunicipalityCounts:
+    """1ファイル分（Municipality / SourceFile / PipelineItem）の集計値を求める
+
+    count_municipalities() と同じ結果になる（所属も初出順）。
+    """
+    muni = getattr(item, 'municipality', item)
+    counts = MunicipalityCounts(muni.code, muni.name, muni.prefecture)
+    parties = counts.parties
+    columns = muni.columns() if hasattr(muni, 'columns') else None
+    if columns is None:
+        councillors = item.councillors
+        counts.total = len(councillors)
+        counts.with_x = sum(1 for c in councillors if c.has_x)
+        for party, count in Counter(c.party or UNKNOWN_PARTY for c in councillors).items():
+            parties[party] = count
+        return counts
+    party_column, x_column = columns
+    counts.total = len(party_column)
+    counts.with_x = sum(1 for x in x_column if x and x != 'null')
+    names = muni.corpus.parties
+    for party_id, count in Counter(party_column).items():
+        party = names[party_id] or UNKNOWN_PARTY
+        parties[party] = parties.get(party, 0) + count
+    return counts
+
+
+def group_counts(counts: Iterable[MunicipalityCounts], key) -> List[MunicipalityCounts]:
+    """集計値をキーごとに足し合わせる（グループはキーの初出順、議員のいない自治体は除く）"""
+    groups: Dict[str, MunicipalityCounts] = {}
+    for c in counts:
+        if c.total == 0:
+            continue
+        name = key(c)
+        group = groups.get(name)
+        if group is None:
+            group = groups[name] = MunicipalityCounts(c.code, c.name, c.prefecture)
+        group.code = c.code
+        group.merge(c)
+    return list(groups.values())
+
+
+def merge_counts(partials: Iterable[MunicipalityCounts], code: str = '', name: str = '',
+                 prefecture: str = '') -> MunicipalityCounts:
+    """集計値を1つにまとめる（都道府県・全国の合計）"""
+    total = MunicipalityCounts(code, name, prefecture)
+    for partial in partials:
+        total.merge(partial)
+    return total
+
+
+def percentiles(values: List[float], points=PERCENTILES) -> Dict[int, float]:
+    """百分位数（データが1件ならその値、0件なら空）"""
+    if not values:
+        return {}
+    if len(values) == 1:
+        return {p: values[0] for p in points}
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return {p: cuts[p - 1] for p in points}
+
+
+class StatisticsResult:
+    """統計レポートの集計結果
+
+    municipalities は自治体名ごと（同名の自治体は合算、Markdownのランキングの単位）、
+    files はファイル（自治体コード）ごと、prefectures は都道府県ごとの集計値。
+    parties は会派名ごと、national_parties は政党ごと（会派名を正規化してまとめたもの）の議員数。
+    """
+
+    def __init__(self, files: List[MunicipalityCounts], ranking_size: int = RANKING_SIZE):
+        self.files = [c for c in files if c.total > 0]
+        self.municipalities = group_counts(self.files, lambda c: c.name)
+        self.prefectures = group_counts(self.files, lambda c: c.prefecture)
+        self.total_members = sum(c.total for c in self.municipalities)
+        self.total_with_x = sum(c.with_x for c in self.municipalities)
+
+        self.parties = merge_counts(self.municipalities, name='全国').parties
+        self.national_parties = rollup_parties(self.parties)
+        self.party_groups = party_groups(self.parties)
+
+        rates = [c.rate for c in self.municipalities]
+        self.rates = rates
+        self.percentiles = percentiles(rates)
+        indices = range(len(rates))
+        # heapq.nlargest は sorted(..., reverse=True)[:k] と同じ順（同率は出現順）で返す
+        self.top = heapq.nlargest(ranking_size, indices, key=rates.__getitem__)
+        nonzero = [i for i in indices if rates[i] > 0]
+        # 登録率の降順に並べたときの末尾k件（同率は後に出現したものほど下位）
+        self.bottom = heapq.nlargest(ranking_size, nonzero, key=lambda i: (-rates[i], i))[::-1]
+        self.zero = [i for i in indices if rates[i] == 0]
+
+    def top_parties(self, k: int = RANKING_SIZE):
+        """議員数の多い所属の上位k件（同数は初出順）"""
+        return heapq.nlargest(k, self.parties.items(), key=lambda item: item[1])
+
+    def top_national_parties(self, k: Optional[int] = None):
+        """議員数の多い政党（kを省略すると全て、同数は初出順）"""
+        k = len(self.national_parties) if k is None else k
+        return heapq.nlargest(k, self.national_parties.items(), key=lambda item: item[1])
+
+
+def compute_statistics(table: CouncillorTable, ranking_size: int = RANKING_SIZE) -> StatisticsResult:
+    return StatisticsResult(count_municipalities(table), ranking_size)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+自治体ごとの統計の部分集計（パーシャル）を保存するストア
+
+自治体（ファイル）ごとに議員数・X登録数・会派別人数をファイル内容のハッシュと一緒に
+.cache/corpus/aggregates.bin に保存する。統計レポート・都道府県レポート・data.js の行は
+このパーシャルを足し合わせて作るため、ファイルが変わっても集計し直すのはその自治体だけになる。
+都道府県・全国の値はパーシャルのマージ（statistics_engine.MunicipalityCounts.merge）で求める。
+
+パーシャルにはファイルのサイズと更新時刻も記録し、パイプラインを通さずにディレクトリ単位で
+集計する場合（directory_counts）は、これらが変わったファイルだけを読み直す。
+"""
+
+import marshal
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from corpus import FILE_PATTERN, SourceFile, cache_path_for, iter_source_files
+from statistics_engine import MunicipalityCounts, count_municipality
+
+# 保存形式（パーシャルの内容や集計方法を変えたら上げる）
+STORE_VERSION = 1
+
+_stores: Dict[str, 'AggregateStore'] = {}
+_stores_lock = threading.Lock()
+
+
+def _stat(path) -> tuple:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (-1, -1)
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _to_entry(digest: str, stat: tuple, counts: MunicipalityCounts) -> tuple:
+    return (digest, stat[0], stat[1], counts.code, counts.name, counts.prefecture,
+            counts.total, counts.with_x, list(counts.parties.items()))
+
+
+def _from_entry(entry: tuple) -> MunicipalityCounts:
+    _, _, _, code, name, prefecture, total, with_x, parties = entry
+    return MunicipalityCounts(code, name, prefecture, total, with_x, dict(parties))
+
+
+class AggregateStore:
+    """相対パスごとのパーシャル {relpath: (ハッシュ, サイズ, 更新時刻, コード, 自治体名, 都道府県, 議員数, X登録数, 会派別人数)}
+
+    パイプラインの複数のステージ（別スレッド）から使えるように操作はロックで保護する。
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: Dict[str, tuple] = self._load()
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.hits = 0
+        self.computed = 0
+
+    def _load(self) -> Dict[str, tuple]:
+        try:
+            with open(self.path, 'rb') as f:
+                payload = marshal.load(f)
+        except (OSError, ValueError, EOFError, TypeError):
+            return {}
+        if not isinstance(payload, dict) or payload.get('version') != STORE_VERSION:
+            return {}
+        return payload['entries']
+
+    def get(self, relpath: str, digest: str, path=None) -> Optional[MunicipalityCounts]:
+        """内容が同じファイルのパーシャル（なければNone）"""
+        with self.lock:
+            entry = self.entries.get(relpath)
+            if entry is None or entry[0] != digest:
+                return None
+            self.hits += 1
+            if path is not None:
+                # 内容が同じまま更新時刻だけ変わった場合は記録を合わせる
+                stat = _stat(path)
+                if stat != entry[1:3]:
+                    self.entries[relpath] = (digest,) + stat + entry[3:]
+                    self.dirty = True
+            return _from_entry(entry)
+
+    def put(self, relpath: str, digest: str, counts: MunicipalityCounts, path=None):
+        with self.lock:
+            self.entries[relpath] = _to_entry(digest, _stat(path) if path is not None else (-1, -1), counts)
+            self.computed += 1
+            self.dirty = True
+
+    def counts(self, item) -> MunicipalityCounts:
+        """1ファイル分のパーシャル（保存されていなければその自治体だけを集計して保存）"""
+        counts = self.get(item.relpath, item.digest, item.path)
+        if counts is None:
+            counts = count_municipality(item)
+            self.put(item.relpath, item.digest, counts, item.path)
+        return counts
+
+    def retain(self, relpaths: Iterable[str]):
+        """指定したファイル以外のパーシャルを削除（コーパス全体を集計したときに使う）"""
+        keep = set(relpaths)
+        with self.lock:
+            stale = [relpath for relpath in self.entries if relpath not in keep]
+            for relpath in stale:
+                del self.entries[relpath]
+            if stale:
+                self.dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                marshal.dump({'version': STORE_VERSION, 'entries': self.entries}, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+    def format_cache_stats(self) -> str:
+        return f"[aggregates] 自治体別の集計: 再利用 {self.hits}, 集計 {self.computed}"
+
+
+def open_store(data_dir: Path, path: Optional[Path] = None) -> AggregateStore:
+    """データディレクトリごとのストア（同じプロセス内では同じオブジェクトを共有する）"""
+    path = Path(path) if path else cache_path_for(data_dir, 'aggregates', '.bin')
+    key = os.fspath(path.resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = AggregateStore(path)
+        return store
+
+
+def directory_counts(data_dir: Path, prefecture: Optional[str] = None,
+                     store: Optional[AggregateStore] = None) -> Dict[str, MunicipalityCounts]:
+    """データディレクトリ（prefecture を指定するとその都道府県だけ）のパーシャルを {相対パス: 集計値} でパス順に返す
+
+    サイズと更新時刻が記録と同じファイルは読み込まずにパーシャルを使う。
+    """
+    data_dir = Path(data_dir)
+    store = store or open_store(data_dir)
+    if prefecture is None:
+        paths = iter_source_files(data_dir)
+    else:
+        paths = sorted((data_dir / prefecture).glob(FILE_PATTERN))
+    result = {}
+    for path in paths:
+        relpath = path.relative_to(data_dir).as_posix()
+        with store.lock:
+            entry = store.entries.get(relpath)
+            fresh = entry is not None and entry[1:3] == _stat(path)
+            if fresh:
+                store.hits += 1
+        if fresh:
+            result[relpath] = _from_entry(entry)
+        else:
+            result[relpath] = store.counts(SourceFile(data_dir, relpath))
+    store.save()
+    return result
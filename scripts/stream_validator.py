@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+議員リストJSONを要素ごとに読み込みながら検証するストリーミング検証
+
+ファイルをチャンク単位で読み込み、トップレベルの配列を
+「配列の開始 → 要素 → 区切り → … → 配列の終了」のイベントとして走査する。
+各要素は読み込んだ時点でJSONデコーダ（C実装）で1つだけ復元し、
+コンパイル済みのスキーマ（schema_validator.py）で検証してすぐに捨てるため、
+メモリ使用量はファイル全体ではなく1要素分（と読み込みチャンク）に収まる。
+
+- 全ての違反をJSONポインタ（例: /3/X（旧Twitter））と行・列付きで集める
+- 構文エラーの後も次の要素の先頭まで読み飛ばして検証を続ける
+- エラーが上限（error budget）に達した時点で検証を打ち切る
+
+使用方法:
+    from stream_validator import load_stream_validator
+    validator = load_stream_validator('schema/municipal_councillor_v1.2.json')
+    with open(path, 'rb') as f:
+        result = validator.validate_stream(f, max_errors=100)
+    for error in result.errors:
+        print(error)   # 例: 54:28: /12/X（旧Twitter）: 'https://x.com/abc/' does not match ...
+"""
+
+import codecs
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from json.decoder import scanstring
+from typing import Dict, List, Optional, Tuple
+
+from schema_validator import ANNOTATION_KEYWORDS, SchemaError, Validator
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_ERRORS = 100
+
+# 1要素として復元を試みる最大の文字数（壊れた要素のために残り全体を読み込まない）
+MAX_ELEMENT_CHARS = 1024 * 1024
+
+WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+# 構文エラーの後に読み飛ばす先（次の要素の開始 "}, {"。カンマの欠落も含む）
+RESYNC_RE = re.compile(r'\}[ \t\n\r]*,?[ \t\n\r]*(?=\{)')
+
+ARRAY_KEYWORDS = frozenset({'type', 'items', 'minItems', 'maxItems'})
+
+_decoder = json.JSONDecoder()
+
+
+def json_pointer(path: Tuple) -> str:
+    """(3, 'X（旧Twitter）') → '/3/X（旧Twitter）'（RFC 6901）"""
+    return ''.join('/' + str(part).replace('~', '~0').replace('/', '~1') for part in path)
+
+
+class StreamError:
+    """位置付きの検証エラー（line・columnは1始まり）"""
+
+    __slots__ = ('pointer', 'line', 'column', 'message')
+
+    def __init__(self, pointer: str, line: int, column: int, message: str):
+        self.pointer = pointer
+        self.line = line
+        self.column = column
+        self.message = message
+
+    def __str__(self):
+        location = f'{self.line}:{self.column}'
+        return f'{location}: {self.pointer}: {self.message}' if self.pointer else f'{location}: {self.message}'
+
+    def __repr__(self):
+        return f'StreamError({str(self)!r})'
+
+
+class StreamResult:
+    """1ファイル分の検証結果"""
+
+    def __init__(self):
+        self.digest = ''
+        self.errors: List[StreamError] = []
+        self.is_array: Optional[bool] = None  # 構文エラーで判定できなければNone
+        self.count = 0
+        self.truncated = False
+
+
+class _Buffer:
+    """チャンク単位で読み込んだテキストと、その先頭の行・列"""
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.sha1 = hashlib.sha1()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+        self.line = 1
+        self.column = 1
+
+    def fill(self) -> bool:
+        """次のチャンクを読み込む（ファイルの終わりならFalse）"""
+        if self.eof:
+            return False
+        chunk = self.fp.read(CHUNK_SIZE)
+        self.sha1.update(chunk)
+        if not chunk:
+            self.eof = True
+            self.text += self.decoder.decode(b'', final=True)
+            return False
+        self.text += self.decoder.decode(chunk)
+        return True
+
+    def drain(self) -> str:
+        """残りを読み捨ててファイル全体のハッシュを返す"""
+        while not self.eof:
+            chunk = self.fp.read(CHUNK_SIZE)
+            if not chunk:
+                self.eof = True
+            self.sha1.update(chunk)
+        return self.sha1.hexdigest()
+
+    def compact(self):
+        """処理済みの部分を捨てる（行・列は捨てた分だけ進める）"""
+        pos = self.pos
+        if pos < CHUNK_SIZE:
+            return
+        newlines = self.text.count('\n', 0, pos)
+        if newlines:
+            self.line += newlines
+            self.column = pos - self.text.rfind('\n', 0, pos)
+        else:
+            self.column += pos
+        self.text = self.text[pos:]
+        self.pos = 0
+
+    def location(self, offset: int) -> Tuple[int, int]:
+        """バッファ内の位置 → (行, 列)"""
+        last = self.text.rfind('\n', 0, offset)
+        if last < 0:
+            return self.line, self.column + offset
+        return self.line + self.text.count('\n', 0, offset), offset - last
+
+    def peek(self) -> str:
+        """空白を読み飛ばして次の文字を返す（ファイルの終わりなら空文字）"""
+        while True:
+            self.pos = WHITESPACE_RE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ''
+
+    def decode(self):
+        """現在位置の値を1つ復元し (値, 終了位置) を返す（途中で切れていれば読み足す）"""
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if len(self.text) - self.pos < MAX_ELEMENT_CHARS and self.fill():
+                    continue
+                raise
+            # 数値などは読み込んだ範囲の末尾で切れている可能性がある
+            if end == len(self.text) and self.fill():
+                continue
+            return value, end
+
+    def resync(self, offset: int) -> bool:
+        """offset以降の次の要素の先頭へ移動する（見つからなければFalse）"""
+        while True:
+            match = RESYNC_RE.search(self.text, offset)
+            if match:
+                self.pos = match.end()
+                return True
+            if len(self.text) - offset >= MAX_ELEMENT_CHARS or not self.fill():
+                return False
+
+
+def _locate(text: str, pos: int, path: Tuple) -> int:
+    """pos から始まる値の中で path が指す値の開始位置（見つからなければ最も近い親の位置）"""
+    for key in path:
+        pos = WHITESPACE_RE.match(text, pos).end()
+        opening = text[pos:pos + 1]
+        if opening not in ('{', '['):
+            return pos
+        cursor = WHITESPACE_RE.match(text, pos + 1).end()
+        index = 0
+        found = None
+        while cursor < len(text) and text[cursor] not in '}]':
+            if opening == '{':
+                if text[cursor] != '"':
+                    return pos
+                name, cursor = scanstring(text, cursor + 1)
+                cursor = WHITESPACE_RE.match(text, cursor).end() + 1  # ':'
+                cursor = WHITESPACE_RE.match(text, cursor).end()
+                matched = name == key
+            else:
+                matched = index == key
+                index += 1
+            if matched:
+                found = cursor
+                break
+            cursor = WHITESPACE_RE.match(text, _decoder.raw_decode(text, cursor)[1]).end()
+            if text[cursor:cursor + 1] == ',':
+                cursor = WHITESPACE_RE.match(text, cursor + 1).end()
+        if found is None:
+            return pos
+        pos = found
+    return WHITESPACE_RE.match(text, pos).end()
+
+
+class StreamValidator:
+    """スキーマから作るストリーミング検証
+
+    ルートが配列のスキーマ（v1.2）は items を要素ごとに、minItems/maxItems を最後に検証する。
+    ルートがオブジェクトのスキーマ（v1.1）は配列の各要素をそのスキーマで検証する。
+    """
+
+    def __init__(self, schema: Dict):
+        types = schema.get('type')
+        if types == 'array' or (isinstance(types, list) and 'array' in types):
+            unsupported = set(schema) - ANNOTATION_KEYWORDS - ARRAY_KEYWORDS
+            if unsupported:
+                raise SchemaError(f'ストリーミング検証に未対応のキーワード: {", ".join(sorted(unsupported))}')
+            items = schema.get('items', {})
+            if not isinstance(items, dict):
+                raise SchemaError('タプル形式のitemsには未対応です')
+            self.document_validator = Validator(schema)
+            self.item_validator = Validator(items)
+            self.min_items = schema.get('minItems', 0)
+            self.max_items = schema.get('maxItems')
+        else:
+            self.document_validator = None
+            self.item_validator = Validator(schema)
+            self.min_items = 0
+            self.max_items = None
+
+    def is_valid(self, document) -> bool:
+        """読み込み済みの配列が妥当か（エラーの位置が不要な場合の高速な判定）"""
+        if self.document_validator is not None:
+            return self.document_validator.is_valid(document)
+        is_valid = self.item_validator.is_valid
+        return all(is_valid(item) for item in document)
+
+    def validate_stream(self, fp, max_errors: int = DEFAULT_MAX_ERRORS) -> StreamResult:
+        """バイナリモードで開いたファイルを要素ごとに検証する"""
+        result = StreamResult()
+        buffer = _Buffer(fp)
+        try:
+            self._walk(buffer, result, max_errors)
+        except UnicodeDecodeError as e:
+            line, column = buffer.location(len(buffer.text))
+            result.errors.append(StreamError('', line, column, f'Invalid JSON - {e}'))
+        result.digest = buffer.drain()
+        return result
+
+    def _syntax_error(self, buffer: _Buffer, result: StreamResult, message: str, offset: int):
+        line, column = buffer.location(offset)
+        result.errors.append(StreamError('', line, column, f'Invalid JSON - {message}'))
+
+    def _walk(self, buffer: _Buffer, result: StreamResult, max_errors: int):
+        errors = result.errors
+        first = buffer.peek()
+        if first != '[':
+            # 配列以外は値全体を読み、配列でないことだけを判定する
+            if first == '':
+                self._syntax_error(buffer, result, 'Expecting value', buffer.pos)
+                return
+            try:
+                _, buffer.pos = buffer.decode()
+            except json.JSONDecodeError as e:
+                self._syntax_error(buffer, result, e.msg, e.pos)
+                return
+            result.is_array = False
+            self._check_trailing(buffer, result)
+            return
+
+        result.is_array = True
+        array_start = buffer.pos
+        array_location = buffer.location(array_start)
+        buffer.pos += 1
+        index = 0
+        if buffer.peek() == ']':
+            buffer.pos += 1
+        else:
+            while True:
+                if len(errors) >= max_errors:
+                    result.truncated = True
+                    return
+                next_char = buffer.peek()
+                start = buffer.pos
+                try:
+                    if next_char == '':
+                        raise json.JSONDecodeError('Expecting value', buffer.text, start)
+                    value, end = buffer.decode()
+                except json.JSONDecodeError as e:
+                    self._syntax_error(buffer, result, e.msg, e.pos)
+                    index += 1
+                    result.count = index
+                    if buffer.resync(e.pos):
+                        continue
+                    return
+
+                self._check_item(buffer, result, value, index, start, max_errors)
+                index += 1
+                result.count = index
+                buffer.pos = end
+                buffer.compact()
+
+                delimiter = buffer.peek()
+                if delimiter == ',':
+                    buffer.pos += 1
+                    continue
+                if delimiter == ']':
+                    buffer.pos += 1
+                    break
+                message = "Expecting ',' delimiter" if delimiter else "Expecting ',' or ']'"
+                self._syntax_error(buffer, result, message, buffer.pos)
+                if delimiter != '{':
+                    return
+
+        if index < self.min_items or (self.max_items is not None and index > self.max_items):
+            errors.append(StreamError('', *array_location, f'Array has invalid length: {index}'))
+        self._check_trailing(buffer, result)
+        if len(errors) > max_errors:
+            del errors[max_errors:]
+            result.truncated = True
+
+    def _check_item(self, buffer: _Buffer, result: StreamResult, value, index: int, start: int,
+                    max_errors: int):
+        for error in self.item_validator.iter_errors(value):
+            if len(result.errors) >= max_errors:
+                result.truncated = True
+                return
+            line, column = buffer.location(_locate(buffer.text, start, error.path))
+            result.errors.append(StreamError(json_pointer((index,) + error.path), line, column, error.message))
+
+    def _check_trailing(self, buffer: _Buffer, result: StreamResult):
+        if buffer.peek() != '':
+            self._syntax_error(buffer, result, 'Extra data', buffer.pos)
+
+
+@lru_cache(maxsize=None)
+def _load_stream_validator(path: str, mtime_ns: int) -> StreamValidator:
+    with open(path, encoding='utf-8') as f:
+        return StreamValidator(json.load(f))
+
+
+def load_stream_validator(path) -> StreamValidator:
+    """スキーマファイルからストリーミング検証を作る（更新されるまで再コンパイルしない）"""
+    path = os.fspath(path)
+    return _load_stream_validator(path, os.stat(path).st_mtime_ns)
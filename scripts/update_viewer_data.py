@@ -2,29 +2,87 @@
 """
 HTMLビューア用のデータファイル(data.js)と各自治体の詳細データを自動生成するスクリプト
 JSONファイルから議員数とX登録数を集計し、JavaScriptファイルを生成する
+
+ビルドマニフェスト(viewer/js/build_manifest.json)に入力JSONと生成ファイルの
+ハッシュを記録し、内容が変わった自治体だけを再生成する。
+data.js は変更された行だけを差し替える。
+
+使用方法:
+    python scripts/update_viewer_data.py          # 差分ビルド
+    python scripts/update_viewer_data.py --full   # 全自治体を再生成
+    python scripts/update_viewer_data.py --workers 8  # 読み込みの並列数を指定
+    python scripts/update_viewer_data.py --cache-stats  # コーパスキャッシュの利用状況を表示
+    python scripts/update_viewer_data.py --changed-since HEAD~1  # git diffで変わった自治体だけ更新
+
+--changed-since を指定するとコーパスを読み込まず、git diff --name-only で変更された
+ファイルだけを読み込んで既存の data.js の該当行を差し替える。
 """
 
+import hashlib
 import json
 import os
+import re
+import sys
 from pathlib import Path
 from datetime import datetime
 
-def load_json_file(file_path):
-    """JSONファイルを読み込む"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+from corpus import (changed_sources, parse_changed_since_option, parse_filename,
+                    parse_workers_option, print_cache_stats)
+from pipeline import Stage, run_pipeline
+from statistics_store import open_store
 
-def get_municipality_info(json_path):
-    """ファイル名から自治体情報を取得"""
-    filename = json_path.stem
-    parts = filename.split('_')
-    
-    if len(parts) >= 3:
-        code = parts[1]
-        municipality_name = parts[2]
-        return code, municipality_name
-    
-    return None, None
+MANIFEST_VERSION = 1
+# 出力内容を決めるモジュール（どれかが変わったら全自治体を再生成する）
+GENERATOR_MODULES = ('update_viewer_data', 'corpus', 'councillor', 'statistics_store',
+                     'statistics_engine', 'parties')
+
+# 都道府県マップ
+PREFECTURE_MAP = {
+    "11": "11_埼玉県",
+    "13": "13_東京都"
+}
+DATA_JS_ROW_RE = re.compile(r"^    '(\d+)': \{")
+
+def content_hash(text):
+    """生成内容のSHA-1ハッシュ"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def load_manifest(manifest_path):
+    """ビルドマニフェストを読み込む（存在しない・形式が違う場合は空）"""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+def save_manifest(manifest_path, manifest):
+    """ビルドマニフェストを書き込む"""
+    manifest['version'] = MANIFEST_VERSION
+    tmp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, manifest_path)
+
+def generator_hash():
+    """このスクリプトと出力内容を決めるモジュールのハッシュ（出力形式が変わったら全再生成するため）"""
+    scripts_dir = Path(__file__).resolve().parent
+    sources = [(scripts_dir / f'{name}.py').read_text(encoding='utf-8') for name in GENERATOR_MODULES]
+    return content_hash('\0'.join(sources))
+
+def is_output_current(entry, source_hash, js_path):
+    """前回の生成結果がそのまま使えるか（サイズで先に判定し、同じなら内容のハッシュを比べる）"""
+    if not entry or entry.get('source_hash') != source_hash:
+        return False
+    try:
+        if js_path.stat().st_size != entry.get('output_size'):
+            return False
+        return hashlib.sha1(js_path.read_bytes()).hexdigest() == entry.get('output_hash')
+    except OSError:
+        return False
 
 def count_x_accounts(members):
     """X登録数をカウント"""
@@ -71,6 +129,8 @@ window.municipalityMembers_{code} = [
     # ファイルに書き込み
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(js_content)
+    
+    return js_content
 
 def generate_data_js(output_path, municipality_data):
     """data.jsファイルを生成"""
@@ -86,8 +146,7 @@ const municipalityData = {{
     # 自治体データを追加
     entries = []
     for code, data in sorted(municipality_data.items()):
-        entry = f"    '{code}': {{ name: '{data['name']}', prefecture: '{data['prefecture']}', count: {data['count']}, xCount: {data['xCount']} }}"
-        entries.append(entry)
+        entries.append(format_data_js_row(code, data))
     
     js_content += ",\n".join(entries)
     js_content += "\n};\n"
@@ -97,81 +156,266 @@ const municipalityData = {{
         f.write(js_content)
     
     print(f"Generated: {output_path}")
+    return js_content
+
+def format_data_js_row(code, data):
+    """data.jsの1自治体分の行（末尾のカンマなし）"""
+    return f"    '{code}': {{ name: '{data['name']}', prefecture: '{data['prefecture']}', count: {data['count']}, xCount: {data['xCount']} }}"
 
-def main():
+def patch_data_js(output_path, changed_rows, removed_codes):
+    """data.jsの変更された行だけを差し替える（差し替えできなければNone）"""
+    try:
+        with open(output_path, 'r', encoding='utf-8') as f:
+            lines = f.read().split('\n')
+        start = lines.index('const municipalityData = {')
+        end = lines.index('};', start)
+    except (OSError, ValueError):
+        return None
+    
+    rows = {}
+    for line in lines[start + 1:end]:
+        match = DATA_JS_ROW_RE.match(line)
+        if not match:
+            return None
+        rows[match.group(1)] = line.rstrip(',')
+    
+    for code in removed_codes:
+        rows.pop(code, None)
+    for code, data in changed_rows.items():
+        rows[code] = format_data_js_row(code, data)
+    
+    lines[0] = f"// 議員データ（{datetime.now().strftime('%Y年%m月%d日')}更新）"
+    body = ",\n".join(rows[code] for code in sorted(rows))
+    js_content = "\n".join(lines[:start + 1] + [body] + lines[end:])
+    
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(js_content)
+    
+    print(f"Patched: {output_path} ({len(changed_rows)}件更新, {len(removed_codes)}件削除)")
+    return js_content
+
+def build_municipality_entry(municipalities_dir, code, name, source, source_hash, members, counts=None):
+    """自治体の詳細データJSを生成し、マニフェストのエントリを返す
+    
+    counts（統計ストアの集計値）を渡した場合は議員数・X登録数を数え直さずにそれを使う。
+    """
+    # 統計情報を計算
+    if counts is not None:
+        member_count, x_account_count = counts.total, counts.with_x
+    else:
+        member_count = len(members)
+        x_account_count = count_x_accounts(members)
+    
+    # 都道府県を判定
+    prefecture_code = code[:2]
+    prefecture = PREFECTURE_MAP.get(prefecture_code, f"{prefecture_code}_不明")
+    
+    # データを保存
+    row = {
+        'name': name,
+        'prefecture': prefecture,
+        'count': member_count,
+        'xCount': x_account_count
+    }
+    
+    # 各自治体の詳細データファイルを生成
+    js_content = generate_municipality_js(municipalities_dir / f"{code}.js", code, members)
+    
+    return {
+        'source': source,
+        'source_hash': source_hash,
+        'output_hash': content_hash(js_content),
+        'output_size': len(js_content.encode('utf-8')),
+        'row': row
+    }
+
+def update_data_js(output_path, manifest, entries, changed_rows, removed_codes):
+    """data.jsを更新（前回の生成結果のままなら行単位で差し替え）し、マニフェストに反映"""
+    data_js_current = (
+        manifest.get('data_js_hash') is not None
+        and output_path.exists()
+        and content_hash(output_path.read_text(encoding='utf-8')) == manifest['data_js_hash']
+    )
+    if not data_js_current:
+        data_js = generate_data_js(output_path, {code: e['row'] for code, e in entries.items()})
+    elif changed_rows or removed_codes:
+        data_js = patch_data_js(output_path, changed_rows, removed_codes)
+        if data_js is None:
+            data_js = generate_data_js(output_path, {code: e['row'] for code, e in entries.items()})
+    else:
+        data_js = None
+        print("変更なし: data.js")
+    
+    manifest['generator_hash'] = generator_hash()
+    manifest['municipalities'] = entries
+    if data_js is not None:
+        manifest['data_js_hash'] = content_hash(data_js)
+
+class ViewerStage(Stage):
+    """パイプラインのステージ: 変更された自治体のJSを再生成し、data.jsを更新する
+    
+    removed_sources を指定すると一部の自治体だけを処理する（--changed-since）。
+    この場合は処理した自治体の行だけを既存の data.js に差し替え、
+    removed_sources（削除されたソースの相対パス）の自治体を取り除く。
+    data.js の議員数・X登録数は統計ストア（statistics_store.py）の自治体ごとの集計値を使う。
+    """
+    
+    name = 'viewer'
+    
+    def __init__(self, viewer_js_dir, full_rebuild=False, removed_sources=None, store=None):
+        self.output_path = viewer_js_dir / "data.js"
+        self.municipalities_dir = viewer_js_dir / "municipalities"
+        self.manifest_path = viewer_js_dir / "build_manifest.json"
+        self.full_rebuild = full_rebuild
+        self.removed_sources = removed_sources
+        self.partial = removed_sources is not None
+        self.needs_full_build = False
+        self.manifest = {}
+        self.previous_entries = {}
+        self.entries = {}
+        self.changed_rows = {}
+        self.store = store
+    
+    def start(self, context):
+        if self.store is None:
+            self.store = open_store(context.data_dir)
+        manifest = {} if self.full_rebuild else load_manifest(self.manifest_path)
+        if manifest.get('generator_hash') != generator_hash():
+            manifest = {}
+        self.manifest = manifest
+        self.previous_entries = manifest.get('municipalities', {})
+        if self.partial:
+            self.entries = dict(self.previous_entries)
+    
+    def process(self, muni, results):
+        # 都道府県ディレクトリ外のファイルは対象外
+        if not muni.prefecture:
+            return
+            
+        try:
+            code = muni.code
+            municipality_name = muni.name
+            if not code:
+                return
+            if muni.error:
+                raise ValueError(muni.error)
+            
+            # 入力が変わっていなければ前回の結果を使う
+            municipality_js_path = self.municipalities_dir / f"{code}.js"
+            previous = self.previous_entries.get(code)
+            if is_output_current(previous, muni.digest, municipality_js_path):
+                self.entries[code] = previous
+                return
+            
+            entry = build_municipality_entry(
+                self.municipalities_dir, code, municipality_name, muni.relpath, muni.digest, muni.members,
+                self.store.counts(muni)
+            )
+            self.entries[code] = entry
+            self.changed_rows[code] = entry['row']
+            
+            print(f"処理完了: {municipality_name} - 議員数: {entry['row']['count']}, X登録: {entry['row']['xCount']}")
+            
+        except Exception as e:
+            print(f"エラー: {muni.path} - {e}")
+            # 読み込めなかった自治体は前回の出力を残す
+            if code in self.previous_entries:
+                self.entries[code] = self.previous_entries[code]
+    
+    def finish(self):
+        self.store.save()
+        if self.partial:
+            self._finish_partial()
+            return
+        
+        # ソースが削除された自治体の出力を削除
+        removed_codes = sorted(set(self.previous_entries) - set(self.entries))
+        for code in removed_codes:
+            (self.municipalities_dir / f"{code}.js").unlink(missing_ok=True)
+            print(f"削除: {code}.js")
+        
+        # data.jsを更新（前回から変わっていれば行単位で差し替え）
+        update_data_js(self.output_path, self.manifest, self.entries, self.changed_rows, removed_codes)
+        save_manifest(self.manifest_path, self.manifest)
+        print(f"\n再生成: {len(self.changed_rows)}自治体 / 全{len(self.entries)}自治体")
+
+    def _finish_partial(self):
+        # ソースが削除された自治体（別のファイルで再生成したものを除く）の出力を削除
+        removed_codes = set()
+        for relpath in self.removed_sources:
+            code, _ = parse_filename(Path(relpath))
+            if code and len(Path(relpath).parts) == 2 and code not in self.changed_rows:
+                removed_codes.add(code)
+        removed_codes = sorted(removed_codes)
+        for code in removed_codes:
+            (self.municipalities_dir / f"{code}.js").unlink(missing_ok=True)
+            self.entries.pop(code, None)
+            print(f"削除: {code}.js")
+        
+        if not self.changed_rows and not removed_codes:
+            print("変更なし: data.js")
+            return
+        
+        # マニフェストが前回の data.js と対応している場合だけマニフェストも更新する
+        manifest_current = (
+            self.manifest.get('data_js_hash') is not None
+            and self.output_path.exists()
+            and content_hash(self.output_path.read_text(encoding='utf-8')) == self.manifest['data_js_hash']
+        )
+        data_js = patch_data_js(self.output_path, self.changed_rows, removed_codes)
+        if data_js is None:
+            self.needs_full_build = True
+            return
+        if manifest_current:
+            self.manifest['municipalities'] = self.entries
+            self.manifest['data_js_hash'] = content_hash(data_js)
+            save_manifest(self.manifest_path, self.manifest)
+        else:
+            self.manifest = {}
+        print(f"\n再生成: {len(self.changed_rows)}自治体 / 削除: {len(removed_codes)}自治体")
+
+def build_viewer(data_dir, viewer_js_dir, full_rebuild=False, argv=(), changed_since=None, corpus=None):
+    """ビューア用データを差分ビルドし、更新後のマニフェストを返す
+    
+    changed_since を指定した場合は変更された自治体だけを更新する。
+    corpus を指定した場合は読み込み済みのコーパスを使う（全体を更新する場合のみ）。
+    マニフェストが前回の data.js と対応していない場合は空のマニフェストを返す。
+    """
+    if changed_since is not None:
+        sources, removed = changed_sources(changed_since, data_dir)
+        print(f"{changed_since} 以降の変更: {len(sources)}ファイル（削除 {len(removed)}ファイル）")
+        stage = ViewerStage(viewer_js_dir, full_rebuild, removed_sources=removed)
+        run_pipeline([stage], data_dir, corpus=sources)
+        if not stage.needs_full_build:
+            return stage.manifest
+        print("data.js を差し替えできないため、全自治体を対象に更新します")
+    
+    stage = ViewerStage(viewer_js_dir, full_rebuild)
+    
+    # すべての都道府県ディレクトリを処理（共通スナップショットから読み込む）
+    run_pipeline([stage], data_dir, workers=parse_workers_option(argv), corpus=corpus)
+    print_cache_stats(argv)
+    return stage.manifest
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    
     # プロジェクトのルートディレクトリを取得
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
     data_dir = project_root / "data" / "processed"
-    viewer_dir = project_root / "viewer"
-    output_path = viewer_dir / "js" / "data.js"
-    municipalities_dir = viewer_dir / "js" / "municipalities"
-    
-    # 都道府県マップ
-    prefecture_map = {
-        "11": "11_埼玉県",
-        "13": "13_東京都"
-    }
-    
-    municipality_data = {}
-    total_municipalities = 0
-    total_members = 0
-    total_x_accounts = 0
+    viewer_js_dir = project_root / "viewer" / "js"
     
-    # すべての都道府県ディレクトリを処理
-    for pref_dir in data_dir.iterdir():
-        if not pref_dir.is_dir():
-            continue
-            
-        # JSONファイルを処理
-        for json_path in pref_dir.glob("議員リスト_*.json"):
-            # CSVファイルをスキップ
-            if json_path.suffix != '.json':
-                continue
-                
-            try:
-                # 自治体情報を取得
-                code, municipality_name = get_municipality_info(json_path)
-                if not code:
-                    continue
-                
-                # JSONデータを読み込み
-                members = load_json_file(json_path)
-                
-                # 統計情報を計算
-                member_count = len(members)
-                x_account_count = count_x_accounts(members)
-                
-                # 都道府県を判定
-                prefecture_code = code[:2]
-                prefecture = prefecture_map.get(prefecture_code, f"{prefecture_code}_不明")
-                
-                # データを保存
-                municipality_data[code] = {
-                    'name': municipality_name,
-                    'prefecture': prefecture,
-                    'count': member_count,
-                    'xCount': x_account_count
-                }
-                
-                # 各自治体の詳細データファイルを生成
-                municipality_js_path = municipalities_dir / f"{code}.js"
-                generate_municipality_js(municipality_js_path, code, members)
-                
-                # 統計を更新
-                total_municipalities += 1
-                total_members += member_count
-                total_x_accounts += x_account_count
-                
-                print(f"処理完了: {municipality_name} - 議員数: {member_count}, X登録: {x_account_count}")
-                
-            except Exception as e:
-                print(f"エラー: {json_path} - {e}")
-    
-    # data.jsを生成
-    generate_data_js(output_path, municipality_data)
+    manifest = build_viewer(data_dir, viewer_js_dir, '--full' in argv, argv,
+                            parse_changed_since_option(argv))
+    entries = manifest.get('municipalities')
+    if not entries:
+        return
     
     # 統計情報を表示
+    total_municipalities = len(entries)
+    total_members = sum(e['row']['count'] for e in entries.values())
+    total_x_accounts = sum(e['row']['xCount'] for e in entries.values())
     print("\n" + "="*50)
     print(f"総自治体数: {total_municipalities}")
     print(f"総議員数: {total_members}")
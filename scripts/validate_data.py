@@ -1,91 +1,275 @@
-import glob
-import json
+import marshal
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from corpus import (cache_path_for, changed_sources, default_workers, file_digest,
+                    parse_changed_since_option, parse_workers_option, print_cache_stats)
+from integrity import IntegrityStage
+from pipeline import Stage, run_pipeline
+from stream_validator import DEFAULT_MAX_ERRORS, load_stream_validator
 
 ROOT_DIR = os.path.join(os.path.dirname(__file__), '..')
-sys.path.insert(0, ROOT_DIR)
-from tests.jsonschema import validate, ValidationError
 
 SCHEMA_PATH = os.path.join(ROOT_DIR, 'schema', 'municipal_councillor_v1.1.json')
 DATA_DIR = os.path.join(ROOT_DIR, 'data', 'processed')
 
+# 検証結果キャッシュの形式（メッセージの書式や判定を変えたら上げる）
+VERDICT_CACHE_VERSION = 3
 
-def main():
-    # スキーマの選択（v1.2を優先）
+# 未検証の議員数がこれ未満ならプロセスを起動するより1プロセスで検証する方が速い
+PROCESS_POOL_MIN_MEMBERS = 50000
+
+
+def select_schema_path():
+    """スキーマの選択（v1.2を優先）"""
     schema_v12 = os.path.join(ROOT_DIR, 'schema', 'municipal_councillor_v1.2.json')
     if os.path.exists(schema_v12):
-        schema_path = schema_v12
-        print("Using schema v1.2")
-    else:
-        schema_path = SCHEMA_PATH
-        print("Using schema v1.1")
+        return schema_v12
+    return SCHEMA_PATH
+
+
+def parse_max_errors_option(argv):
+    """コマンドライン引数から --max-errors N（1ファイルあたりのエラー上限）を取得"""
+    for i, arg in enumerate(argv):
+        if arg == '--max-errors' and i + 1 < len(argv):
+            return max(1, int(argv[i + 1]))
+        if arg.startswith('--max-errors='):
+            return max(1, int(arg.split('=', 1)[1]))
+    return DEFAULT_MAX_ERRORS
+
+
+def validate_file(path, validator, max_errors=DEFAULT_MAX_ERRORS):
+    """ファイルを要素ごとに読み込みながら検証し、(ハッシュ, errors, warnings) を返す
     
-    try:
-        with open(schema_path, encoding='utf-8') as f:
-            schema = json.load(f)
-    except Exception as e:
-        print(f'Error loading schema: {e}')
-        return 1
+    メッセージはパスを除いた「:行:列: JSONポインタ: 内容」の形式。
+    """
+    with open(path, 'rb') as f:
+        result = validator.validate_stream(f, max_errors)
+    errors = [f':{e}' for e in result.errors]
+    warnings = []
+    if result.is_array is False:
+        errors.append(': file does not contain a list of objects')
+    elif result.is_array and result.count == 0 and not errors:
+        warnings.append(': Empty data (no council members)')
+    if result.truncated:
+        warnings.append(f': Stopped after {max_errors} errors (remaining members were not checked)')
+    return result.digest, errors, warnings
+
 
-    # 都道府県別ディレクトリに対応
-    json_files = glob.glob(os.path.join(DATA_DIR, '*.json'))
-    json_files.extend(glob.glob(os.path.join(DATA_DIR, '*', '*.json')))
+def validate_loaded(path, data, error, validator, max_errors=DEFAULT_MAX_ERRORS):
+    """読み込み済みの内容で妥当かを判定し、エラーがある場合だけファイルを読み直して位置付きで検証する
     
-    if not json_files:
-        print('No JSON files found in processed data directory')
-        return 1
+    (読み直したファイルのハッシュ, errors, warnings) を返す（読み直していなければハッシュはNone）。
+    """
+    if error is None and isinstance(data, list):
+        if not data:
+            return None, [], [': Empty data (no council members)']
+        if validator.is_valid(data):
+            return None, [], []
+    return validate_file(path, validator, max_errors)
 
-    errors = []
-    warnings = []
+
+def validate_document(path, data, error, validator, max_errors=DEFAULT_MAX_ERRORS):
+    """1ファイル分の内容をコンパイル済みのスキーマで検証し (errors, warnings) を返す"""
+    _, errors, warnings = validate_loaded(path, data, error, validator, max_errors)
+    return [f'{path}{m}' for m in errors], [f'{path}{m}' for m in warnings]
+
+
+def _validate_source(task):
+    """ワーカープロセスでファイルを要素ごとに検証し (ハッシュ, errors, warnings) を返す"""
+    path, schema_path, max_errors = task
+    return validate_file(path, load_stream_validator(schema_path), max_errors)
+
+
+def load_verdicts(path):
+    """検証結果キャッシュ {(内容ハッシュ, スキーマハッシュ): (errors, warnings)} を読み込む"""
+    try:
+        with open(path, 'rb') as f:
+            payload = marshal.load(f)
+    except (OSError, ValueError, EOFError, TypeError):
+        return {}
+    if not isinstance(payload, dict) or payload.get('version') != VERDICT_CACHE_VERSION:
+        return {}
+    return payload['verdicts']
+
+
+def save_verdicts(path, verdicts):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        marshal.dump({'version': VERDICT_CACHE_VERSION, 'verdicts': verdicts}, f)
+    os.replace(tmp_path, path)
+
+
+class SchemaStage(Stage):
+    """パイプラインのステージ: 各ファイルをスキーマで検証する
     
-    for path in json_files:
-        try:
-            with open(path, encoding='utf-8') as f:
-                data = json.load(f)
-        except json.JSONDecodeError as e:
-            errors.append(f'{path}: Invalid JSON - {e}')
-            continue
-            
-        if not isinstance(data, list):
-            errors.append(f'{path}: file does not contain a list of objects')
-            continue
-            
-        if len(data) == 0:
-            warnings.append(f'{path}: Empty data (no council members)')
-            continue
-            
-        # v1.2スキーマの場合は配列全体を検証
-        if "v1.2" in schema_path:
-            try:
-                validate(data, schema)
-            except ValidationError as e:
-                errors.append(f'{path}: {e}')
-        else:
-            # v1.1スキーマの場合は各要素を検証
-            for i, item in enumerate(data):
-                try:
-                    validate(item, schema)
-                except ValidationError as e:
-                    errors.append(f'{path}[{i}]: {e}')
+    検証結果は (ファイル内容のハッシュ, スキーマファイルのハッシュ, エラー上限) をキーにキャッシュし、
+    内容が変わったファイルだけをワーカープロセスで並列に検証する。
+    エラーの表示順は常にコーパスの順序（直列に検証した場合と同じ）になる。
+    partial=True の場合は一部のファイルだけを検証し、結果を既存のキャッシュに追加する。
+    """
     
-    # 結果表示
-    if errors:
-        print(f"\n❌ Found {len(errors)} errors:")
-        for error in errors:
-            print(f"  - {error}")
-            
-    if warnings:
-        print(f"\n⚠️  Found {len(warnings)} warnings:")
-        for warning in warnings:
-            print(f"  - {warning}")
-            
-    if not errors:
-        print(f"\n✅ All {len(json_files)} files are valid!")
-        if warnings:
-            return 0  # 警告があっても成功
+    name = 'schema'
+    gate = True
+    
+    def __init__(self, schema_path=None, cache_path=None, mode='auto', partial=False,
+                 max_errors=DEFAULT_MAX_ERRORS):
+        self.schema_path = schema_path or select_schema_path()
+        self.cache_path = cache_path
+        self.mode = mode
+        self.partial = partial
+        self.max_errors = max_errors
+        self.validator = None
+        self.schema_digest = None
+        self.workers = None
+        self.verdicts = {}
+        self.pending = []
+        self.files = 0
+        self.cache_hits = 0
+        self.validated = 0
+        self.errors = []
+        self.warnings = []
+        self.exit_code = 0
+    
+    def load_schema(self):
+        print("Using schema v1.2" if "v1.2" in self.schema_path else "Using schema v1.1")
+        self.validator = load_stream_validator(self.schema_path)
+        self.schema_digest = file_digest(self.schema_path)
+    
+    def start(self, context):
+        if self.validator is None:
+            self.load_schema()
+        if self.cache_path is None:
+            self.cache_path = cache_path_for(context.data_dir, 'validation', '.bin')
+        self.workers = context.workers
+        self.verdicts = load_verdicts(self.cache_path)
+    
+    def process(self, item, results):
+        # キャッシュにあるファイルは内容を復元せず、ないファイルはfinish()でまとめて検証する
+        key = (item.digest, self.schema_digest, self.max_errors)
+        self.pending.append((item.path, key, None if key in self.verdicts else item))
+        self.files += 1
+    
+    def _select_mode(self, misses):
+        if self.mode != 'auto':
+            return self.mode
+        workers = self.workers or default_workers()
+        if workers == 1 or len(misses) <= 1:
+            return 'serial'
+        # 検証はCPU処理なのでスレッドでは速くならない
+        if sum(len(item.municipality) for item in misses) < PROCESS_POOL_MIN_MEMBERS:
+            return 'serial'
+        return 'process'
+    
+    def _validate_item(self, item):
+        digest, errors, warnings = validate_loaded(
+            item.path, item.document, item.error, self.validator, self.max_errors
+        )
+        return digest or item.digest, errors, warnings
+    
+    def _validate_misses(self, misses):
+        """キャッシュにないファイルを検証し、入力と同じ順序で (ハッシュ, errors, warnings) を返す"""
+        if self._select_mode(misses) == 'serial':
+            return [self._validate_item(item) for item in misses]
+        workers = self.workers or default_workers()
+        tasks = [(item.path, self.schema_path, self.max_errors) for item in misses]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # mapは入力順で結果を返すので出力が毎回同じになる
+            return list(executor.map(_validate_source, tasks,
+                                     chunksize=max(1, len(tasks) // (workers * 4))))
+    
+    def _collect(self):
+        misses = {}
+        for _, key, item in self.pending:
+            if item is not None:
+                misses.setdefault(key, item)
+        fresh = dict(zip(misses, self._validate_misses(list(misses.values()))))
+        
+        verdicts = dict(self.verdicts) if self.partial else {}
+        for path, key, _ in self.pending:
+            if key in fresh:
+                digest, errors, warnings = fresh[key]
+                # コーパスの読み込み後にファイルが変わっていた場合は今回の表示だけに使う
+                if digest == key[0]:
+                    verdicts[key] = (errors, warnings)
+            else:
+                errors, warnings = verdicts[key] = self.verdicts[key]
+            self.errors.extend(f'{path}{m}' for m in errors)
+            self.warnings.extend(f'{path}{m}' for m in warnings)
+        
+        # 全体を検証した場合は今回のコーパスに含まれるファイルの結果だけを残す
+        if verdicts != self.verdicts:
+            save_verdicts(self.cache_path, verdicts)
+        self.verdicts = verdicts
+        self.cache_hits = len(self.pending) - len(misses)
+        self.validated = len(misses)
+        self.pending = []
+    
+    def format_cache_stats(self):
+        return f"[validate] 検証結果キャッシュ: ヒット {self.cache_hits}, 検証 {self.validated}"
+    
+    def finish(self):
+        if not self.files:
+            print('No JSON files found in processed data directory')
+            self.exit_code = 1
+            return
         
-    return 1 if errors else 0
+        self._collect()
+        
+        # 結果表示
+        if self.errors:
+            print(f"\n❌ Found {len(self.errors)} errors:")
+            for error in self.errors:
+                print(f"  - {error}")
+                
+        if self.warnings:
+            print(f"\n⚠️  Found {len(self.warnings)} warnings:")
+            for warning in self.warnings:
+                print(f"  - {warning}")
+                
+        if not self.errors:
+            print(f"\n✅ All {self.files} files are valid!")
+            
+        # 警告があっても成功
+        self.exit_code = 1 if self.errors else 0
+
+
+def main():
+    argv = sys.argv[1:]
+    changed_since = parse_changed_since_option(argv)
+    stage = SchemaStage(partial=changed_since is not None, max_errors=parse_max_errors_option(argv))
+    try:
+        stage.load_schema()
+    except Exception as e:
+        print(f'Error loading schema: {e}')
+        return 1
+    
+    if changed_since is not None:
+        # 指定したリビジョン以降に変更されたファイルだけを検証する
+        try:
+            sources, removed = changed_sources(changed_since, Path(DATA_DIR))
+        except ValueError as e:
+            print(f'Error: {e}')
+            return 1
+        print(f"{changed_since} 以降の変更: {len(sources)}ファイル（削除 {len(removed)}ファイル）")
+        if not sources:
+            print("\n✅ No changed files to validate")
+            return 0
+        run_pipeline([stage], DATA_DIR, corpus=sources)
+        exit_code = stage.exit_code
+    else:
+        # 都道府県別ディレクトリに対応（共通スナップショットから読み込む）
+        # ファイルをまたぐ整合性は全ファイルが揃っているときだけ検証する
+        integrity = IntegrityStage()
+        run_pipeline([stage, integrity], DATA_DIR, workers=parse_workers_option(argv))
+        print_cache_stats(argv)
+        exit_code = max(stage.exit_code, integrity.exit_code)
+    if '--cache-stats' in argv:
+        print(stage.format_cache_stats(), file=sys.stderr)
+    return exit_code
 
 
 if __name__ == '__main__':
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+登録済みX URLの生存確認
+
+コーパスに登録された全てのX URL（旧 twitter.com を含む）について、アカウントのページが
+まだ存在するかを asyncio で並行に確認する:
+- 接続プール: 同時接続数を制限し、keep-aliveの接続はホストごとに再利用する
+- ホストごとのレート制限: 同じホストへのリクエストは一定の間隔を空ける
+- 再試行: 接続エラー・429・5xxは指数的に間隔を伸ばし、ゆらぎ（jitter）を加えて再試行する
+- 結果のキャッシュ: アカウント（ハンドル）ごとの結果を .cache/corpus/x_liveness.bin に保存し、
+  有効期限（既定7日）内のものは再確認しない
+
+確認先は --endpoint で変えられる（{handle} がハンドルに置き換わる）。テストではローカルの
+代替サーバーを指定する。結果は次のいずれか:
+- alive: 存在する（2xx）
+- renamed: 別のハンドルのページにリダイレクトされる（名前変更）
+- dead: 存在しない（404・410）
+- unknown: ログイン画面などプロフィール以外へのリダイレクト、その他の4xx
+- error: 再試行しても確認できなかった（キャッシュしない）
+- invalid: X（旧Twitter）のURLではない（リクエストしない）
+
+dead・renamed のアカウントは check_data_quality.py のレポートにも表示される（キャッシュの結果を使う）。
+
+使用方法:
+    python scripts/verify_x_urls.py                        # 全X URLを確認（キャッシュを使う）
+    python scripts/verify_x_urls.py --refresh              # キャッシュを使わずに全て確認し直す
+    python scripts/verify_x_urls.py --endpoint http://127.0.0.1:8000/{handle} --rate 50
+"""
+
+import argparse
+import asyncio
+import marshal
+import os
+import random
+import ssl
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from corpus import DATA_DIR, X_FIELD, cache_path_for, has_x_account, load_corpus
+from integrity import X_URL_RE
+
+# キャッシュの形式（結果の内容を変えたら上げる）
+LIVENESS_VERSION = 1
+DEFAULT_ENDPOINT = 'https://x.com/{handle}'
+DEFAULT_TTL_DAYS = 7
+MAX_CONNECTIONS = 8
+# 同じホストへの1秒あたりのリクエスト数
+REQUESTS_PER_SECOND = 1.0
+MAX_RETRIES = 3
+# 再試行の待ち時間の基準（秒）。attempt回目は BACKOFF × 2^attempt × 0.5〜1.5倍
+BACKOFF = 1.0
+MAX_RETRY_AFTER = 60.0
+TIMEOUT = 10.0
+MAX_REDIRECTS = 3
+USER_AGENT = 'City-Council-X-Verifier/1.0'
+
+STATUSES = {
+    'alive': '存在する',
+    'renamed': '名前変更',
+    'dead': '存在しない',
+    'unknown': '判定できない',
+    'error': '確認できない',
+    'invalid': 'X URLではない',
+}
+# キャッシュしない結果（次回も確認し直す）
+UNCACHED = {'error', 'invalid'}
+# プロフィールではないパス（リダイレクト先がこれらならアカウントのページではない）
+RESERVED_PATHS = {'i', 'login', 'home', 'account', 'intent', 'search', 'explore', 'settings', 'hashtag', 'share'}
+HANDLE_CHARS = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_')
+
+
+class CheckResult:
+    """1アカウント分の確認結果"""
+
+    __slots__ = ('handle', 'status', 'http_status', 'new_handle', 'checked_at', 'detail')
+
+    def __init__(self, handle: Optional[str], status: str, http_status: int = 0,
+                 new_handle: Optional[str] = None, checked_at: float = 0.0, detail: str = ''):
+        self.handle = handle
+        self.status = status
+        self.http_status = http_status
+        self.new_handle = new_handle
+        self.checked_at = checked_at
+        self.detail = detail
+
+    def to_entry(self) -> tuple:
+        return (self.status, self.http_status, self.new_handle, self.checked_at, self.detail)
+
+    @classmethod
+    def from_entry(cls, handle: str, entry: tuple) -> 'CheckResult':
+        return cls(handle, *entry)
+
+    def __repr__(self):
+        return f'CheckResult({self.handle!r}, {self.status!r}, {self.http_status})'
+
+
+def url_handle(url) -> Optional[str]:
+    """X URLのハンドル（x.com/twitter.comのURLでなければNone）"""
+    if not isinstance(url, str):
+        return None
+    match = X_URL_RE.match(url.strip())
+    return match.group(1) if match else None
+
+
+def profile_handle(url: str) -> Optional[str]:
+    """URLのパスの先頭がプロフィールのハンドルならそのハンドル"""
+    segments = [s for s in urlsplit(url).path.split('/') if s]
+    if not segments or segments[0].lower() in RESERVED_PATHS or not set(segments[0]) <= HANDLE_CHARS:
+        return None
+    return segments[0]
+
+
+class ResultCache:
+    """ハンドル（小文字）ごとの確認結果。確認先（endpoint）が変わると使わない"""
+
+    def __init__(self, path, endpoint: str = DEFAULT_ENDPOINT, ttl: float = DEFAULT_TTL_DAYS * 86400):
+        self.path = path
+        self.endpoint = endpoint
+        self.ttl = ttl
+        self.entries: Dict[str, tuple] = self._load() if path else {}
+        self.hits = 0
+        self.dirty = False
+
+    def _load(self) -> Dict[str, tuple]:
+        try:
+            with open(self.path, 'rb') as f:
+                payload = marshal.load(f)
+        except (OSError, ValueError, EOFError, TypeError):
+            return {}
+        if not isinstance(payload, dict) or payload.get('version') != LIVENESS_VERSION:
+            return {}
+        if payload.get('endpoint') != self.endpoint:
+            return {}
+        return payload['entries']
+
+    def get(self, handle: str, now: Optional[float] = None, fresh_only: bool = True) -> Optional[CheckResult]:
+        entry = self.entries.get(handle.lower())
+        if entry is None:
+            return None
+        result = CheckResult.from_entry(handle, entry)
+        if fresh_only and (now if now is not None else time.time()) - result.checked_at > self.ttl:
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, result: CheckResult):
+        if result.status in UNCACHED or not result.handle:
+            return
+        self.entries[result.handle.lower()] = result.to_entry()
+        self.dirty = True
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            marshal.dump({'version': LIVENESS_VERSION, 'endpoint': self.endpoint, 'entries': self.entries}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def cache_path(data_dir=DATA_DIR):
+    return cache_path_for(data_dir, 'x_liveness', '.bin')
+
+
+class HostRateLimiter:
+    """ホストごとにリクエストの間隔を 1/rate 秒以上空ける"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_time: Dict[str, float] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+
+    async def wait(self, host: str):
+        lock = self.locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            scheduled = max(now, self.next_time.get(host, now))
+            self.next_time[host] = scheduled + self.interval
+            if scheduled > now:
+                await asyncio.sleep(scheduled - now)
+
+
+class ConnectionPool:
+    """同時接続数を制限し、keep-aliveの接続を (ホスト, ポート, TLS) ごとに再利用する"""
+
+    def __init__(self, limit: int = MAX_CONNECTIONS, timeout: float = TIMEOUT):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.limit = limit
+        self.timeout = timeout
+        self.idle: Dict[Tuple[str, int, bool], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self.opened = 0
+        self.reused = 0
+        self._ssl = None
+
+    def _ssl_context(self):
+        if self._ssl is None:
+            self._ssl = ssl.create_default_context()
+        return self._ssl
+
+    async def _open(self, key):
+        host, port, secure = key
+        self.opened += 1
+        return await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=self._ssl_context() if secure else None), self.timeout
+        )
+
+    async def _exchange(self, connection, request: bytes) -> Tuple[int, Dict[str, str]]:
+        reader, writer = connection
+        writer.write(request)
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+        if not status_line:
+            raise ConnectionError('接続が閉じられました')
+        parts = status_line.decode('latin-1').split(None, 2)
+        if len(parts) < 2 or not parts[1].isdigit():
+            raise ConnectionError(f'不正な応答: {status_line[:80]!r}')
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), self.timeout)
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return int(parts[1]), headers
+
+    async def request(self, method: str, url: str) -> Tuple[int, Dict[str, str]]:
+        """リクエストを送り、(ステータス, ヘッダー) を返す（本文は読まない）"""
+        parts = urlsplit(url)
+        secure = parts.scheme == 'https'
+        key = (parts.hostname, parts.port or (443 if secure else 80), secure)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        host_header = parts.netloc.rsplit('@', 1)[-1]
+        request = (f'{method} {path} HTTP/1.1\r\nHost: {host_header}\r\nUser-Agent: {USER_AGENT}\r\n'
+                   'Accept: text/html\r\n\r\n').encode('ascii')
+        async with self.semaphore:
+            idle = self.idle.get(key)
+            connection = idle.pop() if idle else None
+            if connection is not None:
+                self.reused += 1
+                try:
+                    status, headers = await self._exchange(connection, request)
+                except (OSError, ConnectionError, asyncio.TimeoutError):
+                    # サーバーが閉じたkeep-aliveの接続は開き直す
+                    self._close(connection)
+                    connection = None
+            if connection is None:
+                connection = await self._open(key)
+                try:
+                    status, headers = await self._exchange(connection, request)
+                except BaseException:
+                    self._close(connection)
+                    raise
+            reusable = (method == 'HEAD' and headers.get('connection', '').lower() != 'close'
+                        and len(self.idle.get(key, ())) < self.limit)
+            if reusable:
+                self.idle.setdefault(key, []).append(connection)
+            else:
+                self._close(connection)
+        return status, headers
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection[1].close()
+        except Exception:
+            pass
+
+    def close(self):
+        for connections in self.idle.values():
+            for connection in connections:
+                self._close(connection)
+        self.idle.clear()
+
+
+class LivenessChecker:
+    """X URLを並行に確認する"""
+
+    def __init__(self, endpoint: str = DEFAULT_ENDPOINT, cache: Optional[ResultCache] = None,
+                 max_connections: int = MAX_CONNECTIONS, rate: float = REQUESTS_PER_SECOND,
+                 retries: int = MAX_RETRIES, backoff: float = BACKOFF, timeout: float = TIMEOUT):
+        self.endpoint = endpoint
+        self.cache = cache if cache is not None else ResultCache(None, endpoint)
+        self.max_connections = max_connections
+        self.rate = rate
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.requests = 0
+        self.retried = 0
+        self.connections = 0
+        self.reused = 0
+
+    def _delay(self, attempt: int, headers: Dict[str, str]) -> float:
+        delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+        retry_after = headers.get('retry-after', '')
+        if retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), MAX_RETRY_AFTER))
+        return delay
+
+    async def _fetch(self, pool: ConnectionPool, limiter: HostRateLimiter, url: str) -> Tuple[int, Dict[str, str]]:
+        await limiter.wait(urlsplit(url).netloc)
+        self.requests += 1
+        status, headers = await pool.request('HEAD', url)
+        if status in (405, 501):
+            # HEADに対応していないサーバーにはGETで確認する
+            await limiter.wait(urlsplit(url).netloc)
+            self.requests += 1
+            status, headers = await pool.request('GET', url)
+        return status, headers
+
+    async def _check_handle(self, pool, limiter, handle: str) -> CheckResult:
+        url = self.endpoint.format(handle=handle)
+        result = None
+        for attempt in range(self.retries + 1):
+            headers: Dict[str, str] = {}
+            try:
+                result, headers = await self._follow(pool, limiter, handle, url)
+            except (OSError, ConnectionError, asyncio.TimeoutError) as e:
+                result = CheckResult(handle, 'error', detail=str(e) or type(e).__name__)
+            else:
+                if not (result.http_status == 429 or result.http_status >= 500):
+                    break
+                result = CheckResult(handle, 'error', result.http_status, detail=f'HTTP {result.http_status}')
+            if attempt < self.retries:
+                self.retried += 1
+                await asyncio.sleep(self._delay(attempt, headers))
+        result.checked_at = time.time()
+        return result
+
+    async def _follow(self, pool, limiter, handle: str, url: str) -> Tuple[CheckResult, Dict[str, str]]:
+        """リダイレクトを（同じハンドルのままなら）たどって判定し、(結果, 最後の応答ヘッダー) を返す"""
+        for _ in range(MAX_REDIRECTS + 1):
+            status, headers = await self._fetch(pool, limiter, url)
+            location = headers.get('location')
+            if status in (301, 302, 303, 307, 308) and location:
+                target = urljoin(url, location)
+                new_handle = profile_handle(target)
+                if new_handle is None:
+                    return CheckResult(handle, 'unknown', status, detail=target), headers
+                if new_handle.lower() != handle.lower():
+                    return CheckResult(handle, 'renamed', status, new_handle), headers
+                url = target
+                continue
+            if 200 <= status < 300:
+                return CheckResult(handle, 'alive', status), headers
+            if status in (404, 410):
+                return CheckResult(handle, 'dead', status), headers
+            return CheckResult(handle, 'unknown', status, detail=f'HTTP {status}'), headers
+        return CheckResult(handle, 'unknown', status, detail='リダイレクトが多すぎます'), headers
+
+    async def check_all(self, urls: Iterable[str], refresh: bool = False) -> Dict[str, CheckResult]:
+        """URLごとの確認結果（同じアカウントのURLは1回だけ確認する）"""
+        urls = list(urls)  # 確認後にもう一度走査するため、ジェネレータも受け取れるようにする
+        handles: Dict[str, str] = {}
+        results: Dict[str, CheckResult] = {}
+        for url in urls:
+            handle = url_handle(url)
+            if handle is None:
+                results[url] = CheckResult(None, 'invalid', detail=str(url))
+            else:
+                handles.setdefault(handle.lower(), handle)
+
+        by_handle: Dict[str, CheckResult] = {}
+        pending = []
+        for key, handle in handles.items():
+            cached = None if refresh else self.cache.get(handle)
+            if cached is not None:
+                by_handle[key] = cached
+            else:
+                pending.append(handle)
+
+        pool = ConnectionPool(self.max_connections, self.timeout)
+        limiter = HostRateLimiter(self.rate)
+        try:
+            checked = await asyncio.gather(*(self._check_handle(pool, limiter, h) for h in pending))
+        finally:
+            pool.close()
+            self.connections += pool.opened
+            self.reused += pool.reused
+        for result in checked:
+            by_handle[result.handle.lower()] = result
+            self.cache.put(result)
+
+        for url in urls:
+            handle = url_handle(url)
+            if handle is not None:
+                results[url] = by_handle[handle.lower()]
+        return results
+
+
+def corpus_x_urls(corpus) -> List[Tuple[str, str, str]]:
+    """コーパスに登録された (位置, 氏名, X URL) の一覧"""
+    entries = []
+    for muni in corpus:
+        for i, member in enumerate(muni.members):
+            if isinstance(member, dict) and has_x_account(member):
+                entries.append((f'{muni.relpath}#/{i}', member.get('氏名'), member[X_FIELD]))
+    return entries
+
+
+def cached_problems(entries: Iterable[Tuple[str, str, str]], cache: ResultCache
+                    ) -> List[Tuple[str, str, str, CheckResult]]:
+    """キャッシュ済みの結果が dead・renamed の登録（期限切れの結果も含む）"""
+    problems = []
+    for location, name, url in entries:
+        handle = url_handle(url)
+        result = cache.get(handle, fresh_only=False) if handle else None
+        if result is not None and result.status in ('dead', 'renamed'):
+            problems.append((location, name, url, result))
+    return problems
+
+
+def format_problem(location: str, name: str, url: str, result: CheckResult) -> str:
+    checked = time.strftime('%Y-%m-%d', time.localtime(result.checked_at))
+    if result.status == 'renamed':
+        return f"{location} {name}: {url} → @{result.new_handle} に名前変更（{checked}確認）"
+    return f"{location} {name}: {url} は存在しません（HTTP {result.http_status}、{checked}確認）"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='登録済みX URLの生存確認')
+    parser.add_argument('--endpoint', default=DEFAULT_ENDPOINT, help='確認先のURL（{handle} がハンドルに置き換わる）')
+    parser.add_argument('--concurrency', type=int, default=MAX_CONNECTIONS, help='同時接続数')
+    parser.add_argument('--rate', type=float, default=REQUESTS_PER_SECOND, help='ホストごとの1秒あたりのリクエスト数')
+    parser.add_argument('--retries', type=int, default=MAX_RETRIES, help='再試行の回数')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, help='タイムアウト（秒）')
+    parser.add_argument('--ttl-days', type=float, default=DEFAULT_TTL_DAYS, help='キャッシュの有効期限（日）')
+    parser.add_argument('--refresh', action='store_true', help='キャッシュを使わずに全て確認し直す')
+    args = parser.parse_args(argv)
+
+    if '{handle}' not in args.endpoint:
+        print('エラー: --endpoint には {handle} を含めてください', file=sys.stderr)
+        return 2
+
+    entries = corpus_x_urls(load_corpus(DATA_DIR))
+    cache = ResultCache(cache_path(DATA_DIR), args.endpoint, args.ttl_days * 86400)
+    checker = LivenessChecker(args.endpoint, cache, args.concurrency, args.rate, args.retries, timeout=args.timeout)
+    started = time.perf_counter()
+    results = asyncio.run(checker.check_all([url for _, _, url in entries], refresh=args.refresh))
+    cache.save()
+
+    print("=== X URLの生存確認 ===")
+    print(f"登録数: {len(entries)}（アカウント {len({r.handle.lower() for r in results.values() if r.handle})}件）")
+    print(f"確認: {checker.requests}リクエスト（接続 {checker.connections}回, 再利用 {checker.reused}回）, "
+          f"再試行 {checker.retried}回, キャッシュ {cache.hits}件, {time.perf_counter() - started:.1f}秒")
+    counts = {}
+    for result in results.values():
+        counts[result.status] = counts.get(result.status, 0) + 1
+    for status, title in STATUSES.items():
+        if counts.get(status):
+            print(f"- {title}（{status}）: {counts[status]}")
+
+    problems = [(loc, name, url, results[url]) for loc, name, url in entries
+                if results[url].status in ('dead', 'renamed')]
+    if problems:
+        print("\n## 存在しない・名前が変わったアカウント")
+        for problem in problems:
+            print(f"- {format_problem(*problem)}")
+    other = [(loc, name, url, results[url]) for loc, name, url in entries
+             if results[url].status in ('unknown', 'error', 'invalid')]
+    if other:
+        print("\n## 確認できなかったURL")
+        for loc, name, url, result in other:
+            print(f"- {loc} {name}: {url}（{STATUSES[result.status]}: {result.detail or result.http_status}）")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+data/processed を監視し、変更された自治体の出力だけをその場で更新する常駐スクリプト
+
+起動時にコーパスを1回だけ読み込み、以降は変更されたファイルだけを読み直す。
+ファイルが変更されるたびに次の処理をその自治体についてだけ実行する:
+1. スキーマ検証（validate_data.py と同じ検証）
+2. ビューア用の viewer/js/municipalities/{code}.js の再生成
+3. data.js の該当行の差し替え（ビルドマニフェストも更新）
+4. 統計の差分表示（議員数・X登録数・全体の登録率）
+
+Linuxではinotifyで変更を待ち、使えない環境では一定間隔でstatを比較する。
+
+使用方法:
+    python scripts/watch.py
+    python scripts/watch.py --interval 0.5   # ポーリング間隔（秒）
+    python scripts/watch.py --poll           # inotifyを使わない
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import update_viewer_data
+import validate_data
+from corpus import (DATA_DIR, iter_source_files, load_corpus, parse_filename,
+                    read_source)
+from stream_validator import load_stream_validator
+
+VIEWER_JS_DIR = Path(__file__).resolve().parent.parent / 'viewer' / 'js'
+
+# inotifyのイベントマスク（linux/inotify.h）
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# エディタの保存が複数回の書き込みに分かれても1回の変更として扱うための待ち時間
+DEBOUNCE_SECONDS = 0.1
+
+
+class PollingWaiter:
+    """一定間隔で待つだけの待機（変更の検出はstatの比較で行う）"""
+
+    name = 'polling'
+
+    def __init__(self, data_dir: Path, interval: float):
+        self.interval = interval
+
+    def wait(self):
+        time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class InotifyWaiter:
+    """inotifyで data/processed と都道府県ディレクトリの変更を待つ"""
+
+    name = 'inotify'
+
+    def __init__(self, data_dir: Path, interval: float):
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            raise OSError('libc not found')
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, 'inotify_init1'):
+            raise OSError('inotify is not available')
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.data_dir = data_dir
+        self.interval = interval
+        self.watched = set()
+        self._add_watches()
+
+    def _add_watches(self):
+        """未登録のディレクトリ（新しく作られた都道府県ディレクトリを含む）を監視に追加"""
+        dirs = [self.data_dir] + [p for p in self.data_dir.iterdir() if p.is_dir()]
+        for path in dirs:
+            if path in self.watched:
+                continue
+            if self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK) >= 0:
+                self.watched.add(path)
+
+    def _drain(self):
+        """溜まったイベントを読み捨てる（どのファイルが変わったかはstat比較で判定する）"""
+        while True:
+            try:
+                if not os.read(self.fd, 65536):
+                    return
+            except BlockingIOError:
+                return
+
+    def wait(self):
+        # 変更がなくても interval ごとに戻り、取りこぼしをstat比較で補う
+        readable, _, _ = select.select([self.fd], [], [], max(self.interval, 1.0) * 5)
+        if readable:
+            self._drain()
+            time.sleep(DEBOUNCE_SECONDS)
+            self._drain()
+        self._add_watches()
+
+    def close(self):
+        os.close(self.fd)
+
+
+def create_waiter(data_dir: Path, interval: float, polling: bool = False):
+    """inotifyが使えればinotify、使えなければポーリングの待機を返す"""
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWaiter(data_dir, interval)
+        except OSError:
+            pass
+    return PollingWaiter(data_dir, interval)
+
+
+def scan_sources(data_dir: Path) -> Dict[str, Tuple[int, int]]:
+    """ソースファイルの (サイズ, 更新時刻) を相対パスごとに取得"""
+    result = {}
+    for path in iter_source_files(data_dir):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        result[path.relative_to(data_dir).as_posix()] = (st.st_size, st.st_mtime_ns)
+    return result
+
+
+def format_rate(x_count: int, count: int) -> str:
+    return f"{x_count / count * 100:.1f}%" if count else "-"
+
+
+class CorpusWatcher:
+    """コーパスを保持したまま、変更されたファイルの出力だけを更新する"""
+
+    def __init__(self, data_dir: Path = DATA_DIR, viewer_js_dir: Path = VIEWER_JS_DIR):
+        self.data_dir = Path(data_dir)
+        self.output_path = viewer_js_dir / 'data.js'
+        self.municipalities_dir = viewer_js_dir / 'municipalities'
+        self.manifest_path = viewer_js_dir / 'build_manifest.json'
+
+        self.schema_path = validate_data.select_schema_path()
+        self.validator = load_stream_validator(self.schema_path)
+
+        # コーパスを1回だけ読み込み、ビューア出力をマニフェストと同期してから保持する
+        corpus = load_corpus(self.data_dir)
+        update_viewer_data.build_viewer(self.data_dir, viewer_js_dir, corpus=corpus)
+        self.digests = {m.relpath: m.digest for m in corpus}
+        self.members = {m.relpath: m.members for m in corpus if not m.error}
+        self.stats = {relpath: (len(members), update_viewer_data.count_x_accounts(members))
+                      for relpath, members in self.members.items()}
+        self.stat_cache = scan_sources(self.data_dir)
+        self.manifest = update_viewer_data.load_manifest(self.manifest_path)
+
+    def totals(self) -> Tuple[int, int]:
+        count = sum(s[0] for s in self.stats.values())
+        x_count = sum(s[1] for s in self.stats.values())
+        return count, x_count
+
+    def poll(self) -> int:
+        """前回からの変更を処理し、処理したファイル数を返す"""
+        current = scan_sources(self.data_dir)
+        changed = [p for p, st in current.items() if self.stat_cache.get(p) != st]
+        removed = [p for p in self.stat_cache if p not in current]
+        self.stat_cache = current
+        if not changed and not removed:
+            return 0
+
+        started = time.perf_counter()
+        before = self.totals()
+        entries = dict(self.manifest.get('municipalities', {}))
+        changed_rows = {}
+        removed_codes = []
+        processed = 0
+
+        for relpath in changed:
+            result = self._process_file(relpath, entries)
+            if result is None:
+                continue
+            processed += 1
+            code, row = result
+            if code:
+                changed_rows[code] = row
+
+        for relpath in removed:
+            code, _ = parse_filename(Path(relpath))
+            self.digests.pop(relpath, None)
+            self.members.pop(relpath, None)
+            self.stats.pop(relpath, None)
+            if code in entries and entries[code].get('source') == relpath:
+                del entries[code]
+                removed_codes.append(code)
+                (self.municipalities_dir / f"{code}.js").unlink(missing_ok=True)
+            print(f"削除: {relpath}")
+            processed += 1
+
+        if changed_rows or removed_codes:
+            update_viewer_data.update_data_js(
+                self.output_path, self.manifest, entries, changed_rows, removed_codes
+            )
+            update_viewer_data.save_manifest(self.manifest_path, self.manifest)
+
+        after = self.totals()
+        if processed:
+            print(f"全体: 議員数 {before[0]} → {after[0]}, X登録 {before[1]} → {after[1]}"
+                  f" ({format_rate(before[1], before[0])} → {format_rate(after[1], after[0])})"
+                  f" [{(time.perf_counter() - started) * 1000:.1f}ms]\n")
+        return processed
+
+    def _process_file(self, relpath: str, entries: Dict) -> Optional[Tuple[str, Dict]]:
+        """1ファイル分の検証・ビューア出力・統計を更新する
+
+        内容が変わっていなければNone、ビューア出力を更新した場合は (code, data.jsの行)、
+        検証だけ行った場合は (None, None) を返す。
+        """
+        path = self.data_dir / relpath
+        try:
+            document, error, digest = read_source(path)
+        except FileNotFoundError:
+            return None
+        if self.digests.get(relpath) == digest:
+            return None
+        self.digests[relpath] = digest
+        code, name = parse_filename(path)
+
+        # 1. スキーマ検証
+        errors, warnings = validate_data.validate_document(path, document, error, self.validator)
+        status = '❌' if errors else '✅'
+        print(f"{status} {relpath}")
+        for message in errors + warnings:
+            print(f"  - {message}")
+        if error or not isinstance(document, list):
+            self.members.pop(relpath, None)
+            self.stats.pop(relpath, None)
+            return None, None
+
+        # 4. 統計の差分
+        previous = self.stats.get(relpath, (0, 0))
+        members = [m for m in document if isinstance(m, dict)]
+        current = (len(members), update_viewer_data.count_x_accounts(members))
+        self.members[relpath] = members
+        self.stats[relpath] = current
+        print(f"  {name}: 議員数 {previous[0]} → {current[0]}, X登録 {previous[1]} → {current[1]}"
+              f" ({current[1] - previous[1]:+d})")
+
+        # 2-3. ビューア出力（都道府県ディレクトリ内のファイルのみ）
+        if not code or Path(relpath).parent == Path('.'):
+            return None, None
+        entry = update_viewer_data.build_municipality_entry(
+            self.municipalities_dir, code, name, relpath, digest, members
+        )
+        entries[code] = entry
+        return code, entry['row']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='data/processed を監視して出力を差分更新')
+    parser.add_argument('--interval', type=float, default=1.0, help='ポーリング間隔（秒）')
+    parser.add_argument('--poll', action='store_true', help='inotifyを使わずstatで監視')
+    args = parser.parse_args()
+
+    watcher = CorpusWatcher()
+    waiter = create_waiter(watcher.data_dir, args.interval, args.poll)
+    count, x_count = watcher.totals()
+    print(f"\n監視を開始しました（{waiter.name}）: {len(watcher.digests)}ファイル, "
+          f"議員数 {count}, X登録 {x_count} ({format_rate(x_count, count)})")
+    print("終了するには Ctrl+C を押してください\n")
+
+    try:
+        while True:
+            waiter.wait()
+            watcher.poll()
+    except KeyboardInterrupt:
+        print("\n監視を終了しました")
+    finally:
+        waiter.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
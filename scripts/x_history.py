@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+gitの履歴からX登録率の推移を集計するスクリプト
+
+data/processed を変更したコミット（first-parentの履歴）を古い順にたどり、コミットごとの
+自治体・都道府県・全国の議員数とX登録数を求める。コミットをチェックアウトせず、
+変更されたファイルのblobだけを git cat-file --batch で読み込む。
+
+- blobごとの (議員数, X登録数) は blobのハッシュをキーにキャッシュし、同じ内容は二度とパースしない
+- コミットごとには前のコミットから変わった自治体の値だけを記録する
+- 2回目以降は前回の最後のコミットより後のコミットだけを処理する
+  （履歴が書き換えられて前回のコミットが祖先でなくなった場合は最初からたどり直す）
+
+キャッシュは .cache/corpus/x_history.bin に保存する。
+
+使用方法:
+    python scripts/x_history.py                                # 全国の推移（Markdownの表）
+    python scripts/x_history.py --level prefecture --format csv
+    python scripts/x_history.py --level municipality --format json
+    python scripts/x_history.py --rebuild                      # キャッシュを使わずにたどり直す
+"""
+
+import argparse
+import csv
+import io
+import json
+import marshal
+import os
+import subprocess
+import sys
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from corpus import DATA_DIR, FILE_PATTERN, cache_path_for, parse_filename
+from councillor import X_FIELD
+
+# キャッシュの形式（集計方法を変えたら上げる）
+HISTORY_VERSION = 1
+LEVELS = ('national', 'prefecture', 'municipality')
+FORMATS = ('markdown', 'csv', 'json')
+
+
+def _git(cwd: Path, *args: str) -> str:
+    try:
+        completed = subprocess.run(['git', *args], cwd=cwd, capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        stderr = getattr(e, 'stderr', b'') or b''
+        raise ValueError(f"git {args[0]} に失敗しました: {stderr.decode('utf-8', 'replace').strip() or e}")
+    return completed.stdout.decode('utf-8')
+
+
+def count_blob(data: bytes) -> Optional[Tuple[int, int]]:
+    """議員リストJSONの (議員数, X登録数)。JSONとして読めない場合はNone"""
+    try:
+        document = json.loads(data.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    if not isinstance(document, list):
+        return None
+    members = [m for m in document if isinstance(m, dict)]
+    with_x = sum(1 for m in members if m.get(X_FIELD) and m[X_FIELD] != 'null')
+    return len(members), with_x
+
+
+class BlobReader:
+    """git cat-file --batch で blob を読み込む（プロセスは1つを使い回す）"""
+
+    def __init__(self, repo: Path):
+        self.process = subprocess.Popen(['git', 'cat-file', '--batch'], cwd=repo,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def read(self, sha: str) -> bytes:
+        self.process.stdin.write(sha.encode('ascii') + b'\n')
+        self.process.stdin.flush()
+        header = self.process.stdout.readline().split()
+        if len(header) < 3 or header[1] != b'blob':
+            raise ValueError(f'blobを読み込めません: {sha}')
+        data = self.process.stdout.read(int(header[2]))
+        self.process.stdout.read(1)  # 末尾の改行
+        return data
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class XHistory:
+    """コミットごとの自治体の (議員数, X登録数) の変化
+
+    commits は [(コミット, コミット時刻, {相対パス: (議員数, X登録数) または None（削除）})] を古い順に持つ。
+    blobs は {blobのハッシュ: (議員数, X登録数) または None（JSONとして読めない）}。
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR, cache_path: Optional[Path] = None):
+        self.data_dir = Path(data_dir).resolve()
+        self.cache_path = Path(cache_path) if cache_path else cache_path_for(self.data_dir, 'x_history', '.bin')
+        self.repo = Path(_git(self.data_dir, 'rev-parse', '--show-toplevel').strip())
+        self.prefix = self.data_dir.relative_to(self.repo.resolve()).as_posix()
+        self.blobs: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.commits: List[Tuple[str, int, Dict]] = []
+        self.parsed = 0
+
+    def load(self):
+        try:
+            with open(self.cache_path, 'rb') as f:
+                payload = marshal.load(f)
+        except (OSError, ValueError, EOFError, TypeError):
+            return
+        if not isinstance(payload, dict) or payload.get('version') != HISTORY_VERSION:
+            return
+        if payload.get('prefix') != self.prefix:
+            return
+        self.blobs = payload['blobs']
+        self.commits = payload['commits']
+
+    def save(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f'{self.cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            marshal.dump({'version': HISTORY_VERSION, 'prefix': self.prefix, 'blobs': self.blobs,
+                          'commits': self.commits}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _is_source(self, relpath: str) -> bool:
+        parts = PurePosixPath(relpath).parts
+        return 1 <= len(parts) <= 2 and fnmatch(parts[-1], FILE_PATTERN)
+
+    def _pending_commits(self, rev: str) -> List[Tuple[str, int]]:
+        """前回の最後のコミットより後の、data/processed を変更したコミット（古い順）"""
+        last = self.commits[-1][0] if self.commits else None
+        if last is not None:
+            try:
+                _git(self.repo, 'merge-base', '--is-ancestor', last, rev)
+            except ValueError:
+                # 履歴が書き換えられた場合はたどり直す（blobのキャッシュは使い回す）
+                self.commits, last = [], None
+        revision_range = f'{last}..{rev}' if last else rev
+        output = _git(self.repo, 'log', '--first-parent', '--reverse', '--format=%H %ct',
+                      revision_range, '--', self.prefix)
+        result = []
+        for line in output.splitlines():
+            sha, timestamp = line.split()
+            result.append((sha, int(timestamp)))
+        return result
+
+    def _changed_blobs(self, previous: str, commit: str) -> Iterator[Tuple[str, Optional[str]]]:
+        """前のコミットから変わったソースファイルの (相対パス, 新しいblob（削除はNone）)"""
+        output = _git(self.repo, 'diff-tree', '-r', '-z', '--no-renames', previous, commit, '--', self.prefix)
+        fields = output.split('\0')
+        for i in range(0, len(fields) - 1, 2):
+            meta, path = fields[i].split(), fields[i + 1]
+            relpath = path[len(self.prefix) + 1:] if self.prefix != '.' else path
+            if not self._is_source(relpath):
+                continue
+            yield relpath, None if meta[4] == 'D' else meta[3]
+
+    def update(self, rev: str = 'HEAD') -> int:
+        """新しいコミットを処理し、処理したコミット数を返す"""
+        pending = self._pending_commits(rev)
+        if not pending:
+            return 0
+        empty_tree = _git(self.repo, 'hash-object', '-t', 'tree', '/dev/null').strip()
+        previous = self.commits[-1][0] if self.commits else empty_tree
+        with BlobReader(self.repo) as reader:
+            for sha, timestamp in pending:
+                changes = {}
+                for relpath, blob in self._changed_blobs(previous, sha):
+                    if blob is None:
+                        changes[relpath] = None
+                        continue
+                    if blob not in self.blobs:
+                        self.blobs[blob] = count_blob(reader.read(blob))
+                        self.parsed += 1
+                    changes[relpath] = self.blobs[blob]
+                self.commits.append((sha, timestamp, changes))
+                previous = sha
+        return len(pending)
+
+    def series(self, level: str = 'national') -> List[Dict]:
+        """時系列の点（コミットごとに値が変わった自治体・都道府県・全国）を古い順に返す"""
+        values: Dict[str, Tuple[int, int]] = {}
+        rows = []
+        for sha, timestamp, changes in self.commits:
+            if not changes:
+                continue
+            for relpath, counts in changes.items():
+                if counts is None:
+                    values.pop(relpath, None)
+                else:
+                    values[relpath] = counts
+            date = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M')
+            if level == 'municipality':
+                for relpath in sorted(changes):
+                    code, name = parse_filename(PurePosixPath(relpath))
+                    total, with_x = values.get(relpath, (0, 0))
+                    rows.append(_point(sha, date, total, with_x, code=code, name=name,
+                                       prefecture=_prefecture(relpath)))
+            elif level == 'prefecture':
+                for prefecture in sorted({_prefecture(r) for r in changes}):
+                    members = [v for r, v in values.items() if _prefecture(r) == prefecture]
+                    rows.append(_point(sha, date, sum(v[0] for v in members), sum(v[1] for v in members),
+                                       prefecture=prefecture, municipalities=len(members)))
+            else:
+                rows.append(_point(sha, date, sum(v[0] for v in values.values()),
+                                   sum(v[1] for v in values.values()), municipalities=len(values)))
+        return rows
+
+
+def _prefecture(relpath: str) -> str:
+    parts = PurePosixPath(relpath).parts
+    return parts[0] if len(parts) == 2 else ''
+
+
+def _point(sha: str, date: str, total: int, with_x: int, **labels) -> Dict:
+    point = {'commit': sha[:12], 'date': date}
+    point.update(labels)
+    point.update(total=total, with_x=with_x, rate=round(with_x / total * 100, 1) if total else 0.0)
+    return point
+
+
+def render_markdown(rows: List[Dict]) -> str:
+    if not rows:
+        return '（data/processed を変更したコミットがありません）'
+    columns = [c for c in rows[0] if c != 'commit']
+    titles = {'date': '日時', 'code': '自治体コード', 'name': '自治体名', 'prefecture': '都道府県',
+              'municipalities': '自治体数', 'total': '議員数', 'with_x': 'X登録数', 'rate': '登録率'}
+    lines = ['| コミット | ' + ' | '.join(titles[c] for c in columns) + ' |',
+             '|' + '------|' * (len(columns) + 1)]
+    for row in rows:
+        cells = [f"{row[c]:.1f}%" if c == 'rate' else str(row[c]) for c in columns]
+        lines.append(f"| {row['commit'][:7]} | " + ' | '.join(cells) + ' |')
+    return '\n'.join(lines)
+
+
+def render_csv(rows: List[Dict]) -> str:
+    if not rows:
+        return ''
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0]), lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().rstrip('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='gitの履歴からX登録率の推移を集計')
+    parser.add_argument('--level', choices=LEVELS, default='national', help='集計の単位')
+    parser.add_argument('--format', choices=FORMATS, default='markdown', help='出力形式')
+    parser.add_argument('--rev', default='HEAD', help='たどるリビジョン（既定: HEAD）')
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR, help=argparse.SUPPRESS)
+    parser.add_argument('--rebuild', action='store_true', help='キャッシュを使わずにたどり直す')
+    args = parser.parse_args(argv)
+
+    try:
+        history = XHistory(args.data_dir)
+        if not args.rebuild:
+            history.load()
+        count = history.update(args.rev)
+    except ValueError as e:
+        print(f'エラー: {e}', file=sys.stderr)
+        return 1
+    if count:
+        history.save()
+    print(f'[history] 新しいコミット {count}件, パースしたblob {history.parsed}件'
+          f'（キャッシュ済みのコミット {len(history.commits) - count}件）', file=sys.stderr)
+
+    rows = history.series(args.level)
+    if args.format == 'json':
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    elif args.format == 'csv':
+        print(render_csv(rows))
+    else:
+        print(render_markdown(rows))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# テストからは scripts/ のモジュールを直接importする
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+import corpus as corpus_module
+
+# 性能テスト用の大規模コーパスの倍率（実データを何倍に複製するか）
+LARGE_CORPUS_COPIES = int(os.environ.get('PERF_CORPUS_COPIES', '100'))
+
+
+def member(name='a', yomi='a', x=None, party='無所属'):
+    """テスト用の議員データ（v1.2スキーマの5項目）"""
+    return {'氏名': name, '登録名': name, 'よみ': yomi, 'X（旧Twitter）': x, '所属': party}
+
+
+def write_json(path: Path, data, indent=None, trailing_newline=False):
+    """JSONを書き出す（親ディレクトリも作る）"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    text = json.dumps(data, ensure_ascii=False, indent=indent)
+    path.write_text(text + '\n' if trailing_newline else text, encoding='utf-8')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'perf: 大規模コーパスでの時間・メモリの予算テスト（-m "not perf" で除外）')
+
+
+def replicate_corpus(source_dir: Path, target_dir: Path, copies: int) -> int:
+    """実データを都道府県ディレクトリごとに copies 倍に複製し、書き出したファイル数を返す
+
+    複製ごとに自治体コード（都道府県内の連番）と自治体名（末尾に複製番号）を付け替えるため、
+    ファイル名・自治体コードは全体で重複しない。2つ目以降の複製は登録名とXのハンドルにも
+    複製番号を付け、内容のハッシュが元のファイルと重ならないようにする（検証結果の使い回しを防ぐ）。
+    """
+    sources = corpus_module.iter_source_files(source_dir)
+    sequence = {}
+    count = 0
+    for copy in range(copies):
+        for path in sources:
+            relpath = path.relative_to(source_dir)
+            if relpath.parent == Path('.'):
+                continue
+            code, name = corpus_module.parse_filename(path)
+            prefix = code[:2]
+            sequence[prefix] = sequence.get(prefix, 0) + 1
+            new_code = f'{prefix}{sequence[prefix]:04d}'
+            target = target_dir / relpath.parent / f'議員リスト_{new_code}_{name}{copy:03d}.json'
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if copy:
+                target.write_text(json.dumps(_mark_copy(json.loads(path.read_text(encoding='utf-8')), copy),
+                                             ensure_ascii=False, indent=2), encoding='utf-8')
+            else:
+                target.write_bytes(path.read_bytes())
+            count += 1
+    return count
+
+
+def _mark_copy(document, copy: int):
+    if not isinstance(document, list):
+        return document
+    result = []
+    for member in document:
+        if isinstance(member, dict):
+            member = dict(member)
+            if isinstance(member.get('登録名'), str):
+                member['登録名'] += str(copy)
+            if isinstance(member.get('X（旧Twitter）'), str) and member['X（旧Twitter）'] != 'null':
+                member['X（旧Twitter）'] = member['X（旧Twitter）'] + f'_{copy}'
+        result.append(member)
+    return result
+
+
+@pytest.fixture(scope='session')
+def corpus(tmp_path_factory):
+    """data/processed の実データ（都道府県ディレクトリを含む全ファイル）をセッションで1回だけ読み込む"""
+    snapshot = tmp_path_factory.mktemp('corpus') / 'snapshot.bin'
+    return corpus_module.load_corpus(corpus_module.DATA_DIR, snapshot_path=snapshot)
+
+
+@pytest.fixture(scope='session')
+def large_corpus(tmp_path_factory, corpus):
+    """実データを LARGE_CORPUS_COPIES 倍に複製したコーパス（性能テスト用）"""
+    root = tmp_path_factory.mktemp('large_corpus')
+    data_dir = root / 'processed'
+    replicate_corpus(corpus_module.DATA_DIR, data_dir, LARGE_CORPUS_COPIES)
+    return corpus_module.load_corpus(data_dir, snapshot_path=root / 'snapshot.bin')
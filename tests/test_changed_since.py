@@ -0,0 +1,85 @@
+import contextlib
+import io
+import shutil
+import subprocess
+from pathlib import Path
+
+import corpus
+import update_viewer_data
+
+from .conftest import member, write_json
+
+
+def git(repo, *args):
+    subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+                   cwd=repo, check=True, capture_output=True)
+
+
+def build(data_dir, viewer_js_dir, changed_since=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return update_viewer_data.build_viewer(data_dir, viewer_js_dir, changed_since=changed_since)
+
+
+def test_changed_since_updates_only_changed_municipalities(tmp_path):
+    repo = tmp_path / 'repo'
+    data_dir = repo / 'data' / 'processed'
+    tokyo = data_dir / '13_東京都'
+    write_json(tokyo / '議員リスト_132012_八王子市.json', [member('山田　太郎')])
+    write_json(tokyo / '議員リスト_132021_立川市.json', [member('鈴木　一郎')])
+    write_json(tokyo / '議員リスト_132039_武蔵野市.json', [member('田中　次郎')])
+    git(repo, 'init', '-q')
+    git(repo, 'add', '.')
+    git(repo, 'commit', '-q', '-m', 'initial')
+
+    viewer_js_dir = tmp_path / 'js'
+    build(data_dir, viewer_js_dir)
+    musashino_js = (viewer_js_dir / 'municipalities' / '132039.js').read_text(encoding='utf-8')
+
+    write_json(tokyo / '議員リスト_132012_八王子市.json', [member('山田　太郎', x='https://x.com/yamada')])
+    (tokyo / '議員リスト_132021_立川市.json').unlink()
+    write_json(tokyo / '議員リスト_132047_三鷹市.json', [member('佐藤　花子')])
+
+    sources, removed = corpus.changed_sources('HEAD', data_dir)
+    assert [s.relpath for s in sources] == ['13_東京都/議員リスト_132012_八王子市.json',
+                                            '13_東京都/議員リスト_132047_三鷹市.json']
+    assert removed == ['13_東京都/議員リスト_132021_立川市.json']
+    assert sources[0].members == [member('山田　太郎', x='https://x.com/yamada')]
+
+    manifest = build(data_dir, viewer_js_dir, changed_since='HEAD')
+    assert sorted(manifest['municipalities']) == ['132012', '132039', '132047']
+    assert not (viewer_js_dir / 'municipalities' / '132021.js').exists()
+    assert (viewer_js_dir / 'municipalities' / '132039.js').read_text(encoding='utf-8') == musashino_js
+
+    # 全体を差分ビルドした場合と同じ data.js になる
+    partial_data_js = (viewer_js_dir / 'data.js').read_text(encoding='utf-8')
+    full_dir = tmp_path / 'full'
+    build(data_dir, full_dir)
+    assert partial_data_js == (full_dir / 'data.js').read_text(encoding='utf-8')
+
+
+def test_same_size_edit_of_output_is_rebuilt(tmp_path):
+    data_dir = tmp_path / 'processed'
+    write_json(data_dir / '13_東京都' / '議員リスト_132012_八王子市.json', [member('山田　太郎')])
+    viewer_js_dir = tmp_path / 'js'
+    build(data_dir, viewer_js_dir)
+    js_path = viewer_js_dir / 'municipalities' / '132012.js'
+    original = js_path.read_text(encoding='utf-8')
+
+    # サイズが同じでも内容が変わっていれば再生成する
+    js_path.write_text(original.replace('山田', '田山'), encoding='utf-8')
+    assert js_path.stat().st_size == len(original.encode('utf-8'))
+    build(data_dir, viewer_js_dir)
+    assert js_path.read_text(encoding='utf-8') == original
+
+
+def test_generator_hash_covers_shared_modules(tmp_path, monkeypatch):
+    scripts_dir = Path(update_viewer_data.__file__).resolve().parent
+    for name in update_viewer_data.GENERATOR_MODULES:
+        shutil.copy(scripts_dir / f'{name}.py', tmp_path / f'{name}.py')
+    monkeypatch.setattr(update_viewer_data, '__file__', str(tmp_path / 'update_viewer_data.py'))
+    before = update_viewer_data.generator_hash()
+
+    # 政党の正規化が変われば出力も変わるので、全自治体を再生成する
+    with open(tmp_path / 'parties.py', 'a', encoding='utf-8') as f:
+        f.write('\n# changed\n')
+    assert update_viewer_data.generator_hash() != before
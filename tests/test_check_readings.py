@@ -0,0 +1,65 @@
+import contextlib
+import io
+import json
+
+import check_readings
+import corpus
+from pipeline import run_pipeline
+
+from .conftest import member, write_json
+
+
+def run(data_dir, tmp_path, fix=False):
+    stage = check_readings.ReadingStage(fix=fix)
+    loaded = corpus.load_corpus(data_dir, snapshot_path=tmp_path / 'snapshot.bin')
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_pipeline([stage], data_dir, corpus=loaded)
+    return stage
+
+
+def test_check_member():
+    assert check_readings.check_member(member('山田　太郎', 'やまだ　たろう')) == []
+    assert check_readings.check_member(member('長谷川　順子', 'はせがわ じゅんこ')) == ['spaces']
+    assert check_readings.check_member(member('山田 太郎', 'ヤマダ　タロウ ')) == ['yomi_katakana', 'spaces']
+    assert check_readings.check_member(member('榎戸雄一', 'えのきどゆういち')) == ['yomi_separator']
+    assert check_readings.check_member(member('山田　太郎', '山田　たろう')) == ['yomi_chars']
+    assert check_readings.check_member(member('山田　太郎', 'やまだたろう')) == ['yomi_separator', 'split_mismatch']
+    assert check_readings.check_member(dict(member('山田　太郎', 'やまだ　たろう'), 登録名='山田 太郎')) == ['spaces']
+
+
+def test_fix_member_normalizes_registered_name():
+    fixed = dict(member('山田　太郎', 'やまだ　たろう'), 登録名=' 山田  太郎')
+    assert check_readings.fix_member(fixed)
+    assert fixed['登録名'] == '山田　太郎' and check_readings.check_member(fixed) == []
+
+
+def test_fix_rewrites_files_and_counts_defects(tmp_path):
+    data_dir = tmp_path / 'processed'
+    hachioji = data_dir / '13_東京都' / '議員リスト_132012_八王子市.json'
+    write_json(hachioji, [member('長谷川　順子', 'はせがわ じゅんこ'), member('山田　太郎', 'ヤマダ　タロウ'),
+                          member('榎戸雄一', 'えのきどゆういち')], indent=2, trailing_newline=True)
+    tachikawa = data_dir / '13_東京都' / '議員リスト_132021_立川市.json'
+    write_json(tachikawa, [member('鈴木　一郎', 'すずき　いちろう')])
+    tachikawa_text = tachikawa.read_text(encoding='utf-8')
+
+    stage = run(data_dir, tmp_path, fix=True)
+    counts = stage.counts['13_東京都/議員リスト_132012_八王子市.json'][3]
+    assert dict(counts) == {'spaces': 1, 'yomi_katakana': 1, 'yomi_separator': 1}
+    assert not stage.counts['13_東京都/議員リスト_132021_立川市.json'][3]
+    assert stage.fixed_members == 2
+    assert [m[0] for m in stage.manual] == ['13_東京都/議員リスト_132012_八王子市.json#/2']
+
+    # 修正したファイルは元のインデントを保ち、不備のないファイルは書き換えない
+    text = hachioji.read_text(encoding='utf-8')
+    assert text.startswith('[\n  {') and text.endswith('\n')
+    assert [m['よみ'] for m in json.loads(text)] == ['はせがわ　じゅんこ', 'やまだ　たろう', 'えのきどゆういち']
+    assert tachikawa.read_text(encoding='utf-8') == tachikawa_text
+    assert dict(run(data_dir, tmp_path).total()) == {'yomi_separator': 1}
+
+
+def test_fix_skips_files_changed_after_check(tmp_path):
+    path = tmp_path / 'a.json'
+    write_json(path, [member('山田 太郎', 'やまだ たろう')])
+    fixed, error = check_readings.fix_file(path, 'stale-digest')
+    assert (fixed, error is not None) == (0, True)
+    assert json.loads(path.read_text(encoding='utf-8'))[0]['氏名'] == '山田 太郎'
@@ -0,0 +1,84 @@
+import corpus
+
+from .conftest import write_json
+
+MEMBERS = [
+    {'氏名': '山田　太郎', '登録名': '山田　太郎', 'よみ': 'やまだ　たろう',
+     'X（旧Twitter）': 'https://x.com/yamada', '所属': '無所属'},
+    {'氏名': '鈴木　花子', '登録名': '鈴木　花子', 'よみ': 'すずき　はなこ',
+     'X（旧Twitter）': None, '所属': '無所属'},
+]
+
+
+def test_snapshot_roundtrip_and_rebuild(tmp_path):
+    data_dir = tmp_path / 'processed'
+    snapshot = tmp_path / 'snapshot.bin'
+    write_json(data_dir / '13_東京都' / '議員リスト_132012_八王子市.json', MEMBERS)
+    write_json(data_dir / '11_埼玉県' / '議員リスト_112089_所沢市.json', [{'氏名': 'extra', 'x': 1}])
+    (data_dir / '11_埼玉県' / '議員リスト_112259_入間市.json').write_text('{', encoding='utf-8')
+
+    loaded = corpus.load_corpus(data_dir, snapshot_path=snapshot)
+    assert [m.code for m in loaded] == ['112089', '112259', '132012']
+    assert loaded.by_code['132012'].members == MEMBERS
+    assert loaded.by_code['132012'].prefecture == '13_東京都'
+    assert loaded.by_code['112089'].members == [{'氏名': 'extra', 'x': 1}]
+    assert loaded.by_code['112259'].error
+    assert loaded.parties == ['無所属']
+
+    # 内容を変更すると再構築される
+    write_json(data_dir / '13_東京都' / '議員リスト_132012_八王子市.json', MEMBERS[:1])
+    reloaded = corpus.load_corpus(data_dir, snapshot_path=snapshot)
+    assert reloaded.by_code['132012'].members == MEMBERS[:1]
+
+
+def test_load_files_keeps_input_order(tmp_path):
+    paths = []
+    for i in range(12):
+        path = tmp_path / f'{i:02d}.json'
+        write_json(path, [{'i': i}] * (12 - i))
+        paths.append(path)
+    paths.append(tmp_path / 'broken.json')
+    paths[-1].write_text('[', encoding='utf-8')
+
+    serial = corpus.load_files(paths, mode='serial')
+    for mode in ('thread', 'process'):
+        assert corpus.load_files(paths, workers=4, mode=mode) == serial
+    assert [doc[0]['i'] for doc, _, _ in serial[:-1]] == list(range(12))
+    assert serial[-1][1]
+
+
+def test_councillor_roundtrip_and_interning(tmp_path):
+    data_dir = tmp_path / 'processed'
+    write_json(data_dir / '13_東京都' / '議員リスト_132012_八王子市.json', MEMBERS)
+    loaded = corpus.load_corpus(data_dir, snapshot_path=tmp_path / 'snapshot.bin')
+
+    councillors = list(loaded.iter_councillors())
+    assert [c.to_dict() for c in councillors] == MEMBERS
+    assert [c.has_x for c in councillors] == [True, False]
+    assert councillors[0].party is councillors[1].party
+    assert councillors[0].municipality is councillors[1].municipality
+    assert councillors[0].prefecture == '13_東京都'
+    assert corpus.Councillor.from_dict(MEMBERS[0]).to_dict() == MEMBERS[0]
+
+
+def test_file_cache_reparses_only_changed_files(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'processed'
+    snapshot = tmp_path / 'snapshot.bin'
+    for code in ('132012', '132021', '132039'):
+        write_json(data_dir / '13_東京都' / f'議員リスト_{code}_市.json', MEMBERS)
+    corpus.load_corpus(data_dir, snapshot_path=snapshot)
+    assert corpus.CACHE_STATS['file_misses'] == 3
+
+    corpus.load_corpus(data_dir, snapshot_path=snapshot)
+    assert corpus.CACHE_STATS['snapshot'] == 'fresh'
+
+    write_json(data_dir / '13_東京都' / '議員リスト_132021_市.json', MEMBERS[:1])
+    loaded = corpus.load_corpus(data_dir, snapshot_path=snapshot)
+    assert corpus.CACHE_STATS['snapshot'] == 'stale'
+    assert (corpus.CACHE_STATS['file_hits'], corpus.CACHE_STATS['file_misses']) == (2, 1)
+    assert len(loaded.by_code['132021']) == 1
+
+    # スキーマが変わるとキャッシュは全て無効になる
+    monkeypatch.setattr(corpus, 'cache_tag', lambda: 'other-schema')
+    corpus.load_corpus(data_dir, snapshot_path=snapshot)
+    assert corpus.CACHE_STATS['file_misses'] == 3
@@ -0,0 +1,53 @@
+import councillor_index
+
+from .conftest import member, write_json
+
+
+def test_index_queries_and_incremental_update(tmp_path):
+    data_dir = tmp_path / 'processed'
+    db_path = tmp_path / 'councillors.sqlite'
+    tokyo = data_dir / '13_東京都' / '議員リスト_132012_八王子市.json'
+    write_json(tokyo, [
+        member('長谷川　順子', 'はせがわ　じゅんこ', x='https://x.com/hasegawa', party='公明党'),
+        member('山田　太郎', 'やまだ　たろう', party='公明党八王子市議団'),
+        member('鈴木　花子', 'すずき　はなこ', party='無所属'),
+    ])
+    write_json(data_dir / '11_埼玉県' / '議員リスト_112089_所沢市.json', [
+        member('佐藤　次郎', 'さとう　じろう', party='公明党'),
+    ])
+
+    stats = councillor_index.build_index(data_dir, db_path)
+    assert stats['updated'] == 2
+
+    conn = councillor_index.open_index(data_dir, db_path)
+    rows = councillor_index.find_members(conn, prefecture='13_東京都', party='公明党', has_x=False)
+    assert [r['氏名'] for r in rows] == ['山田　太郎']
+    rows = councillor_index.find_members(conn, national_party='公明党')
+    assert [r['政党'] for r in rows] == ['公明党'] * 3
+    assert [r['氏名'] for r in councillor_index.search(conn, 'はせがわ')] == ['長谷川　順子']
+    assert [r['氏名'] for r in councillor_index.search(conn, '山田')] == ['山田　太郎']
+    assert councillor_index.find_by_x_url(conn, 'https://x.com/hasegawa')[0]['municipality_code'] == '132012'
+    conn.close()
+
+    write_json(tokyo, [member('鈴木　花子', 'すずき　はなこ', party='無所属')])
+    stats = councillor_index.build_index(data_dir, db_path)
+    assert stats == {'updated': 1, 'removed': 0, 'unchanged': 1}
+    conn = councillor_index.open_index(data_dir, db_path)
+    assert councillor_index.search(conn, 'はせがわ') == []
+    conn.close()
+
+
+def test_index_is_rebuilt_when_party_aliases_change(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'processed'
+    db_path = tmp_path / 'councillors.sqlite'
+    write_json(data_dir / '13_東京都' / '議員リスト_132012_八王子市.json', [member(party='新風会')])
+    assert councillor_index.build_index(data_dir, db_path)['updated'] == 1
+
+    # データが変わらなくても、別名表が変われば政党列を作り直す
+    aliases = dict(councillor_index.PARTY_ALIASES, 新風党=('新風',))
+    monkeypatch.setattr(councillor_index, 'PARTY_ALIASES', aliases)
+    monkeypatch.setattr(councillor_index, 'normalize_party', lambda party: '新風党')
+    assert councillor_index.build_index(data_dir, db_path)['updated'] == 1
+    conn = councillor_index.open_index(data_dir, db_path)
+    assert [r['政党'] for r in councillor_index.find_members(conn)] == ['新風党']
+    conn.close()
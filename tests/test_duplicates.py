@@ -0,0 +1,47 @@
+import corpus
+import duplicates
+
+from .conftest import member, write_json
+
+
+def test_clusters_with_spacing_kana_and_variant_kanji(tmp_path):
+    data_dir = tmp_path / 'processed'
+    write_json(data_dir / '13_東京都' / '議員リスト_132012_八王子市.json', [
+        member('髙橋　一郎', 'たかはし　いちろう'),
+        member('山田　太郎', 'やまだ　たろう'),
+        member('山田　花子', 'やまだ　はなこ'),
+        member('鈴木　次郎', 'すずき じろう'),
+        member('鈴木次郎', 'スズキ　ジロウ'),
+    ])
+    write_json(data_dir / '13_東京都' / '議員リスト_132021_立川市.json', [
+        member('高橋一郎', 'たかはし いちろう'),
+        member('佐藤　花子', 'さとう　はなこ'),
+    ])
+    write_json(data_dir / '11_埼玉県' / '議員リスト_112089_所沢市.json', [
+        member('高橋　一朗', 'たかはし　いちろう'),
+    ])
+
+    index = duplicates.DuplicateIndex()
+    for muni in corpus.load_corpus(data_dir, snapshot_path=tmp_path / 'snapshot.bin'):
+        index.add(muni)
+    clusters = index.clusters()
+
+    # 同じ苗字・同じ名前だけの別人（山田太郎/山田花子、山田花子/佐藤花子）はまとめない
+    assert [(round(c.score, 2), c.entries) for c in clusters] == [
+        (0.82, ['11_埼玉県/議員リスト_112089_所沢市.json#/0 (高橋　一朗)',
+                '13_東京都/議員リスト_132012_八王子市.json#/0 (髙橋　一郎)',
+                '13_東京都/議員リスト_132021_立川市.json#/0 (高橋一郎)']),
+        (1.0, ['13_東京都/議員リスト_132012_八王子市.json#/3 (鈴木　次郎)',
+               '13_東京都/議員リスト_132012_八王子市.json#/4 (鈴木次郎)']),
+    ]
+
+
+def test_candidate_pairs_are_not_quadratic():
+    class Muni:
+        relpath = 'a.json'
+        members = [member(f'{chr(0x4E00 + i)}{chr(0x5000 + i)}', f'{chr(0x3042 + i % 40)}{chr(0x304B + i % 7)}'
+                          f'{chr(0x3055 + i % 11)}{chr(0x305F + i % 13)}') for i in range(400)]
+
+    index = duplicates.DuplicateIndex()
+    index.add(Muni)
+    assert len(set(index.candidate_pairs())) < 400 * 399 // 2 // 20
@@ -0,0 +1,78 @@
+import contextlib
+import io
+
+import corpus
+import integrity
+from pipeline import run_pipeline
+
+from .conftest import member, write_json
+
+
+def test_collision_groups(tmp_path):
+    data_dir = tmp_path / 'processed'
+    write_json(data_dir / '13_東京都' / '議員リスト_132012_八王子市.json', [
+        member('山田　太郎', 'やまだ　たろう', 'https://x.com/Yamada'),
+        member('鈴木　一郎', 'すずき　いちろう'),
+    ])
+    write_json(data_dir / '13_東京都' / '議員リスト_132021_立川市.json', [
+        member('山田太郎', 'ヤマダ タロウ'),
+        member('佐藤　花子', 'さとう　はなこ', 'https://twitter.com/yamada/'),
+    ])
+    # コードの都道府県（11）とディレクトリ（13）が違い、コードも八王子市と重複している
+    write_json(data_dir / '13_東京都' / '議員リスト_112089_所沢市.json', [])
+    write_json(data_dir / '11_埼玉県' / '議員リスト_132012_八王子市.json', [])
+
+    index = integrity.IntegrityIndex()
+    for muni in corpus.load_corpus(data_dir, snapshot_path=tmp_path / 'snapshot.bin'):
+        index.add(muni)
+    collisions = index.collisions()
+
+    assert [(c.kind, c.key) for c in collisions] == [
+        ('x_url', 'x.com/yamada'),
+        ('prefecture', '132012（11_埼玉県）'),
+        ('prefecture', '112089（13_東京都）'),
+        ('code', '132012'),
+        ('name', '山田太郎/やまだたろう'),
+    ]
+    assert collisions[0].entries == [
+        '13_東京都/議員リスト_132012_八王子市.json#/0 (山田　太郎)',
+        '13_東京都/議員リスト_132021_立川市.json#/1 (佐藤　花子)',
+    ]
+    assert collisions[3].entries == ['11_埼玉県/議員リスト_132012_八王子市.json',
+                                     '13_東京都/議員リスト_132012_八王子市.json']
+    assert [c.severity for c in collisions] == ['error'] * 4 + ['warning']
+
+
+def test_same_name_within_one_municipality_is_not_reported(tmp_path):
+    relpath = '13_東京都/議員リスト_132012_八王子市.json'
+    write_json(tmp_path / relpath, [member('山田　太郎', 'やまだ　たろう')] * 2)
+    index = integrity.IntegrityIndex()
+    index.add(corpus.SourceFile(tmp_path, relpath))
+    assert index.collisions() == []
+
+
+def test_stage_reuses_cached_keys_without_decoding_members(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'processed'
+    write_json(data_dir / '13_東京都' / '議員リスト_132012_八王子市.json',
+               [member('山田　太郎', 'やまだ　たろう', 'https://x.com/yamada')])
+    write_json(data_dir / '13_東京都' / '議員リスト_132021_立川市.json',
+               [member('鈴木　一郎', 'すずき　いちろう', 'https://x.com/Yamada')])
+
+    def run():
+        stage = integrity.IntegrityStage(cache_path=tmp_path / 'integrity.bin')
+        loaded = corpus.load_corpus(data_dir, snapshot_path=tmp_path / 'snapshot.bin')
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_pipeline([stage], data_dir, corpus=loaded)
+        return stage
+
+    first = run()
+    assert (first.computed, first.cache_hits) == (2, 0)
+
+    # キャッシュに当たったファイルは議員データを復元しない
+    def fail(self):
+        raise AssertionError('members decoded')
+    monkeypatch.setattr(corpus.Municipality, 'members', property(fail))
+    second = run()
+    assert (second.computed, second.cache_hits) == (0, 2)
+    assert [(c.kind, c.key) for c in second.collisions] == [('x_url', 'x.com/yamada')]
+    assert second.exit_code == 1
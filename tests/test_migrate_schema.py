@@ -0,0 +1,75 @@
+import json
+
+import migrate_schema
+
+from .conftest import write_json
+
+
+def make_v11_corpus(data_dir):
+    hachioji = data_dir / '13_東京都' / '議員リスト_132012_八王子市.json'
+    tachikawa = data_dir / '13_東京都' / '議員リスト_132021_立川市.json'
+    write_json(hachioji, [
+        {'氏名': '山田　太郎', '登録名': '山田　太郎', 'よみ': 'やまだ　たろう', '所属': '無所属',
+         '公式サイトアドレス': 'https://example.com/', 'リンク': None},
+        {'氏名': '鈴木　一郎', '登録名': '鈴木　一郎', 'よみ': 'すずき　いちろう',
+         '所属': '無所属', 'X（旧Twitter）': 'https://twitter.com/suzuki_ichiro/'},
+    ], indent=2, trailing_newline=True)
+    write_json(tachikawa, [
+        {'氏名': '佐藤　花子', '登録名': '佐藤　花子', 'よみ': 'さとう　はなこ',
+         'X（旧Twitter）': None, '所属': '無所属'},
+    ], indent=2)
+    return hachioji, tachikawa
+
+
+def test_migrate_v11_to_v12(tmp_path, capsys):
+    data_dir = tmp_path / 'processed'
+    hachioji, tachikawa = make_v11_corpus(data_dir)
+    before = {p: p.read_bytes() for p in (hachioji, tachikawa)}
+
+    # dry-runでは何も書き換えない
+    assert migrate_schema.main(['--data-dir', str(data_dir), '--dry-run', '--diff']) == 0
+    out = capsys.readouterr().out
+    assert '変更されるファイル: 1 / 2' in out
+    assert '+    "X（旧Twitter）": "https://x.com/suzuki_ichiro",' in out
+    assert all(p.read_bytes() == data for p, data in before.items())
+
+    assert migrate_schema.main(['--data-dir', str(data_dir)]) == 0
+    text = hachioji.read_text(encoding='utf-8')
+    assert text.endswith(']\n')
+    assert json.loads(text) == [
+        {'氏名': '山田　太郎', '登録名': '山田　太郎', 'よみ': 'やまだ　たろう',
+         'X（旧Twitter）': None, '所属': '無所属'},
+        {'氏名': '鈴木　一郎', '登録名': '鈴木　一郎', 'よみ': 'すずき　いちろう',
+         'X（旧Twitter）': 'https://x.com/suzuki_ichiro', '所属': '無所属'},
+    ]
+    # 変換で変わらないファイルはバイト単位でそのまま
+    assert tachikawa.read_bytes() == before[tachikawa]
+
+    # 2回目は変更なし
+    results = migrate_schema.plan_migration(data_dir, '1.1', '1.2')
+    assert [r['text'] for r in results] == [None, None]
+
+
+def test_invalid_result_aborts_all_writes(tmp_path, capsys):
+    data_dir = tmp_path / 'processed'
+    hachioji, tachikawa = make_v11_corpus(data_dir)
+    write_json(tachikawa, [
+        {'氏名': '佐藤　花子', '登録名': '佐藤　花子', 'よみ': 'さとう　はなこ',
+         'X（旧Twitter）': 'https://example.com/sato', '所属': '無所属'},
+    ], indent=2)
+    before = hachioji.read_bytes()
+
+    assert migrate_schema.main(['--data-dir', str(data_dir), '--workers', '2']) == 1
+    out = capsys.readouterr().out
+    assert '何も書き換えていません' in out
+    assert '13_東京都/議員リスト_132021_立川市.json:6:20: /0/X（旧Twitter）:' in out
+    assert hachioji.read_bytes() == before
+
+
+def test_unsupported_versions():
+    for from_version, to_version in [('1.2', '1.1'), ('1.0', '1.2')]:
+        try:
+            migrate_schema.migration_steps(from_version, to_version)
+        except ValueError:
+            continue
+        raise AssertionError(f'{from_version} -> {to_version} should be rejected')
@@ -0,0 +1,38 @@
+import parties
+
+
+def test_normalize_party():
+    cases = {
+        '自民党新政会': '自由民主党',
+        '自由民主・市民クラブ': '自由民主党',
+        '日本共産党入間市議団': '日本共産党',
+        '八王子市議会公明党': '公明党',
+        '青空りっけん': '立憲民主党',
+        # 合同会派は最も左の政党、無会派の注記に政党があればその政党
+        '都民ファーストの会・立憲民主党昭島市議団': '都民ファーストの会',
+        '自由民主党・維新・参政・無所属の会': '自由民主党',
+        '無会派（日本共産党国分寺市議団）': '日本共産党',
+        '会派に属さない議員': '無所属',
+        '諸派': '諸派',
+        '正和会': '地域会派',
+        '未確認': '不明',
+        '': '不明',
+        None: '不明',
+    }
+    assert {affiliation: parties.normalize_party(affiliation) for affiliation in cases} == cases
+    assert parties.is_national_party('公明党') and not parties.is_national_party('地域会派')
+
+
+def test_aho_corasick_matches_naive_search():
+    keywords = {'he': 1, 'she': 2, 'his': 3, 'hers': 4, 's': 5}
+    matcher = parties.AhoCorasick(keywords)
+    text = 'ushershishe'
+    expected = sorted((i, i + len(k), v) for k, v in keywords.items()
+                      for i in range(len(text)) if text.startswith(k, i))
+    assert sorted(matcher.iter_matches(text)) == expected
+
+
+def test_rollup_parties():
+    counts = {'公明党': 3, '公明党昭島市議団': 2, '自民クラブ': 4, '新政会': 1, '不明': 1}
+    assert parties.rollup_parties(counts) == {'公明党': 5, '自由民主党': 4, '地域会派': 1, '不明': 1}
+    assert parties.party_groups(counts)['公明党'] == ['公明党', '公明党昭島市議団']
@@ -0,0 +1,71 @@
+import contextlib
+import io
+import os
+import time
+import tracemalloc
+
+import pytest
+
+from generate_statistics import StatisticsStage
+from pipeline import run_pipeline
+from statistics_store import AggregateStore
+from update_viewer_data import ViewerStage
+from validate_data import SchemaStage
+
+pytestmark = pytest.mark.perf
+
+# 実データ100倍（4100ファイル・約8万人）での予算（秒, MB）。遅いマシンでは PERF_BUDGET_FACTOR で緩める
+BUDGETS = {
+    'validate': (3.0, 64),
+    'stats': (3.0, 16),
+    'viewer': (10.0, 32),
+}
+BUDGET_FACTOR = float(os.environ.get('PERF_BUDGET_FACTOR', '1'))
+
+
+def make_stage(target, work_dir):
+    if target == 'validate':
+        return SchemaStage(cache_path=work_dir / 'validation.bin')
+    store = AggregateStore(work_dir / 'aggregates.bin')
+    if target == 'stats':
+        return StatisticsStage(store=store)
+    viewer_js_dir = work_dir / 'viewer' / 'js'
+    (viewer_js_dir / 'municipalities').mkdir(parents=True, exist_ok=True)
+    return ViewerStage(viewer_js_dir, full_rebuild=True, store=store)
+
+
+def run_stage(target, large_corpus, work_dir, trace=False):
+    """読み込み済みのコーパスで1ステージを実行し (秒, 最大メモリ[MB]) を返す
+
+    キャッシュを使わない状態で計測するため、毎回別の作業ディレクトリを使う。
+    メモリはtracemallocで計測する（計測中は遅くなるので時間とは別に実行する）。
+    """
+    work_dir.mkdir(parents=True)
+    stage = make_stage(target, work_dir)
+    if trace:
+        tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            run_pipeline([stage], large_corpus.data_dir, corpus=large_corpus)
+            seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024) if trace else None
+    finally:
+        if trace:
+            tracemalloc.stop()
+    return stage, seconds, peak
+
+
+@pytest.mark.parametrize('target', list(BUDGETS))
+def test_stage_within_budget(target, large_corpus, tmp_path):
+    max_seconds, max_mb = BUDGETS[target]
+    stage, seconds, _ = run_stage(target, large_corpus, tmp_path / 'time')
+    _, _, peak_mb = run_stage(target, large_corpus, tmp_path / 'memory', trace=True)
+
+    if target == 'validate':
+        # 内容が同じファイル（空の議員リストなど）は1回だけ検証される
+        assert stage.validated == len({m.digest for m in large_corpus})
+    assert seconds <= max_seconds * BUDGET_FACTOR, \
+        f'{target}: {seconds:.2f}s（予算 {max_seconds * BUDGET_FACTOR:.2f}s, {len(large_corpus)}ファイル）'
+    assert peak_mb <= max_mb * BUDGET_FACTOR, \
+        f'{target}: 最大 {peak_mb:.1f}MB（予算 {max_mb * BUDGET_FACTOR:.0f}MB, {len(large_corpus)}ファイル）'
@@ -0,0 +1,95 @@
+import pytest
+
+import pipeline
+
+from .conftest import member, write_json
+
+
+class CountStage(pipeline.Stage):
+    name = 'count'
+
+    def __init__(self):
+        self.counts = []
+
+    def process(self, item, results):
+        self.counts.append(len(item.members))
+        return len(item.members)
+
+
+class DoubleStage(pipeline.Stage):
+    name = 'double'
+    requires = ('count',)
+
+    def __init__(self):
+        self.values = []
+        self.finished = None
+
+    def process(self, item, results):
+        self.values.append((item.code, results['count'] * 2))
+
+    def finish(self):
+        self.finished = sum(v for _, v in self.values)
+
+
+def test_stages_receive_dependency_results_in_corpus_order(tmp_path):
+    data_dir = tmp_path / 'processed'
+    member = {'氏名': 'a', '登録名': 'a', 'よみ': 'a', 'X（旧Twitter）': None, '所属': '無所属'}
+    for i, code in enumerate(('132012', '112089', '132021')):
+        write_json(data_dir / f'{code[:2]}_県' / f'議員リスト_{code}_市.json', [member] * (i + 1))
+
+    count, double = CountStage(), DoubleStage()
+    result = pipeline.run_pipeline([double, count], data_dir)
+    assert double.values == [('112089', 4), ('132012', 2), ('132021', 6)]
+    assert double.finished == 12
+    assert [t.name for t in result.timings] == ['count', 'double']
+    assert all(t.items == 3 for t in result.timings)
+
+
+def test_sort_stages_rejects_unknown_and_cyclic_dependencies():
+    with pytest.raises(ValueError):
+        pipeline.sort_stages([DoubleStage()])
+
+    a, b = CountStage(), DoubleStage()
+    a.requires = ('double',)
+    with pytest.raises(ValueError):
+        pipeline.sort_stages([a, b])
+
+
+class GateStage(pipeline.Stage):
+    name = 'gate'
+    gate = True
+
+    def __init__(self, exit_code):
+        self.exit_code = exit_code
+
+
+class OutputStage(CountStage):
+    name = 'output'
+
+    def __init__(self):
+        super().__init__()
+        self.started = False
+
+    def start(self, context):
+        self.started = True
+
+
+def test_output_stages_are_skipped_when_a_gate_stage_fails(tmp_path):
+    data_dir = tmp_path / 'processed'
+    write_json(data_dir / '13_県' / '議員リスト_132012_市.json', [member()])
+
+    output = OutputStage()
+    result = pipeline.run_pipeline([output, GateStage(1)], data_dir)
+    assert not output.started and output.counts == []
+    assert result.skipped == ['output'] and [t.name for t in result.timings] == ['gate']
+    assert 'output: 検証エラーのため実行せず' in result.format_timings()
+
+    output = OutputStage()
+    result = pipeline.run_pipeline([output, GateStage(0)], data_dir)
+    assert output.started and output.counts == [1]
+    assert [t.name for t in result.timings] == ['gate', 'output']
+
+
+def test_default_stages_validate_across_files_before_writing_outputs():
+    stages = pipeline.default_stages()
+    assert [s.name for s in stages if s.gate] == ['schema', 'integrity']
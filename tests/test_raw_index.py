@@ -0,0 +1,58 @@
+from datetime import date
+
+import check_data_quality
+import raw_index
+
+
+def make_raw(raw_dir):
+    for relpath in ('13_東京都/八王子市/20250101', '13_東京都/八王子市/20250301', '13_東京都/八王子市/20259999',
+                    '13_東京都/八王子市/memo', '13_東京都/132021_立川市/20250201',
+                    '11_埼玉県/所沢市/20241231', '13_東京都/青ヶ島村', '武蔵野市/20250115'):
+        (raw_dir / relpath).mkdir(parents=True)
+
+
+PROCESSED = [
+    ('13_東京都/議員リスト_132012_八王子市.json', '132012', '八王子市', '13_東京都'),
+    ('13_東京都/議員リスト_132021_立川市改.json', '132021', '立川市改', '13_東京都'),
+    ('13_東京都/議員リスト_132039_武蔵野市.json', '132039', '武蔵野市', '13_東京都'),
+    ('13_東京都/議員リスト_132047_三鷹市.json', '132047', '三鷹市', '13_東京都'),
+]
+
+
+def test_reconcile_and_freshness(tmp_path):
+    raw_dir = tmp_path / 'raw'
+    make_raw(raw_dir)
+    index = raw_index.RawIndex(raw_dir, tmp_path / 'raw_index.bin').scan()
+    assert index.scanned == 5
+    hachioji = index.snapshots['13_東京都/八王子市']
+    assert (hachioji.latest, hachioji.earliest, hachioji.count) == ('20250301', '20250101', 3)
+
+    # 自治体コード付きのディレクトリはコードで、都道府県のない古い配置は自治体名で突き合わせる
+    matched, unmatched = raw_index.reconcile(index, PROCESSED)
+    assert {relpath: s.key for relpath, s in matched.items()} == {
+        '13_東京都/議員リスト_132012_八王子市.json': '13_東京都/八王子市',
+        '13_東京都/議員リスト_132021_立川市改.json': '13_東京都/立川市',
+        '13_東京都/議員リスト_132039_武蔵野市.json': '武蔵野市',
+    }
+    assert [s.key for s in unmatched] == ['11_埼玉県/所沢市', '13_東京都/青ヶ島村']
+    assert check_data_quality.check_missing_data(['議員リスト_134023_青ヶ島村.json'], unmatched) == [
+        '空のデータ: 議員リスト_134023_青ヶ島村.json', '処理済みデータなし: 11_埼玉県/所沢市',
+        '処理済みデータなし: 13_東京都/青ヶ島村',
+    ]
+
+    freshness = check_data_quality.check_data_freshness(PROCESSED, matched, today=date(2025, 3, 31))
+    assert [(row['name'], row['age']) for row in freshness] == [
+        ('武蔵野市', 75), ('立川市改', 58), ('八王子市', 30), ('三鷹市', None),
+    ]
+
+
+def test_rescan_reuses_unchanged_municipalities(tmp_path):
+    raw_dir = tmp_path / 'raw'
+    make_raw(raw_dir)
+    cache_path = tmp_path / 'raw_index.bin'
+    raw_index.RawIndex(raw_dir, cache_path).scan()
+
+    (raw_dir / '13_東京都' / '八王子市' / '20250401').mkdir()
+    index = raw_index.RawIndex(raw_dir, cache_path).scan()
+    assert (index.scanned, index.reused) == (1, 4)
+    assert index.snapshots['13_東京都/八王子市'].latest == '20250401'
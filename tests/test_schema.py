@@ -1,26 +1,34 @@
-import json
-import glob
-import os
-from . import jsonschema
+import pytest
+
+from corpus import DATA_DIR, iter_source_files
+from stream_validator import load_stream_validator
+from validate_data import select_schema_path, validate_loaded
+
+# validate_data.py と同じスキーマ（v1.2を優先）で、配列全体を検証する
+SCHEMA_PATH = select_schema_path()
 
-SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'schema', 'municipal_councillor_v1.1.json')
-DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'processed')
+# 都道府県ディレクトリ内のファイルも含める（内容はセッションで1回だけ読み込んだコーパスから取る）
+relpaths = [p.relative_to(DATA_DIR).as_posix() for p in iter_source_files(DATA_DIR)]
 
-with open(SCHEMA_PATH, encoding='utf-8') as f:
-    SCHEMA = json.load(f)
 
-json_files = glob.glob(os.path.join(DATA_DIR, '*.json'))
+@pytest.fixture(scope='module')
+def municipalities(corpus):
+    return {m.relpath: m for m in corpus}
+
+
+@pytest.fixture(scope='module')
+def validator():
+    return load_stream_validator(SCHEMA_PATH)
 
 
 def test_files_exist():
-    assert json_files, 'No JSON files found in processed data directory'
+    assert relpaths, 'No JSON files found in processed data directory'
 
 
-import pytest
-@pytest.mark.parametrize('path', json_files)
-def test_validate_file(path):
-    with open(path, encoding='utf-8') as f:
-        data = json.load(f)
-    assert isinstance(data, list)
-    for item in data:
-        jsonschema.validate(item, SCHEMA)
+@pytest.mark.parametrize('relpath', relpaths)
+def test_validate_file(relpath, municipalities, validator):
+    muni = municipalities[relpath]
+    assert muni.error is None, muni.error
+    assert isinstance(muni.document, list)
+    _, errors, _ = validate_loaded(muni.path, muni.document, muni.error, validator)
+    assert errors == []
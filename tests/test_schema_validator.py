@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+import schema_validator
+
+SCHEMA_DIR = os.path.join(os.path.dirname(__file__), '..', 'schema')
+V12 = schema_validator.load_validator(os.path.join(SCHEMA_DIR, 'municipal_councillor_v1.2.json'))
+V11 = schema_validator.load_validator(os.path.join(SCHEMA_DIR, 'municipal_councillor_v1.1.json'))
+
+MEMBER = {'氏名': '山田　太郎', '登録名': '山田　太郎', 'よみ': 'やまだ　たろう',
+          'X（旧Twitter）': 'https://x.com/yamada', '所属': '無所属'}
+
+
+def errors_of(validator, instance):
+    return [str(e) for e in validator.iter_errors(instance)]
+
+
+def test_v12_accepts_valid_documents():
+    assert V12.is_valid([MEMBER, dict(MEMBER, **{'X（旧Twitter）': None})])
+    assert V12.is_valid([])
+    assert errors_of(V12, [MEMBER]) == []
+
+
+def test_v12_reports_every_error_with_its_location():
+    missing = {k: v for k, v in MEMBER.items() if k != '所属'}
+    extra = dict(MEMBER, 備考='x')
+    twitter = dict(MEMBER, **{'X（旧Twitter）': 'https://twitter.com/yamada'})
+    wrong_type = dict(MEMBER, よみ=1)
+    errors = errors_of(V12, [MEMBER, missing, extra, twitter, wrong_type, 'text'])
+    assert errors == [
+        '[1]: Missing required property: 所属',
+        '[2]: Additional property not allowed: 備考',
+        "[3].X（旧Twitter）: 'https://twitter.com/yamada' does not match '^https://x\\\\.com/[a-zA-Z0-9_]+$|^null$'",
+        '[4].よみ: 1 is not of type string',
+        "[5]: 'text' is not of type object",
+    ]
+    assert errors_of(V12, {'氏名': 'x'}) == ["{'氏名': 'x'} is not of type array"]
+
+
+def test_fast_path_agrees_with_error_collection():
+    variants = [MEMBER, {}, [], None, 'x', dict(MEMBER, 氏名=None),
+                dict(MEMBER, **{'X（旧Twitter）': 'null'}), dict(MEMBER, **{'X（旧Twitter）': 'x.com/a'})]
+    for variant in variants:
+        for document in ([variant], variant):
+            assert V12.is_valid(document) == (not V12.iter_errors(document))
+            assert V11.is_valid(document) == (not V11.iter_errors(document))
+
+
+def test_pattern_end_anchor_does_not_match_before_trailing_newline():
+    # ECMA-262の $ は文字列の末尾だけに一致する（Pythonの $ と違い、末尾の改行の直前には一致しない）
+    newline = dict(MEMBER, **{'X（旧Twitter）': 'https://x.com/yamada\n'})
+    assert not V12.is_valid([newline])
+    assert errors_of(V12, [newline]) == [
+        "[0].X（旧Twitter）: 'https://x.com/yamada\\n' does not match '^https://x\\\\.com/[a-zA-Z0-9_]+$|^null$'"
+    ]
+    assert schema_validator.compile_pattern(r'^a\$[$]$').search('a$$')
+    assert not schema_validator.compile_pattern('^null$').search('null\n')
+
+
+def test_v11_object_schema():
+    assert V11.is_valid(dict(MEMBER, リンク=None))
+    assert errors_of(V11, dict(MEMBER, リンク='not a uri')) == ["リンク: 'not a uri' is not a valid uri"]
+
+
+def test_unsupported_keywords_are_rejected():
+    with pytest.raises(schema_validator.SchemaError):
+        schema_validator.Validator({'type': 'object', 'oneOf': [{}]})
+    with pytest.raises(schema_validator.SchemaError):
+        schema_validator.Validator({'type': 'string', 'format': 'email'})
+
+
+def test_enum_length_and_additional_schema():
+    validator = schema_validator.Validator({
+        'type': 'array', 'minItems': 1, 'maxItems': 2,
+        'items': {'type': 'object', 'additionalProperties': {'enum': ['a', 'b']},
+                  'properties': {'n': {'type': 'integer'}, 's': {'type': 'string', 'maxLength': 2}}},
+    })
+    assert validator.is_valid([{'n': 1, 'x': 'a'}])
+    assert errors_of(validator, []) == ['Array has invalid length: 0']
+    assert errors_of(validator, [{'n': True, 's': 'abc', 'x': 'c'}]) == [
+        "[0].x: 'c' is not one of ['a', 'b']",
+        '[0].n: True is not of type integer',
+        "[0].s: 'abc' has invalid length",
+    ]
@@ -0,0 +1,69 @@
+import contextlib
+import io
+
+import check_data_quality
+import corpus
+import scorecard
+from pipeline import run_pipeline
+
+from .conftest import member, write_json
+
+
+def run(data_dir, tmp_path):
+    stage = check_data_quality.QualityStage(scorecard_path=tmp_path / 'scorecard.json')
+    loaded = corpus.load_corpus(data_dir, snapshot_path=tmp_path / 'snapshot.bin')
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        run_pipeline([stage], data_dir, corpus=loaded)
+    return stage, output.getvalue()
+
+
+def test_scorecard_ranks_actions_and_reuses_unchanged_files(tmp_path):
+    data_dir = tmp_path / 'processed'
+    hachioji = data_dir / '13_東京都' / '議員リスト_132012_八王子市.json'
+    write_json(hachioji, [member('山田　太郎', 'やまだ　たろう', x='https://x.com/yamada'),
+                          member('鈴木　花子', 'スズキ　ハナコ', party='')])
+    write_json(data_dir / '13_東京都' / '議員リスト_132021_立川市.json',
+               [member('佐藤　一郎', 'さとう　いちろう', x='https://x.com/sato')])
+    write_json(data_dir / '13_東京都' / '議員リスト_134023_青ヶ島村.json', [])
+
+    stage, output = run(data_dir, tmp_path)
+    card = scorecard.load_scorecard(tmp_path / 'scorecard.json')
+    rows = {row['name']: row for row in card['municipalities']}
+    assert (rows['八王子市']['with_x'], rows['八王子市']['readings'], rows['八王子市']['missing_affiliation']) == (1, 1, 1)
+    assert rows['八王子市']['reading_defects'] == {'yomi_katakana': 1}
+    assert rows['八王子市']['scores']['x_coverage'] == 0.5 and rows['八王子市']['snapshot_age'] is None
+    assert rows['青ヶ島村']['score'] == 0.0
+    assert rows['八王子市']['score'] < rows['立川市']['score']
+
+    # データのない自治体 → rawデータのない自治体（鮮度）→ X登録率の低い自治体 の順に並ぶ
+    actions = [(action['kind'], action['relpath'].split('_')[-1]) for action in card['actions']]
+    assert actions[:4] == [('no_data', '青ヶ島村.json'), ('freshness', '八王子市.json'),
+                           ('freshness', '立川市.json'), ('x_coverage', '八王子市.json')]
+    assert '1. 青ヶ島村の議員データを収集' in output
+    assert stage.scorecard.computed == 3
+
+    # 内容が変わらなければ数え直さず、ファイルも書き換えない
+    mtime = (tmp_path / 'scorecard.json').stat().st_mtime_ns
+    stage, _ = run(data_dir, tmp_path)
+    assert (stage.scorecard.reused, stage.scorecard.computed) == (3, 0)
+    assert (tmp_path / 'scorecard.json').stat().st_mtime_ns == mtime
+
+    write_json(hachioji, [member('山田　太郎', 'やまだ　たろう', x='https://x.com/yamada')])
+    stage, _ = run(data_dir, tmp_path)
+    assert (stage.scorecard.reused, stage.scorecard.computed) == (2, 1)
+    rows = {row['name']: row for row in scorecard.load_scorecard(tmp_path / 'scorecard.json')['municipalities']}
+    assert rows['八王子市']['scores']['x_coverage'] == 1.0 and rows['八王子市']['readings'] == 0
+
+
+def test_check_x_accounts_only_counts(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'processed'
+    write_json(data_dir / '13_東京都' / '議員リスト_132012_八王子市.json',
+               [member(x='https://x.com/a'), member(x='null'), member()])
+
+    # 統計だけを返し、スコアカードやrawインデックスは書き出さない
+    def unexpected(*args, **kwargs):
+        raise AssertionError('品質レポートのステージを実行しています')
+    monkeypatch.setattr(check_data_quality, 'run_pipeline', unexpected)
+    monkeypatch.setattr(check_data_quality, 'load_raw_index', unexpected)
+    stats = check_data_quality.check_x_accounts(data_dir=data_dir)
+    assert dict(stats) == {'八王子市': {'total': 3, 'with_x': 1}}
@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+
+import corpus
+import generate_statistics
+import statistics_engine
+from councillor import Councillor
+from pipeline import run_pipeline
+
+from .conftest import member, write_json
+
+
+def make_corpus(tmp_path):
+    data_dir = tmp_path / 'processed'
+    tokyo, hiroshima = data_dir / '13_東京都', data_dir / '34_広島県'
+    write_json(tokyo / '議員リスト_132012_八王子市.json',
+               [member(x='https://x.com/a', party='公明党'), member(party=''), member(x='null')])
+    write_json(tokyo / '議員リスト_132063_府中市.json', [member(x='https://x.com/b', party='公明党'), member()])
+    write_json(tokyo / '議員リスト_132071_昭島市.json', [member(), member(party='公明党')])
+    write_json(tokyo / '議員リスト_132080_調布市.json', [])
+    # スキーマから外れた議員（余分なフィールド）を含むファイルは列を使わずに数える
+    write_json(hiroshima / '議員リスト_342076_府中市.json',
+               [dict(member(x='https://x.com/c', party='日本共産党'), メモ='x'), member(x='https://x.com/d')])
+    return corpus.load_corpus(data_dir, snapshot_path=tmp_path / 'snapshot.bin')
+
+
+def test_aggregates(tmp_path):
+    loaded = make_corpus(tmp_path)
+    stage = generate_statistics.StatisticsStage()
+    run_pipeline([stage], loaded.data_dir, corpus=loaded)
+    result = stage.result
+
+    # 同名の自治体（東京都と広島県の府中市）は自治体名の集計では合算される
+    assert [(c.name, c.with_x, c.total) for c in result.municipalities] == [
+        ('八王子市', 1, 3), ('府中市', 3, 4), ('昭島市', 0, 2),
+    ]
+    assert [(c.code, c.with_x, c.total) for c in result.files] == [
+        ('132012', 1, 3), ('132063', 1, 2), ('132071', 0, 2), ('342076', 2, 2),
+    ]
+    assert [(c.prefecture, c.with_x, c.total) for c in result.prefectures] == [
+        ('13_東京都', 2, 7), ('34_広島県', 2, 2),
+    ]
+    assert list(result.parties.items()) == [('公明党', 3), ('不明', 1), ('無所属', 4), ('日本共産党', 1)]
+    assert result.top_parties(2) == [('無所属', 4), ('公明党', 3)]
+    assert result.top_national_parties() == [('無所属', 4), ('公明党', 3), ('不明', 1), ('日本共産党', 1)]
+    assert [result.municipalities[i].name for i in result.top] == ['府中市', '八王子市', '昭島市']
+    assert [result.municipalities[i].name for i in result.bottom] == ['府中市', '八王子市']
+    assert [result.municipalities[i].name for i in result.zero] == ['昭島市']
+    assert result.percentiles[50] == result.municipalities[0].rate
+
+
+def test_columns_match_councillors(tmp_path):
+    loaded = make_corpus(tmp_path)
+    fast, slow = statistics_engine.CouncillorTable(), statistics_engine.CouncillorTable()
+    for muni in loaded:
+        fast.add(muni)
+        slow.add_municipality(muni.code, muni.name, muni.prefecture, muni.councillors)
+    assert fast.codes == slow.codes
+    assert list(fast.municipality) == list(slow.municipality)
+    assert [fast.parties[i] for i in fast.party] == [slow.parties[i] for i in slow.party]
+    assert list(fast.has_x) == list(slow.has_x)
+
+
+def test_ranking_matches_full_sort():
+    rates = [50.0, 0, 25.0, 50.0, 10.0, 0, 25.0, 75.0, 10.0, 50.0, 5.0, 5.0, 20.0]
+    files = [statistics_engine.MunicipalityCounts(str(i), f'市{i}', '13_東京都', 20, int(r / 5))
+             for i, r in enumerate(rates)]
+    result = statistics_engine.StatisticsResult(files, ranking_size=4)
+    ranked = sorted(range(len(rates)), key=lambda i: files[i].rate, reverse=True)
+    assert result.top == ranked[:4]
+    assert result.bottom == [i for i in ranked if files[i].rate > 0][-4:]
+    assert result.zero == [1, 5]
+
+
+def test_json_and_csv(tmp_path):
+    loaded = make_corpus(tmp_path)
+    stage = generate_statistics.StatisticsStage()
+    run_pipeline([stage], loaded.data_dir, corpus=loaded)
+
+    payload = json.loads(generate_statistics.render_statistics_json(stage.result))
+    assert payload['total'] == {'municipalities': 3, 'members': 9, 'with_x': 4, 'rate': 44.44}
+    assert payload['municipalities'][1] == {
+        'code': '132063', 'name': '府中市', 'prefecture': '13_東京都', 'parties': {'公明党': 1, '無所属': 1},
+        'total': 2, 'with_x': 1, 'rate': 50.0,
+    }
+    assert payload['ranking']['zero'] == ['昭島市']
+
+    rows = list(csv.reader(io.StringIO(generate_statistics.render_statistics_csv(stage.result))))
+    assert rows[0] == list(generate_statistics.CSV_COLUMNS)
+    assert rows[-1] == ['342076', '府中市', '34_広島県', '2', '2', '100.0']
+
+
+def test_councillor_party_fallback():
+    table = statistics_engine.CouncillorTable()
+    table.add_municipality('132012', '八王子市', '13_東京都', [Councillor('a', 'a', 'a', None, '')])
+    assert table.parties == ['不明']
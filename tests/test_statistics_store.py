@@ -0,0 +1,113 @@
+import corpus
+import generate_statistics
+import search_x_accounts_v2
+import statistics_engine
+import statistics_store
+from pipeline import run_pipeline
+
+from .conftest import member, write_json
+
+
+def make_data(tmp_path):
+    data_dir = tmp_path / 'data' / 'processed'
+    write_json(data_dir / '13_東京都' / '議員リスト_132012_八王子市.json',
+               [member(x='https://x.com/a', party='公明党'), member(party=''), member()])
+    write_json(data_dir / '13_東京都' / '議員リスト_132021_立川市.json', [member(x='https://x.com/b')])
+    write_json(data_dir / '11_埼玉県' / '議員リスト_112089_所沢市.json',
+               [dict(member(party='日本共産党'), メモ='x'), member(x='https://x.com/c')])
+    return data_dir
+
+
+def run_stats(data_dir, tmp_path):
+    store = statistics_store.AggregateStore(tmp_path / 'aggregates.bin')
+    stage = generate_statistics.StatisticsStage(store=store)
+    loaded = corpus.load_corpus(data_dir, snapshot_path=tmp_path / 'snapshot.bin')
+    run_pipeline([stage], data_dir, corpus=loaded)
+    return stage
+
+
+def summary(result):
+    return ([(c.code, c.total, c.with_x, c.parties) for c in result.files],
+            [(c.prefecture, c.total, c.with_x) for c in result.prefectures], result.parties)
+
+
+def test_only_changed_municipalities_are_recounted(tmp_path):
+    data_dir = make_data(tmp_path)
+    first = run_stats(data_dir, tmp_path)
+    assert (first.store.hits, first.store.computed) == (0, 3)
+
+    second = run_stats(data_dir, tmp_path)
+    assert (second.store.hits, second.store.computed) == (3, 0)
+    assert summary(second.result) == summary(first.result)
+    assert second.markdown.split('\n', 2)[2] == first.markdown.split('\n', 2)[2]
+
+    write_json(data_dir / '13_東京都' / '議員リスト_132021_立川市.json', [member(x='https://x.com/b'), member()])
+    (data_dir / '11_埼玉県' / '議員リスト_112089_所沢市.json').unlink()
+    third = run_stats(data_dir, tmp_path)
+    assert (third.store.hits, third.store.computed) == (1, 1)
+    assert sorted(third.store.entries) == ['13_東京都/議員リスト_132012_八王子市.json',
+                                           '13_東京都/議員リスト_132021_立川市.json']
+    assert [(c.prefecture, c.total, c.with_x) for c in third.result.prefectures] == [('13_東京都', 5, 2)]
+
+
+def test_single_file_counts_match_table(tmp_path):
+    data_dir = make_data(tmp_path)
+    loaded = corpus.load_corpus(data_dir, snapshot_path=tmp_path / 'snapshot.bin')
+    table = statistics_engine.CouncillorTable()
+    for muni in loaded:
+        table.add(muni)
+    expected = [(c.total, c.with_x, list(c.parties.items()))
+                for c in statistics_engine.count_municipalities(table)]
+    for items in (list(loaded), [corpus.SourceFile(data_dir, m.relpath) for m in loaded]):
+        counts = [statistics_engine.count_municipality(item) for item in items]
+        assert [(c.total, c.with_x, list(c.parties.items())) for c in counts] == expected
+
+
+def test_directory_counts_reuse_unchanged_files(tmp_path, monkeypatch):
+    data_dir = make_data(tmp_path)
+    store = statistics_store.AggregateStore(tmp_path / 'aggregates.bin')
+    first = statistics_store.directory_counts(data_dir, '13_東京都', store=store)
+    assert list(first) == ['13_東京都/議員リスト_132012_八王子市.json', '13_東京都/議員リスト_132021_立川市.json']
+
+    # サイズ・更新時刻が同じファイルは読み込まない
+    def fail(*args):
+        raise AssertionError('unchanged file was read')
+    monkeypatch.setattr(statistics_store, 'SourceFile', fail)
+    reloaded = statistics_store.AggregateStore(tmp_path / 'aggregates.bin')
+    second = statistics_store.directory_counts(data_dir, '13_東京都', store=reloaded)
+    assert [(c.total, c.with_x) for c in second.values()] == [(3, 1), (1, 1)]
+    assert reloaded.hits == 2
+
+
+def test_prefecture_report_reads_store(tmp_path, monkeypatch):
+    data_dir = make_data(tmp_path)
+    prefecture_dir = data_dir / '13_東京都'
+    monkeypatch.setattr(statistics_store, 'cache_path_for',
+                        lambda data_dir, stem, suffix: tmp_path / f'{stem}{suffix}')
+    results = [search_x_accounts_v2.process_municipality(p) for p in sorted(prefecture_dir.glob('*.json'))]
+    search_x_accounts_v2.generate_prefecture_report(prefecture_dir, results)
+
+    report = next((tmp_path / 'data' / 'reports').glob('13_東京都_summary_*.md')).read_text(encoding='utf-8')
+    assert '- 総議員数: 4' in report
+    assert '- Xアカウント登録済み: 2 (50.0%)' in report
+    assert report.splitlines()[-2:] == ['| 立川市 | 1 | 1 | 100.0% | 0 |', '| 八王子市 | 3 | 1 | 33.3% | 2 |']
+
+
+def test_prefecture_report_counts_null_alike_and_lists_files_missing_from_store(tmp_path, monkeypatch):
+    data_dir = make_data(tmp_path)
+    prefecture_dir = data_dir / '13_東京都'
+    fuchu = prefecture_dir / '議員リスト_132063_府中市.json'
+    write_json(fuchu, [member(x='null'), member(x='https://x.com/d')])
+    monkeypatch.setattr(statistics_store, 'cache_path_for',
+                        lambda data_dir, stem, suffix: tmp_path / f'{stem}{suffix}')
+    results = [search_x_accounts_v2.process_municipality(p) for p in sorted(prefecture_dir.glob('*.json'))]
+    # 文字列の'null'は統計ストアと同じく未登録として数える
+    assert {r['name']: r['with_account'] for r in results}['府中市'] == 1
+
+    # 処理後に削除されたファイルは統計ストアにないので、数えた値を使ってレポートに明記する
+    fuchu.unlink()
+    search_x_accounts_v2.generate_prefecture_report(prefecture_dir, results)
+    report = next((tmp_path / 'data' / 'reports').glob('13_東京都_summary_*.md')).read_text(encoding='utf-8')
+    assert '- 総議員数: 6' in report and '- Xアカウント登録済み: 3 (50.0%)' in report
+    assert '- 統計ストアに集計値がない自治体（個別に集計）: 府中市' in report
+    assert '| 府中市 | 2 | 1 | 50.0% | 1 |' in report
@@ -0,0 +1,83 @@
+import io
+import json
+import os
+
+import stream_validator
+
+SCHEMA_DIR = os.path.join(os.path.dirname(__file__), '..', 'schema')
+V12 = stream_validator.load_stream_validator(os.path.join(SCHEMA_DIR, 'municipal_councillor_v1.2.json'))
+V11 = stream_validator.load_stream_validator(os.path.join(SCHEMA_DIR, 'municipal_councillor_v1.1.json'))
+
+MEMBER = {'氏名': '山田　太郎', '登録名': '山田　太郎', 'よみ': 'やまだ　たろう',
+          'X（旧Twitter）': 'https://x.com/yamada', '所属': '無所属'}
+
+
+def validate(validator, text, max_errors=100):
+    return validator.validate_stream(io.BytesIO(text.encode('utf-8')), max_errors)
+
+
+def errors_of(validator, text, max_errors=100):
+    return [str(e) for e in validate(validator, text, max_errors).errors]
+
+
+def sample_text():
+    missing = {k: v for k, v in MEMBER.items() if k != '所属'}
+    twitter = dict(MEMBER, **{'X（旧Twitter）': 'https://twitter.com/a'})
+    return json.dumps([MEMBER, missing, twitter, 'text', dict(MEMBER, よみ=1)], ensure_ascii=False, indent=2)
+
+
+def test_every_error_has_pointer_and_location():
+    assert errors_of(V12, sample_text()) == [
+        '9:3: /1: Missing required property: 所属',
+        "19:20: /2/X（旧Twitter）: 'https://twitter.com/a' does not match '^https://x\\\\.com/[a-zA-Z0-9_]+$|^null$'",
+        "22:3: /3: 'text' is not of type object",
+        '26:11: /4/よみ: 1 is not of type string',
+    ]
+    result = validate(V12, sample_text())
+    assert (result.is_array, result.count, result.truncated) == (True, 5, False)
+
+
+def test_locations_do_not_depend_on_chunk_size(monkeypatch):
+    members = [dict(MEMBER, よみ=i) if i % 37 == 0 else MEMBER for i in range(400)]
+    text = json.dumps(members, ensure_ascii=False, indent=2)
+    expected = errors_of(V12, text)
+    monkeypatch.setattr(stream_validator, 'CHUNK_SIZE', 50)
+    assert errors_of(V12, text) == expected
+    location, pointer, message = expected[-1].split(': ', 2)
+    line, column = map(int, location.split(':'))
+    assert (pointer, message) == ('/370/よみ', '370 is not of type string')
+    assert text.splitlines()[line - 1][column - 1:] == '370,'
+
+
+def test_syntax_errors_are_reported_and_validation_continues():
+    broken = sample_text().replace('"よみ": "やまだ　たろう",\n    "X', '"よみ": "やまだ　たろう"\n    "X', 1)
+    errors = errors_of(V12, broken)
+    assert errors[0] == "6:5: Invalid JSON - Expecting ',' delimiter"
+    assert errors[1:] == errors_of(V12, sample_text())
+
+    missing_commas = json.dumps([MEMBER] * 3).replace('}, {', '} {')
+    second = missing_commas.index('{', 2)
+    third = missing_commas.index('{', second + 1)
+    assert errors_of(V12, missing_commas) == [
+        f"1:{second + 1}: Invalid JSON - Expecting ',' delimiter",
+        f"1:{third + 1}: Invalid JSON - Expecting ',' delimiter",
+    ]
+    assert errors_of(V12, sample_text()[:-5])[-1] == "29:1: Invalid JSON - Expecting ',' delimiter"
+    assert errors_of(V12, '') == ['1:1: Invalid JSON - Expecting value']
+    assert errors_of(V12, '[]  x') == ['1:5: Invalid JSON - Extra data']
+
+
+def test_error_budget_stops_early_but_hashes_whole_file():
+    text = json.dumps([{'x': 1}] * 1000)
+    result = validate(V12, text, max_errors=3)
+    assert len(result.errors) == 3 and result.truncated
+    assert result.digest == __import__('hashlib').sha1(text.encode('utf-8')).hexdigest()
+
+
+def test_non_array_and_v11_documents():
+    result = validate(V12, '{"氏名": "x"}')
+    assert (result.is_array, result.errors) == (False, [])
+    assert V11.is_valid([dict(MEMBER, リンク=None)])
+    text = json.dumps([dict(MEMBER, リンク='not a uri')], ensure_ascii=False)
+    column = text.index('"not a uri"') + 1
+    assert errors_of(V11, text) == [f"1:{column}: /0/リンク: 'not a uri' is not a valid uri"]
@@ -0,0 +1,38 @@
+import corpus
+import generate_synthetic_corpus as synthetic
+
+
+def read_tree(root):
+    return {p.relative_to(root).as_posix(): p.read_bytes() for p in sorted(root.rglob('*.json'))}
+
+
+def test_generator_is_deterministic_and_covers_all_prefectures(tmp_path):
+    first, info = synthetic.ensure_synthetic_corpus(0.05, tmp_path / 'a')
+    second, _ = synthetic.ensure_synthetic_corpus(0.05, tmp_path / 'b')
+    assert read_tree(first) == read_tree(second)
+
+    prefectures = sorted(p.name for p in first.iterdir())
+    assert len(prefectures) == 47
+    assert prefectures[0] == '01_北海道' and prefectures[-1] == '47_沖縄県'
+
+    loaded = corpus.load_corpus(first, snapshot_path=tmp_path / 'snapshot.bin')
+    assert len(loaded) == info['municipalities']
+    assert loaded.member_count == info['councillors']
+    assert all(not m.error for m in loaded)
+    for muni in loaded:
+        assert muni.code[:2] == muni.prefecture[:2]
+        assert synthetic.check_digit(muni.code[:-1]) == muni.code[-1]
+    urls = [c.x_url for c in loaded.iter_councillors() if c.has_x]
+    assert urls and len(urls) == len(set(urls))
+
+
+def test_check_digit_matches_real_codes():
+    for code in ('132012', '112089', '134023', '133647'):
+        assert synthetic.check_digit(code[:5]) == code[5]
+
+
+def test_romanize():
+    assert synthetic.romanize('はせがわ') == 'hasegawa'
+    assert synthetic.romanize('じゅんこ') == 'junko'
+    assert synthetic.romanize('はっとり') == 'hattori'
+    assert synthetic.romanize('きょうこ') == 'kyouko'
@@ -0,0 +1,73 @@
+import contextlib
+import io
+import os
+
+import validate_data
+from pipeline import run_pipeline
+
+from .conftest import write_json
+
+SCHEMA_V12 = os.path.join(os.path.dirname(__file__), '..', 'schema', 'municipal_councillor_v1.2.json')
+
+VALID = {'氏名': '山田　太郎', '登録名': '山田　太郎', 'よみ': 'やまだ　たろう',
+         'X（旧Twitter）': 'https://x.com/yamada', '所属': '無所属'}
+INVALID = dict(VALID, **{'X（旧Twitter）': 'https://twitter.com/yamada'})
+
+
+def run_stage(data_dir, cache_path, mode='serial'):
+    stage = validate_data.SchemaStage(SCHEMA_V12, cache_path=cache_path, mode=mode)
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_pipeline([stage], data_dir, rebuild=True)
+    return stage
+
+
+def test_verdict_cache_revalidates_only_changed_files(tmp_path):
+    data_dir = tmp_path / 'processed'
+    cache_path = tmp_path / 'validation.bin'
+    write_json(data_dir / '13_東京都' / '議員リスト_132012_八王子市.json', [VALID, INVALID])
+    write_json(data_dir / '13_東京都' / '議員リスト_132021_立川市.json', [VALID])
+    write_json(data_dir / '11_埼玉県' / '議員リスト_112089_所沢市.json', [])
+    (data_dir / '11_埼玉県' / '議員リスト_112259_入間市.json').write_text('{', encoding='utf-8')
+
+    first = run_stage(data_dir, cache_path)
+    assert (first.cache_hits, first.validated) == (0, 4)
+    assert len(first.errors) == 2 and len(first.warnings) == 1
+
+    second = run_stage(data_dir, cache_path)
+    assert (second.cache_hits, second.validated) == (4, 0)
+    assert (second.errors, second.warnings) == (first.errors, first.warnings)
+
+    write_json(data_dir / '13_東京都' / '議員リスト_132021_立川市.json', [INVALID, VALID])
+    third = run_stage(data_dir, cache_path)
+    assert (third.cache_hits, third.validated) == (3, 1)
+
+    # キャッシュなしで直列に検証した場合と同じ順序・内容になる
+    serial = run_stage(data_dir, tmp_path / 'empty.bin')
+    assert (third.errors, third.warnings) == (serial.errors, serial.warnings)
+    assert third.errors[2].endswith("立川市.json:1:66: /0/X（旧Twitter）: 'https://twitter.com/yamada'"
+                                    " does not match '^https://x\\\\.com/[a-zA-Z0-9_]+$|^null$'")
+
+
+def test_process_pool_matches_serial(tmp_path):
+    data_dir = tmp_path / 'processed'
+    for i in range(8):
+        members = [VALID] * i + [INVALID]
+        write_json(data_dir / '13_東京都' / f'議員リスト_1320{i}2_市{i}.json', members)
+
+    serial = run_stage(data_dir, tmp_path / 'serial.bin')
+    pooled = run_stage(data_dir, tmp_path / 'process.bin', mode='process')
+    assert pooled.validated == 8
+    assert (pooled.errors, pooled.warnings) == (serial.errors, serial.warnings)
+
+
+def test_max_errors_is_part_of_the_cache_key(tmp_path):
+    data_dir = tmp_path / 'processed'
+    cache_path = tmp_path / 'validation.bin'
+    write_json(data_dir / '13_東京都' / '議員リスト_132012_八王子市.json', [INVALID] * 5)
+
+    stage = validate_data.SchemaStage(SCHEMA_V12, cache_path=cache_path, mode='serial', max_errors=2)
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_pipeline([stage], data_dir)
+    assert len(stage.errors) == 2
+    assert stage.warnings[0].endswith('Stopped after 2 errors (remaining members were not checked)')
+    assert len(run_stage(data_dir, cache_path).errors) == 5
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import verify_x_urls
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """X の代わりのサーバー（keep-alive対応、flaky は最初の1回だけ503を返す）"""
+
+    protocol_version = 'HTTP/1.1'
+    hits = Counter()
+
+    def do_HEAD(self):
+        handle = self.path.strip('/').split('/')[0]
+        StandInHandler.hits[handle] += 1
+        if handle in ('alive', 'flaky') and not (handle == 'flaky' and self.hits[handle] == 1):
+            self.respond(200)
+        elif handle == 'oldname':
+            self.respond(301, Location='/newname')
+        elif handle == 'Case':
+            self.respond(302, Location='/case')
+        elif handle == 'case':
+            self.respond(200)
+        elif handle == 'locked':
+            self.respond(302, Location='/i/flow/login')
+        elif handle == 'flaky':
+            self.respond(503, **{'Retry-After': '0'})
+        else:
+            self.respond(404)
+
+    def respond(self, status, **headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_verify_against_stand_in_server(tmp_path):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        endpoint = f'http://127.0.0.1:{server.server_address[1]}/{{handle}}'
+        urls = ['https://x.com/alive', 'https://twitter.com/Alive', 'https://x.com/gone',
+                'https://x.com/oldname', 'https://x.com/flaky', 'https://x.com/Case',
+                'https://x.com/locked', 'https://example.com/alive']
+        cache = verify_x_urls.ResultCache(tmp_path / 'x_liveness.bin', endpoint)
+        checker = verify_x_urls.LivenessChecker(endpoint, cache, max_connections=2, rate=0, backoff=0.01)
+        results = asyncio.run(checker.check_all(urls))
+        cache.save()
+
+        assert {url: r.status for url, r in results.items()} == {
+            'https://x.com/alive': 'alive', 'https://twitter.com/Alive': 'alive', 'https://x.com/gone': 'dead',
+            'https://x.com/oldname': 'renamed', 'https://x.com/flaky': 'alive', 'https://x.com/Case': 'alive',
+            'https://x.com/locked': 'unknown', 'https://example.com/alive': 'invalid',
+        }
+        assert results['https://x.com/oldname'].new_handle == 'newname'
+        # 同じアカウントは1回だけ確認し、503は再試行する
+        assert StandInHandler.hits['alive'] == 1 and StandInHandler.hits['flaky'] == 2
+        assert checker.retried == 1
+        assert checker.reused > 0 and checker.connections <= checker.requests
+
+        # 有効期限内の結果はキャッシュから返し、リクエストしない
+        reloaded = verify_x_urls.ResultCache(tmp_path / 'x_liveness.bin', endpoint)
+        again = verify_x_urls.LivenessChecker(endpoint, reloaded, rate=0)
+        results = asyncio.run(again.check_all(urls))
+        assert again.requests == 0 and results['https://x.com/gone'].status == 'dead'
+
+        problems = verify_x_urls.cached_problems([('a.json#/0', '甲', 'https://x.com/gone'),
+                                                  ('a.json#/1', '乙', 'https://x.com/oldname')], reloaded)
+        assert [(loc, r.status) for loc, _, _, r in problems] == [('a.json#/0', 'dead'), ('a.json#/1', 'renamed')]
+        # 確認先が変わればキャッシュは使わない
+        assert verify_x_urls.ResultCache(tmp_path / 'x_liveness.bin').entries == {}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_check_all_accepts_a_generator(tmp_path):
+    cache = verify_x_urls.ResultCache(tmp_path / 'x_liveness.bin', 'http://127.0.0.1:9/{handle}')
+    cache.put(verify_x_urls.CheckResult('alive', 'alive', 200, checked_at=time.time()))
+    checker = verify_x_urls.LivenessChecker('http://127.0.0.1:9/{handle}', cache, rate=0)
+    urls = ['https://x.com/alive', 'https://example.com/alive']
+    results = asyncio.run(checker.check_all(url for url in urls))
+    assert {url: r.status for url, r in results.items()} == {
+        'https://x.com/alive': 'alive', 'https://example.com/alive': 'invalid'}
+    assert checker.requests == 0
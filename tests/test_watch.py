@@ -0,0 +1,34 @@
+import pipeline
+import watch
+
+from .conftest import member, write_json
+
+
+def test_watcher_updates_only_changed_municipality(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'processed'
+    viewer_js_dir = tmp_path / 'js'
+    hachioji = data_dir / '13_東京都' / '議員リスト_132012_八王子市.json'
+    write_json(hachioji, [member('山田　太郎')])
+    write_json(data_dir / '13_東京都' / '議員リスト_132021_立川市.json', [member('鈴木　一郎')])
+
+    # 起動時のビューア出力の同期は監視用に読み込んだコーパスを使う
+    def load_again(*args, **kwargs):
+        raise AssertionError('コーパスを2回読み込んでいます')
+    monkeypatch.setattr(pipeline, 'load_corpus', load_again)
+    watcher = watch.CorpusWatcher(data_dir, viewer_js_dir)
+    assert watcher.poll() == 0
+    tachikawa_js = (viewer_js_dir / 'municipalities' / '132021.js').read_text(encoding='utf-8')
+
+    write_json(hachioji, [member('山田　太郎', x='https://x.com/yamada'), member('佐藤　花子')])
+    assert watcher.poll() == 1
+    assert watcher.totals() == (3, 1)
+    assert [m['氏名'] for m in watcher.members['13_東京都/議員リスト_132012_八王子市.json']] == ['山田　太郎', '佐藤　花子']
+    data_js = (viewer_js_dir / 'data.js').read_text(encoding='utf-8')
+    assert "'132012': { name: '八王子市', prefecture: '13_東京都', count: 2, xCount: 1 }" in data_js
+    assert "'132021'" in data_js
+    assert (viewer_js_dir / 'municipalities' / '132021.js').read_text(encoding='utf-8') == tachikawa_js
+
+    hachioji.unlink()
+    assert watcher.poll() == 1
+    assert not (viewer_js_dir / 'municipalities' / '132012.js').exists()
+    assert "'132012'" not in (viewer_js_dir / 'data.js').read_text(encoding='utf-8')
@@ -0,0 +1,62 @@
+import subprocess
+
+import x_history
+
+from .conftest import member, write_json
+
+
+def git(repo, *args):
+    subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+                   cwd=repo, check=True, capture_output=True)
+
+
+def commit(repo, message):
+    git(repo, 'add', '-A')
+    git(repo, 'commit', '-q', '-m', message)
+
+
+def load(data_dir, cache_path):
+    history = x_history.XHistory(data_dir, cache_path)
+    history.load()
+    return history
+
+
+def test_incremental_history(tmp_path):
+    repo = tmp_path / 'repo'
+    data_dir = repo / 'data' / 'processed'
+    hachioji = data_dir / '13_東京都' / '議員リスト_132012_八王子市.json'
+    tokorozawa = data_dir / '11_埼玉県' / '議員リスト_112089_所沢市.json'
+    write_json(hachioji, [member(), member(x='null')])
+    write_json(tokorozawa, [member(x='https://x.com/a')])
+    git(repo, 'init', '-q')
+    commit(repo, 'initial')
+    (repo / 'README.md').write_text('x', encoding='utf-8')
+    commit(repo, 'データ以外の変更')
+
+    cache_path = tmp_path / 'x_history.bin'
+    first = load(data_dir, cache_path)
+    assert first.update() == 1
+    assert first.parsed == 2
+    first.save()
+
+    # 内容を元に戻したファイル（既知のblob）はパースしない
+    write_json(hachioji, [member(x='https://x.com/b'), member()])
+    commit(repo, '八王子市を更新')
+    write_json(hachioji, [member(), member(x='null')])
+    tokorozawa.unlink()
+    commit(repo, '八王子市を戻して所沢市を削除')
+
+    second = load(data_dir, cache_path)
+    assert second.update() == 2
+    assert second.parsed == 1
+    second.save()
+    assert load(data_dir, cache_path).update() == 0
+
+    national = second.series()
+    assert [(p['municipalities'], p['total'], p['with_x']) for p in national] == [(2, 3, 1), (2, 3, 2), (1, 2, 0)]
+    assert [(p['prefecture'], p['total'], p['with_x']) for p in second.series('prefecture')] == [
+        ('11_埼玉県', 1, 1), ('13_東京都', 2, 0), ('13_東京都', 2, 1), ('11_埼玉県', 0, 0), ('13_東京都', 2, 0),
+    ]
+    assert [(p['name'], p['with_x']) for p in second.series('municipality')] == [
+        ('所沢市', 1), ('八王子市', 0), ('八王子市', 1), ('所沢市', 0), ('八王子市', 0),
+    ]
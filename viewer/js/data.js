@@ -1,4 +1,4 @@
-// 議員データ（2025年07月02日更新）
+// 議員データ（2026年10月18日更新）
 // このファイルは scripts/update_viewer_data.py により自動生成されます
 // 手動で編集しないでください
 
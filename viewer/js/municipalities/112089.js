@@ -1,4 +1,4 @@
-// 議員データ - 112089 （2025年07月02日更新）
+// 議員データ - 112089 （2026年10月18日更新）
 // このファイルは scripts/update_viewer_data.py により自動生成されます
 
 window.municipalityMembers_112089 = [
@@ -78,7 +78,7 @@ window.municipalityMembers_112089 = [
         "氏名": "荻野　泰男",
         "よみ": "おぎの　やすお",
         "所属": "さきがけ",
-        "X（旧Twitter）": "https://x.com/oginoyasuo/"
+        "X（旧Twitter）": "https://x.com/oginoyasuo"
     },
     {
         "氏名": "植竹　成年",
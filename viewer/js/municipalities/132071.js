@@ -1,4 +1,4 @@
-// 議員データ - 132071 （2025年07月02日更新）
+// 議員データ - 132071 （2026年10月18日更新）
 // このファイルは scripts/update_viewer_data.py により自動生成されます
 
 window.municipalityMembers_132071 = [
@@ -12,7 +12,7 @@ window.municipalityMembers_132071 = [
         "氏名": "美座　たかあき",
         "よみ": "みざ たかあき",
         "所属": "自由民主党昭島市議団",
-        "X（旧Twitter）": "https://twitter.com/mizatakaaki"
+        "X（旧Twitter）": "https://x.com/mizatakaaki"
     },
     {
         "氏名": "安保　満",
@@ -1,4 +1,4 @@
-// 議員データ - 132098 （2025年07月02日更新）
+// 議員データ - 132098 （2026年10月18日更新）
 // このファイルは scripts/update_viewer_data.py により自動生成されます
 
 window.municipalityMembers_132098 = [
@@ -30,7 +30,7 @@ window.municipalityMembers_132098 = [
         "氏名": "小野寺　まなぶ",
         "よみ": "おのでら　まなぶ",
         "所属": "公明党",
-        "X（旧Twitter）": "https://twitter.com/manabu_onodera"
+        "X（旧Twitter）": "https://x.com/manabu_onodera"
     },
     {
         "氏名": "木目田　英男",
@@ -48,7 +48,7 @@ window.municipalityMembers_132098 = [
         "氏名": "矢口　まゆ",
         "よみ": "やぐち　まゆ",
         "所属": "諸派",
-        "X（旧Twitter）": "https://twitter.com/machida_mayuyu"
+        "X（旧Twitter）": "https://x.com/machida_mayuyu"
     },
     {
         "氏名": "加藤　真彦",
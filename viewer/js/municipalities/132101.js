@@ -1,4 +1,4 @@
-// 議員データ - 132101 （2025年07月02日更新）
+// 議員データ - 132101 （2026年10月18日更新）
 // このファイルは scripts/update_viewer_data.py により自動生成されます
 
 window.municipalityMembers_132101 = [
@@ -48,7 +48,7 @@ window.municipalityMembers_132101 = [
         "氏名": "坂井　悦子",
         "よみ": "さかい　えつこ",
         "所属": "無・なでしこ",
-        "X（旧Twitter）": "https://twitter.com/sakaietsuko"
+        "X（旧Twitter）": "https://x.com/sakaietsuko"
     },
     {
         "氏名": "小林　正樹",
@@ -1,4 +1,4 @@
-// 議員データ - 132225 （2025年07月02日更新）
+// 議員データ - 132225 （2026年10月18日更新）
 // このファイルは scripts/update_viewer_data.py により自動生成されます
 
 window.municipalityMembers_132225 = [
@@ -30,7 +30,7 @@ window.municipalityMembers_132225 = [
         "氏名": "梶井　琢太",
         "よみ": "かじい たくた",
         "所属": "市議会立憲民主",
-        "X（旧Twitter）": "https://twitter.com/kajiitakuta"
+        "X（旧Twitter）": "https://x.com/kajiitakuta"
     },
     {
         "氏名": "岩崎　さやこ",
@@ -54,7 +54,7 @@ window.municipalityMembers_132225 = [
         "氏名": "かやま　玲子",
         "よみ": "かやま れいこ",
         "所属": "市民自治フォーラム",
-        "X（旧Twitter）": "https://twitter.com/kayamareiwa"
+        "X（旧Twitter）": "https://x.com/kayamareiwa"
     },
     {
         "氏名": "関根　光浩",